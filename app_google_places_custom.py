@@ -1,18 +1,17 @@
-
 # app_google_places_custom.py — v2 EMBEDDED (logos + persistencia + portada + login)
 from __future__ import annotations
 
-import io, os, re, time, math, datetime, base64
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Any, Tuple
-from urllib.parse import urljoin, urlparse
+import contextlib, os, time, datetime, uuid
+from typing import List, Optional
 
-import pandas as pd
-import requests
 import streamlit as st
-import tldextract
-from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+
+from localizador import (OVERPASS_URL, Business, BusinessStore, JobOptions, JobQueue, JobWorker, ResponseCache,
+                         RunCheckpoint, SearchParams, SearchRun, Tracer, businesses_to_df, export_bundle,
+                         get_http_client, load_gazetteer, parquet_available, result_hash, result_view,
+                         save_outputs, trace_path, using_response_cache, using_tracer)
+from localizador.views import EMAIL_FILTERS
+from localizador.jobs import JOB_WORKERS, google_limiter
 
 # ---------- Config & Auth ----------
 st.set_page_config(page_title="Localizador multigremio — Google Places v1 + OSM (v2)",
@@ -48,12 +47,16 @@ def require_login():
 
 require_login()
 
+import pandas as pd  # tras el login: la pantalla de acceso no espera a pandas
+
 # ---------- Header con logos embebidos (sin ficheros) ----------
 LOGO_JELPIN_B64 = "iVBORw0KGgoAAAANSUhEUgAAAHQAAAB2CAYAAAAZUrcsAAAAAXNSR0IArs4c6QAAAARnQU1BAACxjwv8YQUAAAAJcEhZcwAADsMAAA7DAcdvqGQAAAoySURBVHhe7Z0JTFzHGcfXR0xjW3ZTJ2obu1UTV62apEodt1HUqknVRGqbpFEbpapUKUmrNlIrpVUkS2miqkJp1Soxu9zHHuwux3Ish7kMDoexuXxhGwzGYIPN6QVjMBgDZlnMv/rmsRieHxjb+5Y3r/NJP1nY33u7M783M2/GaMZgSI5rEHBOlr3ZYI/+yMAi0wYBx7htMBRnwGCPskpCnTEQcE62AwZ7ZLQQqheEUJ0hhOoMIVRnCKE6QwjVGUKozhBCdYYQqjOEUJ0hhOoMIVRnCKE6QwjVGUKozhBCdYYQqjOEUJ2hO6GO6NvYo6hwMCQuAf0by1lwjfx+vMG1UCYtEgZbOAxWIwwW0xxGGKzhWG+PxoakWGxKTcBWlxmPpFnwpTQrvuiyYIvLjIeT4/GQMxbrSK7/OoYJBqsJhsQISThPorkTShVMFW6WKj7EGYOvZSTie/npeK2iCO8fPYx/NxxH7LlGuDraUNB9ERWeXtQMXMbRwX4cGxxA3RUPqvr78HlfF3I62+G40AJT0yn84+QRvFtThhdLcvGdnGQ86jJLUtlnGaUHR+tyNS+UKpC1IKlS1zti8N2cZLx1cD/+c6YeOV0daBi+iqGpm/DduoVAxKTPh+7xMRzu74OzvRUfHK/GyyU52J5ug8EWMd8DaFKuZoVSVzrXDW5OjsMPi9ysBZX0dqNrfAxTMzNyD6rGiNeLpmtDSGpvxbtVpdiZ5cRa/4NGkrUiV3NCWRcXhvWJUXg2Lw0fnqhBpacXY75peR2vWszMzqLrxhhS2s/hN4dK8Hi69fb4S0OCvEzBRDNC6Sk3h2FLchzeLC9Cckcr+icn5HWpyagfuoJPGo5hd16aNM6uptjVFRo9L3Kby4z3aspR1X8Zk0HuTgMVfRPjSDzfghf3Z2MtGzJWQeyqCaXxx7wXj6Um4C9HKnHi6gBuzc7K64jLGJuehqujVRLrf4kK1hgbdKFUMLMRIY5o/O7QATad0GuMeqdgbWvGrjyXNPWh7lheH4EmqELZ+GLCj4rc2NfVgekATTMWBt1xwufDwOQEzo4MoWbAw+ab+d0XkdPZgazOduR2dqCw+xKbn1LP0DE2ihHvFLwqfB+Knokb+OfJo3jMZWHDi6rdcFCEslYZhm2pZnxy+hgGb07Ky3xf4Zu9hd6JcdQOeGA7fxYf19fit5UleKHIjZ3ZSfhKRiK2uCzYmBKPLyTFIcQZiw3OGPYn/UwrSNvSrNjhduCp3FS8cmAf/lRdgU8bTyC7sx3NI8MYmpqSf+x9R+0VD94oK5AebLVaq+pCHdFY74jGKwfyUDXQJy/jPQe1opNDVxDX1oS3q0rxbG4qtqYkSBVET79/2Y4m/jR+0TRoft1WBlvTjZDy2DVzK1DmMKxxRLOFhJ8UZ2PPiVrkdnWwxYYHjXGfD8bm09jptqvTUlUXmhiJzcmxONT/YDJp3hd37gxeLSvEDuq6SJhfIEkJ9EsHVbb/M8xhCHFE4emcFPy5rhLFPZ2sW3+Q+GPNQem7yz/3QVFdqDMGa23h+GVZIa557637mpjxodLTh/frKvFkVhLWzE1xWGtU4+leDv8CvtmIjUmxeKk4GxHNp9E+Nir/2neN4t5OfJkeSnoQ5Z/zoARDKGs9ljB8fLJOXjbFuD7tZS8vvy4vwMNJsQsWxoMsUYlFa8smfNPtwN/ra9kwsJKgnuaZ3FTpwZTfOxAERShhC8cmZwwKezrlZZwPapGui234aXEuQqgFUqHVeIoDBcll424YdqRZWXd8ahmx3lsz+H11GZt/B3yI8BM0oYTZiGdyUtExdn1RQX2zs/i8txuvl+bjoXmRkXder1VIztxL2fY0K3vblpeRwtzWjDVsuFCxbEEVSgVP2It3qkrnV4VaRobxh+oy1nrZG6aahVUbv1iLEd92OxHf2sRWjShODQ9Ki/jUouXXBZKgCiXskVhvj0J0SyNb96QxiCRrumu9V9g7gwlrrOF4s2I/inou4VWaf6o1bi4k6EIJexQ2JMVgHb3k0BOr1njih62n+n89RY5RnYeJXubY1MeEjclxUhnVLiexKkIJ9stZQXhrdUTjG1lOPF+Ygd356XhuAfTz84WZ2J5pV7ey6X1AzfsvZNWEBoO5KUZ8WxM8k+PoHb9xB/2T4wg9fTw4PUUw0L/QCDanXS4iWxqD+19cavL/IDT1Ypvc4aLY23xKCOUCIVQhgWeEUIUEnhFCFRJ4RghVSOAZIVQhgWeEUIUEnhFCFRJ4RghVSOAZIVQhgWeEUIUEnhFCFRJ4RghVSOAZIVQhgWeEUIUEnhFCFRJ4RghVSOAZIVQhgWeEUIUEnhFCFRJ4RghVSOAZIVQhgWeEUIUEnhFCFRJ4RghVSOAZIVQhgWeEUIUEnhFCFRJ4RghVSOAZIVQhgWeEUIUEnhFCFRKCjX9H6KW4l/0QhFCFhCCzuzATr5cX4hdlBfj5Auhn+vsnspNWvjeDEKqQECyoMu1RyO+5KK/vRfGvhhMr3w+B3TMSmZfOy2+zKOi4ECE00LDWFHnX1mS/0IJ17MSjFWxQlRiJTSnxd90J9KOTR6RNr4TQAEKVaQvHfxvr5fW9KOhkpEdTzSvbQNhiZFui0o7SSwUd2fFOdbkkVH49j2hGKGExss0Nl4ubMzN4o7xI2n1Mfv1C6AFJ+AwfHKtm0paKYe8UXtqfNbfLV+yd9+ENbQk1YXdBJjvFaLmgnbG30S7WljDlbpJ2KIv/DN/KTsb56yPyyxdF08gQvkp78K2kxfOApoTS7tdJsSjt65bX+x1BB/XsSLPBkCDtOD0/rWFbjBuxa5+Lnch0t6ANFjV7jtn9oCmhhMWI9+oOYulO8nacHhrEh/W1ePnAPnw/Lw0/yE9nW5h/eqYel27cub2pPMZ90/hxcY70IMi/B69oTqgtAo+kJKBusF9e/0sG7YB9eWIcnskJTM6sfC94x4Vz0tmhK53X8oDmhBLmMPysNI+dpaJWtI1eY2eEqr5/bbDRpFAaz6wm/O3YYVUOx7k6dROvleVLY69exk4/mhRK2KPYaRJ7jlfP7wodiKCzV2hT4iXfkHlHs0IJGt+sJrxVsR/N14bkbu45Dnp68EJBpj5bph9NCyXYmdtGPJFhZ+u4Z0eG5Z6WDeqyaXXpr0cPsZct3azZLoXmhfqZ+2+1nW4H3q4qYycsVHh60Do6gis3J3Hd68Wo18s2Om4eGUJJbyfCzzbgV+VF0qE3Wj8yJFBwI5RgL0uSWDouY2tKPL6e5cTTeWl4riADu/LT8dS+VDzudrAFCn8u23Nefi+9wpXQhVBXTGMstVz/QXR+/Gej6Gl+uVK4FSpQRgjVGUKozhBCdYYQqjOEUJ0hhOoMIVRnCKE6QwjVGUKozhBCdYYQqjOEUJ0hhOoMIVRnCKE6Y5FQB/2ah4BrsuwLhLoTIeCckkxqqWZJaErcUQHnZFgbDc7YPZJQS+hGAeeEhm42hIZukISKECFCu/E/AotsFOnFLykAAAAASUVORK5CYII="
 LOGO_MULTI_B64 = "/9j/4AAQSkZJRgABAQIAJgAmAAD//gAiMzJiZWUzZmVkMzNkYjhlZmNlYTAyNTI0ODM3NDkyY2b/2wBDAAMCAgMCAgMDAwMEAwMEBQgFBQQEBQoHBwYIDAoMDAsKCwsNDhIQDQ4RDgsLEBYQERMUFRUVDA8XGBYUGBIUFRT/2wBDAQMEBAUEBQkFBQkUDQsNFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBQUFBT/wAARCAFAAUADAREAAhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVWV1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJBUQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq8vP09fb3+Pn6/9oADAMBAAIRAxEAPwD9U6ACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAQnFABuHrSuAZHrRcBaYBQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAwyAUrgc94k+IvhzwgpOr6vbWbj/liX3SH/AIAMn9K9HDZfisY/3FNvz6ffsfO5lxDlWUL/AG2vGL7bv7ld/gecax+1b4Us2K2VnqOokdHWNY0P/fRz+lfQ0uFsZUV5yjH5t/l/mfnWL8VMmotxoU51POyS/F3/AAOfk/a+tQ2E8LzMvq16oP8A6Aa71wjPrWX3f8E8GXi7Rv7uCf8A4Gv/AJEtWf7XWkOQLrw9ewg9TDMkn89tZT4Sr/Yqp+qa/wAzqo+LeCf8bCyXpJP8+U7Pw9+0X4I15kjbUJNMmYfcv4jGP++hlf1ryK/D2YUFdQ5l/d1/Df8AA+xy/wAQ8gx9ouq6bfSat+OsfxPR7a+gvIEmglSeFxlZI2DKw9iODXzsoyg+WSsz9FpVYVoKpSkpRezWqfzRKHBOKk1HUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAZPiTxPp3hLSptS1S5jtLOH7zueSeygdST2Arow+Hq4qqqNGN5M8zMcywuVYaWKxk1CEer/Jd2+iPlr4j/tI614mkls9BZ9F0zJXzEP8ApEo92/hHsvPvX6dlvDlDDJTxC55/+Sr/AD+Z/L/EfiNj8zbw+W3o0vL45er+z6L7zx6SWSZ2kkdndvmZ3OSfck9a+v8AdSSWy6f1ofkEpyqSc5u7fXqXNN0DU9bO3TtOu78jqLaBpP5A1lVr0qH8WSXq0jrw2X4zGu2Goyn/AIYt/kjoYPg741uEDp4Z1DB/vRbf5mvPlnGAi7OtH7z6CHB+fzXMsHP7v8ypqHwx8WaUpe58O6lGg6sLZmA+pXNa08zwVV2hWi/nb8zlxHDOdYWPNWwk0u/K3+VznXjeFyjqUYHDKwwR7YNegmparU+ecJRdpKzX4fI6TwV8Sdf8BXay6TfPHCT89rJ80Mn1U/zGD7152Ny3DY+PLWjr36n0eS8SZlkVXnwdVqPWL1i/VfqtT6x+FXxk0z4kWxjCiy1iJMy2TNncO7If4l/Ud/WvynNMnq5bK/xQez/R+Z/VvC3GOD4khyfBXW8f1j3Xfquvc9EjffnjFeAfoQ+mAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAZ2u63aeHdLutRv51t7O2jMkrt2A/mewHqa2o0Z4ipGlTV29EcWNxlHL8PPFYiXLCCu3/XXsur0PiX4ofE7UPiXrrXNwWg0+JitrZA/LEvqfVz3P4V+0ZXllPLaPJHWT3ff/geR/FXFHE+K4kxbq1G40o35I9l/m+r/AEKXgP4eax8QtV+x6VACqYMtzISIoB/tH19AOa3x+Y0Mvp+0rv0S3b8v8ziyLh7HcQ4j2GEjovik/hiu7/Rbs+oPAv7O/hjwosUl9AuuX4GTNdqDGD/sx9B+OTX5jjeIMZinywfJHsv1Z/TuR+HuUZVGM8RH21TvJafKO333Z6nBaxW0KRQxrDEgwqRjaoHsBXzLbk7yd2fp1OnClFQppJLotF+BJikaBtoA5rxZ8OfDvjWBk1bS4biQji4Vdkq/Rxz/AEr0MLmGJwbvRm0u3T7tj5vNeHcrzqLjjaKk++0l/wBvLX9D5f8Aix8A9Q8BrJqemO+p6IDlmI/fW/8AvgdV/wBofjiv0zKc+pY+1GsuWp+D9PPyP5m4r4CxOQp4zCv2mH694/4rbrzXzSPMtI1W70LUre/sLh7W8t3DxSxnkEfz9+xr6WtThiKbpzXNF7p/19x+Z4TGV8DXhicPNxnF3TXT/geX6H2v8JPiRB8RvC6XgCxahARFeQL/AAvj7wH91uo/Edq/F82y6WW4h073i9Yvy8/NH9pcJcSUuI8Aq+1SOk12ff0luvmuh3SHIrxj7cdQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFADJDgCjqB8yftS+P3utTt/CtrIfItws95tP3pD9xD9AQf+BCv0jhfAJQeMn1ul6dX89j+aPFDPnVrwyei/dhaU/NvZfJa+rXY8a8F+E73xv4jtNHsRma4b5pCPljQcs59gPz6V9jjMXDA0JV6uy6d+y9f0PxzJcpr53jqeCw696T37Lq36f8A+4fBng/TvBOiW2labEEgi+85+9K/d2PcmvxLF4urjazrVXr27H9vZPlGFyTCQweEjaK3fVvq35/lstDoQoB6VxnuWFoAKACgAoAhuLeKeCSOSNZI3UqyOMgg9QRTTcWpJ6oznCNSLjNXT3T6nxl8d/hivw98TCWyQjR7/L24/55MPvR59sgj2NfsORZm8woWqv95HR+fZn8c8dcMrh7HqeHX7mpdx8n1j8t15PyK3wK8bN4N8fWZkkxYX7C0uAemGPyt9Q2PwJrTPcCsZg5WXvR1X6r5nLwLnTybOKbnK1Op7kvns/k7fifbMX3B/SvxhX6n9qD6YBQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAm4etAFe/vrfT7Z7i5njt4I+XllcKqj3JqowlOSjBXfYwrV6WHg6laSjFbtuy+9nlXib9pbwfoLPHZzT6zOO1mmI8/77YH4jNfT4bhvH10nNKC83r9y/U/L8z8ScjwDcKEnWkv5Vp/4E7fhc8+1H9rm/dz9g8P28Kdjczs5/8AHQBX0FPhOmv4lVv0VvzPz7E+LWJk39WwsV/ik3+VjGf9qvxazZW00xR/d8lj+u6u5cLYJbuX3/8AAPFfipnbelOn9z/zLdp+1l4iiwLjSdOuB/sl0P8AOsJ8KYV/DUkvuOyj4r5pH+LQpy/8CX6s7DQf2s9HupETV9Iu7D1lt3EyD3xwQPzryK/CdeGtCon66f5n1+B8WMBVajjcPKHnFqS+7R/mepaP8SPDniPSri/0zVYL2K2iaaSNW2yIACTlDgjp6V8vWy7FYaap1oOLbt5fetD9QwfEmVZhh54nCV1NRTk0tGklfWLs+h8OeI9Yn8R69qGqXBLTXk7zN7biSB+AxX7dh6McNRjRjtFJfd/Vz+IMxxlTMcZVxdX4qkm/vZ9JfsreDU0/w9eeIZ4/9JvnMMDMOViU84/3m/8AQRX5xxTjHUrRwsXpHV+r/wAl+Z/SXhbk0cPgp5pUXv1Hyx/wrf73+SPex0r4c/dBaACgAoAKACgBDyKAPOPj74XTxL8MtWITNxYr9thbHIKctj6ruFfQZFiXhsfTvtLR/P8A4Nj8848yxZlkNfT3qa51/wBu7/8Aktz4o5U5BwfWv2dWukz+LU7bH394A17/AISPwTompOwMtzaRvJ/v4w3/AI8DX4NjqH1bFVKXRN/d0/A/vbIMc8yyrDYuW84Rb9ba/jc6DcM4zzXCe+I0ioPmYL9eKNyXJLcA6sMgg/Tmh6bjTT1QpYDqcUBcMj1oGAOaAFoAKACgAoAKACgAoAKACgAoAKACgAoAYZFx1oA8y+K3xt0v4cRm0jVdR1tlytmjcR56NIf4R7dT+tfRZVk1XMXzv3affv6dz814r42wfDkfYwXtK72jfRLvJ9PJLV+S1PlTxl8RNe8e3rT6vfPMufktk+WGP2VRx+Jyfev1PCZdh8DHloRt57t+rZ/LGb8RZjntV1MdVbXSK0ivRbfm/MwLazuL+4SC2hkuZ3PyxxIXZj7Ac13ynCmuabsu7PAp0aleoqdKLlJ9Fq38kdxo/wACPHGtKrRaHLbowyHu3WEfkTn9K8StnuX0dHVT9Ls+3wfAnEGMs44ZxXeTUfzd/wADoof2XPGkiBnOnRn+61xk/oK4HxNgFtzfd/wT34eGGfSV24L/ALe/4BWvv2Z/G9ojMlraXQA6Q3S5P4HFaw4ky+WjbXyZz1vDXiGmm4wjL0kv1scL4h8CeIPCmTq2kXdkn/PSSP5P++hkfrXtYfH4bFfwKil8/wBNz4jH5DmmVa4zDygu7Wn3rQx4pnhYsjlGwRuUkHH4V2NKXQ8eE5U3eLa9BmCxwOD0ANVdJXZC1Z99+BdFXw34O0bTQoU29rGjYORuxluf94mvwbHV/rOJqVu7Z/euRYFZbleHwlrcsEn62u/xOirhPfFoAKACgAoAKACgDP1+FLnRL+GQbkkt5FYH0Kmt6DcasJLo1+Zw4+CqYWrCWzjJfgz88OgHPYV/QB/nw9D2jwz+0ZL4L+HulaHpmmrcajbI6vc3R/drl2YYUcng+o/GvjMTw7HGYypiKs7RfRb7H7NlviJPJcmoZdhKKlUineUtleTaslq9+6XqcXrvxm8ZeInf7Tr11FG3Hk2p8lMfRcV7OHybAYb4KSv3er/G58ZjuM8+zBv22Kkk+kXyr8LficxLrWoTtmW/unPq87k/qa9RUaUdopfJfofMTxuJqu86kn6tjoNf1K1OYdRu4j1ylw4/kaUqFKXxRT+SKhj8XT/h1ZL0k1+p1WifG7xpoToYdeuLiNePLu8TKR9GzXl18kwFdPmpW9NGfU4LjXP8C17PFSkl0laS/E9b8HftXwzvHB4m0z7OTwbywyVHuYzyPwJ+lfJ4zhWS97Bzv5P/AD/zR+s5P4rU5tU81o8v96Gq+cXr9zfoe76B4j0zxLpsd7pd7De2r8CSFsgH0PofY18NWw9XCzdKtFxZ+6YDMcJmdFYjB1FOL6r8n2fkzTBzWB6ItABQAUAFABQAUAFABQAUAFABQAUAeT/HL4tJ8O9KWzsGWTXbtSYVPPkJ08xh9eAO5+lfT5JlLzKrz1F+7T1832/zPy7jfi2PD2HVDDNPEVFp/dX8z/RdX5I+P7y7n1G6lubmV555mMkkshLM7HqSa/XIRjTioQVku2yP5CrVamJnKrVk5Serb1euur7nsvwo/ZwvvFUMOqeIHk0zTHAeO2UYnmX15+4D+Z9K+OzXiKnhm6OGtKXfov8AN/gfsXCvhziMzhHGZk3TpOzUftSX/tq89/I+lvDXgjRPCFoLfR9OgsVxgvGmZH/3nPJ/E1+c4nGYjFy5682/y+7Y/pLLcmwGUU/ZYGioLulq/V7v5m1s964z2hw4AoAQrmgBktuk6Mkiq8bDBRhkEe4NCbT5luRKEZrlkro8Y+J37N+keIYpL3w+kekangt5KDbbyn0IH3D7j8q+xy3iOvhWoYn3od+q/wAz8b4m8OcFmMJYjLEqVXttCXlb7Py07o+WNV0q70XULiwvreS2u4GKSwyDBU/5796/UKVWnWpqrTd09n3P5dxeEr4GvPDYiPLOLs0+n9fifQv7N3xXe8K+EtWm3uFJ0+ZzyQOsRPsOR+I9K/PuJMoUF9corT7S/X9Gf0J4ccVyqtZJjJXaX7tvey+z8lrHy07H0aOgr8/P6FFoAKACgAoAKACgDB8e6quieC9bv3OBBZyuPrsOP1xXbgaTr4qlTXVo8PPcVHBZXicRL7MJP8ND8/QDgD0wK/etN+h/Ar7ss6dpl3q95FaWVvLd3cp2pBAhd2PsBWdSrClFzqOyXV6HTh8LWxdWNHDwc5PZJXb+R7F4W/Za8R6qiS6vc22jxMM+Uf30v4hTgfma+QxXFGFpaUIub77L8T9gyvwuzXEpTxs40V2+KX3LRfeei6b+yd4atx/pmo6jeN/sskQ/IA18/U4qxcv4cYx/E/QcN4VZTTX7+rOfpaP6M0n/AGXPBLJgR36N/fW75/8AQa51xPmCe8fu/wCCei/DDILWSn/4F/wDkPE/7JUQjeTQdaYSckQagmVPtvXp+VerhuK5JpYin84/5P8AzPksz8J4crlluIs+0/8ANf5HhfivwPrXgi++yazYyWbsTskxujkA7ow4P8/avt8LjsPjY89CSl5dvVH4fm2SZhkdb2OPpOD6dn5prR/1cd4N8dav4D1Zb7Srlom482FjmOYejr3+vUdqWMwNDH0/Z1o/Pqn5MrJs9xuQ4lYjBTt3XSS7NdfzXQ+y/hp8TdO+JOhLeWn7m7iwlzaM2Whb+qnsf61+P5lltXLa3s56p7Pv/wAHuf2Pw1xJheJMJ9Yo6TWko9Yv9U+j+W52leQfXhQAUAFABQAUAFABQAUAFABQBkeJvEdt4V0O/wBVvDttbSIyN6nHRR7k4A+tdGGoTxVaNGnvJ2/r0PMzPMKOV4Orja792Cbf6L1b0R8G+K/E954w8QXur3zb7i5kLYzwi/woPYDA/Cv3TC4WGEoxoU9l/X4n8J5tmdfOMbUxuJfvTf3Lol5JaHs37OXwgi1yRPE+sweZZRuRZW8o4ldeDIw7gEcD1HtXx3EWbuivqeHlZ7t+vT1/Q/ZPDrhGONf9r4+N6afuJ7NreT8l08/Q+oVQKc1+aH9NjqACgAoAKACgBrLuxyaAPEP2l/hvHrfh5vEVnD/xMNOT9+VHMsGec+69fpmvs+G8xdCusLN+7PReT/4O3qfiviTw7HHYJ5pQj+9pLXzh1/8AAd/S58tabqM+k6jb3lq5jubeQSxyA/dYHINfp9WnGtCVOa0as/Q/l3DYmrhK0K9F2lBpp9mtj798Ja//AMJN4Z0rVRH5QvbaOfZ/dLKCRX4Pi6P1bETo/wAraP72ynHLMsBQxtre0ipW7XS0NmuU9YKACgAoAKACgDyv9pb7cfhTfCzRmiM8X2raMkQhsk/99BK+n4c9n/aMed62dvX/AIa5+X+JCxD4eqKgrrmjzf4b3/8ASuW/kfIWkaRda5qdtYWURnurmQRxIO5J/l3+gNfrNarGhSdWeiSufyRhMJWx+IhhcOrzm0kvP+tz7Z+F/wALNL+HGjRxW6LPqTqPtN6V+aQ+g9FHYfnX4vmWZ1syquU37t9F/XU/tPhrhfB8OYZQpK9Vr3p21b/SPZfedr5Qxjp9K8c+zsh9AwoAQrmgDK8ReHdO8TaZLp+p2kd7aSjBjlGcHsQex9xW+Hr1cLUVWjK0kedj8vwuZ0JYbF01OD6P812a7o+QfjH8Gbr4b332u2Z7rQrh8RTt96Jv7j+/oe/1r9cyfOIZlDklpUW67ruv8j+ReMeDa3Dlb21JueHk9H1T/ll+j6nL+AfHF/8AD7xJbarYknYds0BOFmi7of5j0NelmGCp4+g6NT5Ps/6/A+XyDPMTkGOhjKD20a6SXVP9Ozsz7p8PeILTxPo1lqlhIJbS7jEkbD0PY+4OQfpX4jiKE8NVlRqK0luf3HgMdRzLC08Xh3eE1df13WzNOsD0AoAKACgAoAKACgAoAKACgD52/ax8XNDa6b4bgkI88/a7kKeqrwin8cn8BX3/AArhLzni5dNF+v8AXmfz54rZu4UqOVU38Xvy9FpFP53fyR4J4K8MS+MvFOm6NCSGu5gjOP4E6s34KCa+7xuKjg8POvL7K/H/AIJ+D5Llk84zCjgae85JX7Lq/kj720nTLfR7C1sbSIQ2ttEsUca8BVAwK/CKtSdWo6lR3bu2f3jhcNSwdCGHoLlhFJJLsi9UHUFABQAUAFABQAUAQ3MMdxG8UqLJG6lWRhkMCMEH1FNScWmtyJwjUi4TV4vRryZ5LN+zH4Lk1Vrry71Ii282a3H7r6dN2PbP419SuJsfGlyXV+9tf8vwPymXhnkMsR7e0uX+Xm93/wCSt8/mes2dnBY20NvbxLDDEgRI0GFVQMACvl5Sc5OUnds/U6NKFCnGlSVoxVklskiepNgoAKACgAoAKAGSxJPG0ciLJGwIZGGQR6EU02ndEzhGpFwmrp7pnPaJ8OPDHhvUnv8ATNEs7K8YEedFHgqD1C/3fwxXfWx+KxEFTq1G1/W/f5nz+B4dynLa7xOEw0YTfVL8u3ysdGAFHFeefRC0AFABQAUAIVBoAzNe0Sz8R6Td6ZfwLcWdyhjkjbuPUehB5B7EVtQrTw9WNWk7NHBjsFQzLDTwmJjzQmrNf11W6Phn4heCrjwD4rvdIuCXjibfDLjHmxH7rf0PuDX7fl+NjmGHjXju9H5P+vwP4c4hySrkGY1MFU1trF94vZ/5+dz2X9lPxwy3F74WupMq267tM9jwJFH6MPxr47inBJqOMgvJ/o/0+4/ZPCzPLSqZPVej96H/ALcvnv8AefStfnZ/RwUAFABQAUAFABQAUAFADHbHFJiZ8QfHLXzr/wAUNdl3boreb7InsIxtI/763H8a/a8jofV8vprq1zP5n8T8cY95hn+JknpF8i/7d0/O53v7JnhwXXiDVtakTcLOFbeMns8hJJH/AAFcfjXhcV4jko08OvtO/wAl/wAF/gfdeFGXKtjMRmElpTSivWW/4L8T6kwPSvzI/p8WgAoAKACgAoAKACgBKADFAC0AFABQAUAFABQAUAFABQAUAFABQAUAFABQAmBnpQB4V+1P4QXVPCtrr0UYNzpsojlYDkwucfo2D+Jr7XhbFuliZYZvSa/Ff8C5+IeKWULFZdDMqa96k7P/AAy/ydvvZ85+A/ET+E/GOj6sjEC2uUZ8d0Jw4/FSRX6JjsOsXhqlF9V+PT8T+dMizGWU5nQxq+xJN+mzX3XPv2FxIAykMpGQQc5HrX4Na2jP74i+ZJrVEtBQUAFABQAUAFABQAUAMkYKNzHAAyTStcTaSuz87NXvG1HVb27k5eeZ5W+rMSf51/QlGCp04wWySR/npjKzxOJqVpbyk397ufV/7LGmCz+G8tzjDXd9I5PqFCoP/QT+dflXFFVzxyh/LFfjr+p/VfhdhVQyOVa2tScn8kkv0Z7PXyJ+whQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQBzXxC0ca54I12xcZWazlHHqFJH6gV34Cq6GLpVF0a/PU+f4gwix2U4nDv7UJffa6/FHwIAT9cc1+8XsfwTbU+9vhdqp1v4feH7wjDSWUYbPcqNp/9Br8KzKl7HG1aa6Sf+Z/d/DOK+u5Nha73cI/grP8AI6qvNPpwoAKACgAoAKACgAoAq6lu+xXG3r5TY+uDV0376v3Rz17+ynbs/wAj86pPvt9TX9CLY/zxe59n/s4KF+Eej47yTk/Xzmr8c4i1zGpfsvyR/ZXhzpw3h/Wf/pbPUK+bP0wKACgAoAKACgBCcUAIGBoAWgBaACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgCtqQDaddBuhifP/fJrWl8cbd0c2JSdGafZ/kfnZNxK+DwGP8zX9Ap+6vQ/z2n8b9T7V/Z7mab4T6Fk52LIg+gkavxnP4qOZVbeX5H9ocAVHU4cw1+ikv8AyZno9fPn6EFABQAUAFABQAUAFADH54PQ8Ubaieuh+dusWT6bq19aP/rIJ5ImHurEH+Vf0FRmqlKM11S/I/z0xlGWGxNShLeMmvudj64/Zhv1uvhbBCpyba7mjP1Lb/8A2evyfiaDjmDf8yT/AE/Q/rXwyrqtw/GC+xOSf/pX6nrtfKn6uFABQAUAFACMdqk0AeT/AB7+LN58OdIsoNKEQ1W+ZtryruEUa9WC9CckAZ4r6jIsqhmNSUqvwR7dX/wx+V8ecVVuHMNTp4O3tal9Wr2S3dtr3ta/3HGfBH4+6z4l8TwaD4gaG6+1BvIu0jEbK4BOGC4BBxjgDn1zx7Od5DRw1B4nCq3Lur30+ep8dwTx9jsyx8cuzRqXPflkkk772aWln02s+99PopDuXNfnx/Qidx1AwoAKACgAoAKACgAoAKACgAoAKACgAoAKACgAoAwvGupppPhLWruQhVgs5Xz/AMBOP1rrwUHVxNOmurX5ni51iFhMtxFeW0YSf4M/P1ecA98Z+tfvjP4E3Z9ufAK1Nr8J/D4PV4WkP4uxr8Wz2anmNVruvyP7V4Dpey4dwq7pv75M9DrwT9ACgAoAKACgAoAKACgBj+uelAHw/wDHLQjoPxR1yLbiO4mF1H/tCQbif++t1ftOSV/b5fTlfVK33f8AAP4k44wLwOf4mNtJPnX/AG9r+dz0/wDZH8QKkmuaG7YLbLyJc9cfI/8A7J+VfNcWYdv2eIXS8X+aP03wmzBRliculu7TX5P/ANtPpSvzs/o4KACgAoAKAMbxH4o07wrpNxqOqXcdpaRDJZjyx/uqO5PoK6cPh6uKqKjSjeT/AKv6Hl5jmWFyrDyxWMmowj/Vl3b7HxN8UPHlx8RfFdxqkqGG2X91bQHrHEOgPueSfc1+z5ZgY5dhlSi7vdvu/wDLsfxVxPn1XiPMZ4yStHaK7RW3ze782egfsu+DZdU8Wza/JH/oemxlI3I4aZxjA+ikn8VrweKMYqWHWFT96TV/RH33hfk08VmMszkvcpJpPvKWn4K7+4+r4/u1+Wn9Vj6ACgAoAKACgAoAKACgAoAKACgAoAKACgAoAKACgDyL9pjxKND+HE9mHCz6nKtsq9ygO5z9MDH4ivqeG8N7fHKo1pBX/RH5R4k5msDkcsOn71ZqK9Fq3+Fvmj49VTIwUDLNwPqa/Xm0ldn8gRTk7I/QTwXpB0DwrpGmldrWtpFEw/2go3frmvwPGVvb4mpV7tn9/ZPhPqGXUMK1ZwhFP1S1/G5t1yHsBQAUAFABQAUAFABQAhANAHzh+1n4UJ/snxFEnyjNlcMB06tGT/48Pyr9C4VxX8TCt/3l+T/Q/nXxXyr+BmkF/cl+cf1PF/ht4wfwN4z03WBnyopNs6D+KJuGH5c/UCvssywax2GnQ6taeq1PxvhvOHkeZ0cbvGLtLzi9H/n8j7vsrqO9ginglE0EyCSORTkMpGQR+FfhkoyhJxlo1of3RSqwr041aUrxkk01s09rFmkbFTUbtbC1luZG2RQo0jn0AGT+lXCLnJQW7MK9WNClKtN2jFNv0SufLV/+1b4nbVZpbKy0+OwJPlW9xGzNt7bmDDnHpxX6dT4VwqppVJS5urW1/JWP5exPipm31mU6FOCp9E027dLtNa+mhFf/ALV3iy5hKW9nploxH+sWJ3YfTc2PzBq6fCuDi7zlJ/cvyRjX8VM6qQ5adOnB97Sb/GTX4Hl/ifxnrXjG8+06xqM19KPuiQ4RP91Rwv4CvpsLgsPg4clCCS8t/m9z8xzTOcfnFX2uOrOb6dl6JWSXoXPh34GvPiH4mg0i0lSDKmWWaQ/6uMY3EDqTyOKyzHHQy6g61RX6Jd30R2cPZHX4hx8cFRko31bfRLd26vXRH234M8J6f4M0G30nTotltAPvN952/iZj3JNfiuLxVTGVpV6r1f8AVj+1soyrDZNg4YLCxtGP3t9W/N/8A3QMVyHtC0AFABQAUAFABQAUAFABQAUAFABQAUAFABQAUANJoA+Nv2iPHQ8XeOXtbeQPp+lA20ZB4Z8/vG/MAf8AAa/XuHsD9UwnPJe9PX5dF+vzP488Q88/tfNnQpu9OjeK85faf36fIwvgx4UPi74jaRaMm+3hkF1cZHGxDuwfqcDHvXfnOK+qYKpU6vRer6nh8G5V/a+d0KLV4xfNL0jr+LsvmfciDnOe1fiKP7fJKYBQAUAFABQAUAFABQAUAc9468KQeNfC+o6PccLdRbUfH3HHKN+BANduCxUsHiIV49H/AMP954WeZXTznLq2Aq7TWj7PdP5Ox8GavpN1oep3VhexNBdW0hikjPBDA4/Kv3SjVhXgqlN3TP4RxeFrYLETw1dWnFtNeh7/APs4fF+O3EHhPWZwq5I0+5kbA5/5Yknpz93649K+C4iydtvG0F/iX6r9T998OeMIwUclx0rL/l23/wCkN/8ApP3dj6T3D1r87P6OIb22jvraWCVfMhlQo6+oIwacZOMlKL1RjVpwr05Upq6kmn6PRny5rv7KHiCO/lOkX1jcWJJ8v7S7RygdgQFIJ9wa/TqHFWGcF7eDUuttvzP5ix/hXmUa8vqVWEqfTmbTt52i1876kFj+yf4qnlX7Xf6Xax9yjvIR+G0fzrSpxVg0vcjJ/cv1Oeh4VZxOX76rTiu95N/dZfmZnxY+BE3w48OWeqQ37ampl8q7PkhFjJHyEDJODyDnvj1roynPVmVeVKUOXS61ve2/9I87izgSpw5gaeMhV9or2lpZK+zW+m69bHAeCPFNx4K8VadrNtkvayBnTON6Hh1/EZr38bhYY3DzoT6r7n0Z8BkmaVclzCljqW8Hqu66r5rQ+89D1i013S7bULKYS2tzGssTjuCP59iK/CqtKdCpKnUVmnZ+p/d2DxdHH4eGKw7vCaTT9TQBz0rI7RaACgAoAKACgAoAKACgAoAKACgAoAKACgAoAQkA9aAPK/jz8UU8B+HnsrOQHW79CkAB5hQ8NIfT0Hv9K+myLLHj66qTX7uO/m+i/wAz8v474njkOBdChL9/VTS/urrJ/lHz9GfGpJYknJyetfsKSWiP451bufWv7M/w+bw14ZfW7yPZfaqAyKw+aOAcqP8AgR+b6ba/J+JMwWJxCw9N+7D8X/wNvvP6y8NeH5ZZl7x9dWqVrW8oLb79/Sx7VXyB+yBQAUAFABQAUAFABQAUAFABQB4X+0L8Hm8U258Q6NBu1e3TFxAg5uIwOoH99f1HHYV9rw/nH1VrC4h+43o+z/yf4H4j4g8H/wBqQeaYGN60V70V9qK6r+8vxXoj5VAaN+QVKn6EGv1G6ex/LKTjL0PoP4R/tH/ZIoNI8WSO8KYSLVMbmUdAJQOv+8Px9a/P834dc26+CWvWP+X+R/QXCPiN7JRwOdO6Wiqbv0n3/wAS179z6RsL63v7WO5tp0uLeUbkliYMrD1BFfnk4ypycZqzR/RdCvSxNNVqMlKL1TTun6NFjeMZqDcXqKAMjxP4dtvFOgX2k3qlra6iMbEdV9GHuDg10YbETwlaNeG8df8AgHl5nl1HNcHUwVde7NWf+a809UfCHizw1e+DvEN7pF+m25tnwWAwHXsw9iOa/c8JiYYyjCvT2a+7y+R/CubZZXyjG1MFiV70Hb1XRrya1PWv2d/i6vh26Xw1q84TTLh82s7nAgkP8BPZW/Q/Wvk+IcpeIX1ugvfW67rvbuj9Y8POLY5dU/srHStSm/db+zJ9PKMvwfk2fVKSKBivzA/qW48HIoGLQAUAFABQAUAFABQAUAFABQAUAFABQAhYDrQBwfxT+K2l/DfSy8zrc6nKh+zWIbDOf7zeij19uK9nLMrq5lU5Y6RW7/rqfEcUcU4ThrDuU2pVWvdhfV+b7RXV9dkfGXiTxLqHi3WbnVNUnM95cNlieAPRQOwA4Ar9jw2GpYSmqVFWil/TbP42zLMcTmuKni8XLmnLd9vJdkunkeifAn4RSeO9VTVNRhI0G0f5twwLlwc7B6r/AHvy7187nmbrBU/Y0n+8kvuX9bH6FwLwjLPcQsZi4/7PB6/35L7Pp/M+2h9gxRCIKqgKq8ADoBX5Kz+vIrlVlsS0FBQAUAFABQAUAFABQAUAFABQBGYzzzQB4r8Yv2eYPFzzaxoHl2est801ufliuT6/7L+/Q9/Wvs8o4glhEqGK1prZ9V/mvyPxfjDw/pZu5Y7LbQrbtbRl/lLz2fW258t6vod/4f1GWx1K0ls7uM4aGZdrD39x7iv06lXpV4KpSkmn1P5fxeBxOXV5YfFQcJrdPT/h15rQ1vCPxF8Q+BbjzNH1KW2Rm3PATvhc+6Hj8eDXJi8uw2OXLXgm/wAfv3PWyniLM8jnzYGs4rqt4v1i9Pnueu6J+1vfwoqatoUF0wHMtpKYiT/utkfrXyVfhOlJ3o1WvVX/ACsfreC8WsRFJY3DKXnFtfg7nQQftdaS0sayaBeohIDMs6MR9BjmuJ8J1rXjUTfoz3oeLOClJc2Fml11T/CyPa9A8QWXirRrXUtPk86zuk3xvjHHoR2I6EV8ViKFTDVJUaitKJ+0Zfj8PmeGhi8LLmhNXT/rqtmu5578c/hCPiDoy3lgFXXbNT5JPSdOpjJ/kexPvXv5Jmzy+pyVH+7lv5Pv/mfn3HPCS4hw3t8Ov39NO395fy/5fd1Pjq5t5bSeSGeNopY2KPHICGQg4Kkeo6V+vxkqkeaL0Z/INSnOhN06itJaNPR3W9z3f4NftDnRoYNF8USvJYphINQOWaEdlfuyjsRyPevhc44e9tJ4nCJcz3j39PP8z904O8Qng4QwGbtuC0jPdxXRS6tdnuvQ+m7K/g1C1iuLaaO4t5V3JLE4ZWHqCOtfm0oypy5Zpp9nuf0rRrUq9ONWjJSi9U07pryZYqTcWgAoAKACgAoAKACgAoAKACgBDxQBDcXkVpFJLPIkMUY3PJIwVVHuT0pxTm+WKuzKpVhRi51GoxW7eiXzPCfid+05Yaakun+FQmoXgyp1BxmGM+qD+M+/3frX3GW8NVKrVTGe6v5evz7H4bxN4mYfCqWGyf8AeT/nfwr0/m9dvU+atW1q+1/UJr7ULmW8vJTueaZskn/D26DsK/SKVGnh4KnTXLFdFt/X5n83YvG4jH1pYjFTc5y3b/rS3T8D0f4P/BG+8fzx6hfh7Lw+h5lHyvcY6rH7erdvft83nGd08BH2VP3qnbovN+fZH6NwfwTiM/msTiU4YdPfZyt0j5d5dOl2fXul6Ra6NYW9lZQR2trAgSOKNcBVHavyarVqV5upUd5PVvuf1xhcLQwdGGHw8VGEVZJdEXqzOoKACgAoAKACgAoAKACgAoAKACgAoARlDDB6UAc/4u8C6H41sxbaxYR3ijhHPEif7rDkV3YTG4jAz56Erfk/VHg5rkeX53S9ljqSmuj6r0a1R4R4t/ZOlWR5fDurq6dRa6gNrD2DqMH8QPrX2+E4rTSjiqdvOP8Ak/8AM/Dc28KKl3PK691/LPf/AMCWj+aXqeaan8CfHOlSFX0C4uAP47UrKD+Rr6WnnmX1dqqXrdfmfmuK4F4gwrtLCuXnG0vyZn2vwp8YXU6xR+G9SDE4AeEgA/U8CuieaYGK5pVo/eebT4UzyrNQjg53/wALX4ux9h/CzwjN4H8EaVpFw4e5hRml2nKh2JYgH0GcV+Q5li1jsXOvFWT29Fof2DwxlM8kymhgarvKKu/Vu7XyvY65lDjBryz6s8l+MvwKtPH6NqemtHY68q8uRiO5A6K+O/o35+31OUZ5PL2qVX3qf4r0/wAj8n4x4GoZ+ni8I1DEJfKf+Ls+z+T6W+Tdc0HUPDOoy6fqdpLZXcf3opBg49Qe49xwa/V8PXpYmCq0HzJ/j/kfyljsvxOWV5YbFwcJrdP+tV5rQ3PBHxS8Q/D6fOl3ZNqTl7Kcb4X/AOA9j7jBrgxuV4XMV++jr3W/3/5nt5JxTmnD8/8AY6nu9YvWL+XT1VmfQvg39qTQNZWKDW4JNEujwZeZLcn13DlfxHHrX5/jOGcTQvKg+ddtn/l+J/QWTeJ+W41KnmEXRn33h9+6+a07s9c0jxBp2v2yz6bfW99CQDvt5A4H1x0/GvlK1Crh3y1YuL80frGEx+Fx8PaYSrGce8Wn+X6l9X3HHtWJ6A6gAoAKACgAoAKAGF8NigDJ13xdpHhmBptW1G109AM/v5Qp/AdT+VdVDC18S7UYOXojycdmuByyPPjK0YLzevyW7+R5B4x/ar0jT1kg8P2Mmqz4IFxPmKEH2H3m/T619dg+Fq9S0sVLlXZav/JfifkWceKeBw6cMspurL+Z+7H/AOSf4ep4F4z+J/iPx9Kf7W1B3t+q2kX7uFP+Ajr9Tmvu8HlmFwC/cw177v7z8GzjifNM+lfGVW49IrSK+XX53Zgabpd5rV7FZ2NrLd3UhwkMCFmY/QV31asKEHOpKy3u9EeBhsJWxlWNDDQc5y2SV2z6J+Fv7MyWpi1LxdtllHzR6ZG2UU9vMYdf90cepNfnuacSylelgdF/N/l/mf0Nwt4ZqlbF51q91TWq/wC331/wrTu+h9CQW0cEKRxIsUSDaqIAFUDoAO1fn7bk229T+gYQjTioQVktl0S9Cag0FoAKACgAoAKACgAoAKACgAoAKACgAoAKAEIB60AG0elABtHpQAbRSsgE2DjjpVXAdSAQqGxkZxQBzfjPwFonjuy+yavYpcKo/dyj5ZIz6qw5H8vau7CY6vgZ89CVu/Z/I+ezjIcuz2l7DHUlK2z2a9GtV+Xkz5y8cfsva1ozSXHh+ZdZtBkiB8JcKPTH3W/Ag+1fomB4nw9ZKOJXK+/T/NfkfztnfhhmGEvVy2XtodnpP/J/evQ8c1LTLzR7p7a+tJ7K5U8xXEZRx9Qea+wp1KdWPNTkmu6eh+O4jDV8JUdHEQcJrdNNP7nYZZajdabOJrS5ltZl5EkLlGB+oqp04VFyzSa8yKGJr4WftKE3CXdNp/gd5oXx+8c6EAq6099EP4L6NZs/8CPzfrXhVsgy+t/y7s/LT/gfgfdYHj7iHBaLEua7TSl+L978TuNM/a31qBVXUNEsro92gkaIn8DurxKvClB/w6jXrZ/5H3GF8WMdBJYnDRl6Nx/zOntP2udGfH2nQ76I/wDTKRHH9DXmz4Trr4Kqf3/8E+mpeLOAf8XDTXo4v/I1U/ar8IkDfbaqh/691P8A7NXI+F8ctpR+9/5HqR8U8ja1hUX/AG6v/khJf2rPCKqSlrqjkdvIUf8As1NcLY17yj97/wAhT8VMkS92FR/Jf/JGVdftc6Qmfs2g303p5sqJ/jXXHhOu/iqpfJnlVfFnBK/ssNN+rS/zOY1X9rjWp1ZdP0WytfR55GlP5DbXpUuFMOn+8qN+Ssv8z5nFeLGPmmsNh4R9W5f5HCa/8ePG/iDcsmty2kJ/5Z2KiED2yvzfrXuUMiy/D6qld+ev/A/A+Gx/HfEGPup4lwXaFo/itfxOEuLqa7mMs8rzynkvIxZvzNe5GMYK0VY+FqValaTnUk231buy3ougaj4iulttMsrjULhj/q7eMufx9PqaxrYilh489aSiu7Z2YPAYvMKqo4Sm5y7JN/lsvU9n8Ffsr6pqJjn8R3a6Xbnk2luRJMR6E/dX9a+NxvFFGF4YWPM+70X/AAfwP2XJfC3GYhxq5pUVOP8AKtZffsvxPoPwb8P9B8DWpg0fTo7YsPnnPzSyf7znk/Tp7V8Di8wxOOnzV538un3bfqfv+T5Bl2RU/ZYGko93vJ+r3+W3kdJsGelcB9ELQAtABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFACYoAMCgDJ1zw3pfiS3MOqadb6hFggLcRBsfQnkfhXRQxNbDS5qM3F+TPNxuXYPMYezxdJTX95J29Ox5j4g/Zf8ACWql3sWu9IlY5xBJvQf8BbPH0NfTYfifG0lapaS+5/gfmWYeGOS4q8sPzUn5O6+5/ozz3WP2Sdbtyf7M1qyvVxnbcI8LfTjcP1FfQUuK8PL+NTa9LP8AyPz3F+E2YU9cJiITX95OL/DmX4nG6l+z3470zJ/sU3Sj+K1mR8/hnNexT4gy6pp7S3qmj4/E+H3EWG/5h+Zf3ZJ/rf8AA5y9+HHirTz/AKR4d1OID1tmP8hXoQzDB1PgrR+9HztbhzOMN/Fwk1/26zMbw1qyH5tKvU+ts4/pXT9Zo/zr70ee8sxy3oz/APAZf5Cx+GdXkIC6VfN6AWsn+FDxNFbzX3oFlmOeioz/APAZf5GrZ/DXxXqH/Hv4c1KT/t2YfzrlnmWDp/FWj96PRocNZziP4eEqP/t1/qjotM/Z58d6kARowtEP8V1OkePwyT+ledV4gy+n/wAvL+ib/wCAfRYbw94ixP8AzD8q/vOK/C9/wO10T9kjVJtr6vrlraL3jtImmOPTJ2j+deNW4sox0oU2/Wy/zPtMD4TYydnjcTGK7RTk/vfKl+J6N4d/Zp8HaIQ9zbz6xKP4r2T5f++FwPzr5zE8SY6vpBqC8v8ANn6Rl/htkWC1qxdV/wB56fcrI9O0vSbPRrZbaxtIbOBekcEYRfyH86+bqValWXNUk2/N3P0nDYXD4OmqWGpqEV0SSX4F3ArM6wxQAtABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAmM0AGKBWEx9fzoCwY6dfzoCwuKBhjFAC0AFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFABQAUAFAH/2Q=="
 
+@st.cache_resource(show_spinner=False)
 def _img_from_b64(b64: str) -> bytes:
-    """Decode base64 safely; if invalid, return a 1x1 transparent PNG."""
+    """Decode base64 safely; if invalid, return a 1x1 transparent PNG. Cached for the process:
+    reruns do not decode and verify the embedded logos again."""
     import base64 as _b64
     _FALLBACK = _b64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAwMCAO6hC+UAAAAASUVORK5CYII=")
     try:
@@ -80,243 +83,16 @@ with col_title:
     st.title("🧭 Localizador multigremio — Google Places v1 + OSM (v2)")
     st.caption("Horarios, ratings/opiniones, emails mejorados, dashboard, login, logos embebidos.")
 
-# ---------- Models & Utils ----------
-@dataclass
-class Business:
-    gremio: str
-    name: str
-    street: Optional[str] = None
-    phone: Optional[str] = None
-    email: Optional[str] = None
-    website: Optional[str] = None
-    rating: Optional[float] = None
-    reviews: Optional[int] = None
-    lat: Optional[float] = None
-    lon: Optional[float] = None
-    source: str = "Google"
-    place_id: Optional[str] = None
-    open_now: Optional[bool] = None
-    open_today: Optional[str] = None
-    google_maps: Optional[str] = None
-
-    def full_address(self) -> str:
-        return self.street or ""
-
-HEADERS_HTML = {"User-Agent":"localizador-custom/2.0","Accept":"text/html,application/json"}
-EMAIL_REGEX = re.compile(r"[A-Z0-9._%+\-]+@[A-Z0-9.\-]+\.[A-Z]{2,}", re.I)
-PHONE_REGEX = re.compile(r"(?:\+?\d{1,3}[\s\.-]?)?(?:\(?\d{2,4}\)?[\s\.-]?)?\d{3,4}[\s\.-]?\d{3,4}")
-OBFUSCATED_EMAIL = re.compile(r"([A-Z0-9._%+\-]+)\s*[\[\(]?at[\]\)]\s*([A-Z0-9.\-]+)\s*[\[\(]?dot[\]\)]\s*([A-Z]{2,})", re.I)
-
-def normalize_domain(url: Optional[str]) -> Optional[str]:
-    if not url: return None
-    if not re.match(r"^https?://", url, re.I): url = "http://" + url
-    ext = tldextract.extract(url)
-    return ".".join([p for p in [ext.domain, ext.suffix] if p]) if ext.domain else None
-
-def dedupe_businesses(items: List[Business]) -> List[Business]:
-    seen=set(); out=[]
-    for b in items:
-        k=(re.sub(r"\W+","",b.name.lower()) if b.name else "",
-           normalize_domain(b.website) if b.website else None,
-           b.phone or "", b.email or "")
-        if k in seen: continue
-        seen.add(k); out.append(b)
-    return out
-
-def fetch_html(url: str, timeout: int = 20):
-    try:
-        r = requests.get(url, headers=HEADERS_HTML, timeout=timeout, allow_redirects=True)
-        if r.status_code == 200 and "text/html" in r.headers.get("Content-Type",""):
-            return r.text
-    except requests.RequestException:
-        return None
-    return None
-
-def _same_domain(base: str, href: str) -> bool:
-    try:
-        b = urlparse(base).netloc.split(":")[0].lower()
-        h = urlparse(href).netloc.split(":")[0].lower()
-        if not h:  # relative
-            return True
-        return b.endswith(h) or h.endswith(b) or b == h
-    except Exception:
-        return False
-
-def _extract_emails_phones_from_html(html: str) -> Tuple[list, list]:
-    emails = set(EMAIL_REGEX.findall(html or ""))
-    for m in re.findall(r'href=["\']mailto:([^"\']+)["\']', html or "", flags=re.I):
-        emails.add(m.split("?")[0])
-    for a,b,c in OBFUSCATED_EMAIL.findall(html or ""):
-        emails.add(f"{a}@{b}.{c}")
-    phones = [re.sub(r"\s+"," ",p.strip()) for p in PHONE_REGEX.findall(html or "")]
-    return sorted(emails), phones
-
-def guess_contact_pages(website: str) -> List[str]:
-    if not website: return []
-    if not website.lower().startswith(("http://","https://")):
-        website = "http://" + website
-    base = website.rstrip("/")
-    paths = ["", "/", "/contacto", "/contact", "/aviso-legal", "/legal", "/privacidad", "/privacy", "/quienes-somos", "/about", "/empresa"]
-    out=[]; seen=set()
-    for p in paths:
-        from urllib.parse import urljoin
-        u = urljoin(base + "/", p.lstrip("/"))
-        if u not in seen:
-            out.append(u); seen.add(u)
-    return out
-
-def extract_email_from_site(website: str, delay: float = 0.8, max_pages: int = 8):
-    if not website: return None, None
-    if not website.lower().startswith(("http://","https://")):
-        website = "http://" + website
-    base = website.rstrip("/")
-    queue = guess_contact_pages(base)
-    seen = set(queue)
-    best_email = None; best_phone = None; pages = 0
-    while queue and pages < max_pages:
-        url = queue.pop(0)
-        html = fetch_html(url); pages += 1
-        if not html: time.sleep(delay); continue
-        emails, phones = _extract_emails_phones_from_html(html)
-        if phones and not best_phone:
-            import re as _re
-            def _digits(x): return len(_re.sub(r"\D","",x))
-            best_phone = sorted(set(phones), key=_digits)[-1]
-        if emails and not best_email:
-            best_email = sorted(set(emails), key=len)[0]
-        for href in re.findall(r'href=["\']([^"\']+)["\']', html or "", flags=re.I):
-            from urllib.parse import urljoin
-            nxt = urljoin(url, href)
-            if nxt in seen: continue
-            if not _same_domain(base, nxt): continue
-            if any(s in nxt.lower() for s in ["/wp-json", "/feed", "/tag/", "/category/", "tel:", "mailto:"]):
-                continue
-            seen.add(nxt); queue.append(nxt)
-        if best_email and best_phone: break
-        time.sleep(delay)
-    return best_email, best_phone
-
-# ---------- Geocoding ----------
-NOMINATIM_URL="https://nominatim.openstreetmap.org/search"
-def geocode_one(q:str):
-    r=requests.get(NOMINATIM_URL, params={"q":q,"format":"jsonv2","limit":1,"addressdetails":1},
-                   headers=HEADERS_HTML, timeout=30); r.raise_for_status()
-    data=r.json()
-    if not data: raise RuntimeError(f"No se pudo geocodificar '{q}'.")
-    return data[0]
-def geocode_latlon(q:str)->Tuple[float,float]:
-    d=geocode_one(q); return float(d["lat"]), float(d["lon"])
-def geocode_bbox(q:str)->Tuple[float,float,float,float]:
-    d=geocode_one(q); bb=d.get("boundingbox")
-    if not bb or len(bb)<4: raise RuntimeError("No se obtuvo bounding box de la provincia.")
-    south,north,west,east=map(float,bb); return south,north,west,east
-
-# ---------- Google Places v1 ----------
-V1_BASE="https://places.googleapis.com/v1"
-GREMIO_TO_TYPES = {
-    "Fontaneros": ["plumber"],
-    "Electricistas": ["electrician"],
-    "Cerrajeros": ["locksmith"],
-    "Reparación de electrodomésticos": ["appliance_store", "electronics_store", "home_goods_store"],
-    "Carpinteros": ["carpenter"],
-    "Pintores": ["painter"],
-    "Dentistas": ["dentist"],
-    "Abogados": ["lawyer"],
-    "Fisioterapeutas": ["physiotherapist"],
-    "Psicólogos": ["psychologist"],
-    "Informáticos": ["electronics_store", "computer_store"],
-}
-
-def _post_json(url, headers, body, timeout=30):
-    try:
-        r = requests.post(url, headers=headers, json=body, timeout=timeout)
-        if r.status_code != 200:
-            try: err = r.json()
-            except Exception: err = r.text[:800]
-            msg = f"HTTP {r.status_code} at {url.split('/')[-1]}: {err}"
-            if st.session_state.get("diagnostico"): st.error(msg)
-            return None, {"status":"ERROR","error":msg}
-        return r.json(), {}
-    except requests.RequestException as e:
-        msg = f"RequestException at {url.split('/')[-1]}: {e}"
-        if st.session_state.get("diagnostico"): st.error(msg)
-        return None, {"status":"ERROR","error":msg}
-
-def v1_text_search(query:str, location:Optional[Tuple[float,float]]=None, radius_m:Optional[int]=None,
-                   language:str="es"):
-    key=google_api_key()
-    if not key: return [], {"status":"NO_KEY"}
-    headers={
-        "X-Goog-Api-Key": key,
-        "X-Goog-FieldMask": (
-            "places.id,places.displayName,places.formattedAddress,places.location,"
-            "places.nationalPhoneNumber,places.websiteUri,places.rating,places.userRatingCount,"
-            "places.googleMapsUri,places.currentOpeningHours,places.regularOpeningHours"
-        ),
-        "Content-Type": "application/json"
-    }
-    body={"textQuery":query,"languageCode":language,"regionCode":"ES"}
-    if location and radius_m:
-        body["locationBias"]={"circle":{"center":{"latitude":location[0], "longitude":location[1]},"radius":float(radius_m)}}
-    data, meta_err = _post_json(f"{V1_BASE}/places:searchText", headers, body, timeout=30)
-    if data is None:
-        return [], meta_err
-    return data.get("places",[]) or [], (data or {})
-
-def v1_nearby(center: Tuple[float,float], radius_m: int, include_types: list, language: str = "es"):
-    key = google_api_key()
-    if not key: return [], {"status": "NO_KEY"}
-    if not include_types: return [], {"status": "SKIPPED_NO_TYPES"}
-    headers = {
-        "X-Goog-Api-Key": key,
-        "X-Goog-FieldMask": (
-            "places.id,places.displayName,places.formattedAddress,places.location,"
-            "places.nationalPhoneNumber,places.websiteUri,places.rating,places.userRatingCount,"
-            "places.googleMapsUri,places.currentOpeningHours,places.regularOpeningHours"
-        ),
-        "Content-Type": "application/json",
-    }
-    body = {
-        "maxResultCount": 60,
-        "languageCode": language,
-        "rankPreference": "POPULARITY",
-        "locationRestriction": {
-            "circle": {
-                "center": {"latitude": center[0], "longitude": center[1]},
-                "radius": float(radius_m),
-            }
-        },
-        "includedPrimaryTypes": include_types,
-    }
-    data, meta_err = _post_json(f"{V1_BASE}/places:searchNearby", headers, body, timeout=30)
-    if data is None:
-        return [], meta_err
-    return data.get("places", []) or [], (data or {})
-
-def _opening_text(place: Dict[str, Any]) -> Tuple[Optional[bool], Optional[str]]:
-    oh = place.get("currentOpeningHours") or {}
-    open_now = oh.get("openNow")
-    weekday = oh.get("weekdayDescriptions") or []
-    try:
-        today_idx = datetime.datetime.today().weekday()
-        today_line = weekday[today_idx] if 0 <= today_idx < len(weekday) else (weekday[0] if weekday else None)
-    except Exception:
-        today_line = weekday[0] if weekday else None
-    return open_now, today_line
-
-def v1_to_business(p:Dict[str,Any], gremio:str)->Business:
-    name=(p.get("displayName") or {}).get("text") if isinstance(p.get("displayName"), dict) else p.get("displayName")
-    addr=p.get("formattedAddress")
-    phone=p.get("nationalPhoneNumber")
-    web=p.get("websiteUri")
-    rating=p.get("rating"); reviews=p.get("userRatingCount")
-    loc=p.get("location") or {}; lat=loc.get("latitude"); lon=loc.get("longitude")
-    pid=p.get("id")
-    gmaps = p.get("googleMapsUri")
-    open_now, today_text = _opening_text(p)
-    return Business(gremio=gremio, name=name or "", street=addr, phone=phone, website=web,
-                    rating=rating, reviews=reviews, lat=lat, lon=lon, source="Google", place_id=pid,
-                    open_now=open_now, open_today=today_text, google_maps=gmaps)
+# widgets de "Filtrar tabla" y paginación: empiezan de cero con cada conjunto de resultados
+TABLE_FILTER_KEYS = ("f_gremios", "f_rating", "f_email", "f_text", "f_page_size", "f_page")
+
+def _set_results(df: pd.DataFrame):
+    """Result table on display and its hash, computed once here instead of on every rerun;
+    the table filters start over with each new result set. Sessions showing the same results
+    keep a reference to one shared table (the ResultView's) instead of a copy each."""
+    key = result_hash(df)
+    st.session_state.df = result_view(df, key).df; st.session_state.df_key = key
+    for k in TABLE_FILTER_KEYS: st.session_state.pop(k, None)
 
 # ---------- Sidebar (parámetros) ----------
 with st.sidebar:
@@ -328,12 +104,21 @@ with st.sidebar:
     extra_keywords = [k.strip() for k in extra_kw_text.split(",") if k.strip()]
 
     fuente=st.selectbox("Fuentes", ["Google Places","OSM","Ambas"], index=0)
+    osm_url=None; osm_pbf=None
+    if fuente in ("OSM","Ambas"):
+        osm_url=st.text_input("Servidor Overpass", OVERPASS_URL,
+                              help="Una instancia local evita los límites del servidor público")
+        osm_pbf=st.text_input("Extracto .osm.pbf (ruta local, opcional)", "",
+                              help="Si se indica, se lee el fichero (requiere pyosmium) en lugar de Overpass").strip() or None
     modo=st.radio("Modo de zona", ["Provincia","Códigos postales","Radio"], index=0)
 
     provincia=None; postcodes=None; centro=None; radio_km=None; grid_km=None; pc_radio_km=None
+    malla_adaptativa=False; celda_min_km=None
     if modo=="Provincia":
         provincia=st.text_input("Provincia","Madrid")
         grid_km=st.number_input("Malla/Radio (km)", 5.0, 80.0, 25.0, 5.0)
+        malla_adaptativa=st.checkbox("Malla adaptativa (subdivide solo zonas densas)", value=True)
+        celda_min_km=st.number_input("Celda mínima (km)", 1.0, 20.0, 3.0, 1.0, disabled=not malla_adaptativa)
     elif modo=="Códigos postales":
         postcodes=[pc.strip() for pc in st.text_input("CPs (espacios)","28001 28012 28932").split() if pc.strip()]
         pc_radio_km=st.number_input("Radio (km) por CP", 1.0, 20.0, 4.0, 1.0)
@@ -344,16 +129,51 @@ with st.sidebar:
     st.subheader("Google API (v1)")
     st.text_input("GOOGLE_API_KEY", value=os.getenv("GOOGLE_API_KEY",""), key="google_api_key_ui", type="password")
     idioma=st.selectbox("Idioma", ["es","en"], index=0)
+    google_qps=st.number_input("Peticiones por segundo (QPS)", 1.0, 50.0, 5.0, 1.0)
+    google_max_req=st.number_input("Máx. peticiones por búsqueda (0 = sin límite)", 0, 100000, 0, 100)
+    google_budget_usd=st.number_input("Presupuesto Google por búsqueda (USD, 0 = sin límite)", 0.0, 10000.0, 0.0, 5.0)
+    google_two_phase=st.checkbox("Barrido en dos fases (IDs y después detalles solo de negocios nuevos)", value=False,
+                                 help="Abarata mallas solapadas: cada negocio se pide completo una sola vez")
+    google_combine=st.checkbox("Una búsqueda cercana por celda para todos los gremios", value=True,
+                               help="Reparte los resultados por tipo de negocio; si vuelve llena se repite por gremio")
+    google_learn=st.checkbox("Omitir palabras clave que no aportan en la zona", value=True,
+                             help="Aprende de búsquedas anteriores qué variantes (SAT, urgencias...) traen negocios nuevos")
     diagnostico=st.checkbox("Mostrar diagnóstico", value=False, key="diagnostico")
+    guardar_traza=st.checkbox("Guardar traza JSONL en salidas/", value=False, disabled=not diagnostico)
 
     st.subheader("Email desde web")
     scrape_email=st.checkbox("Intentar obtener email/teléfono desde la web", value=True)
-    scrape_delay=st.slider("Delay scraping (s)", 0.2, 3.0, 0.8, 0.1)
+    scrape_delay=st.slider("Delay por dominio (s)", 0.2, 3.0, 0.8, 0.1)
+    scrape_workers=st.slider("Webs en paralelo", 1, 32, 8, 1)
+    scrape_budget_min=st.number_input("Tiempo máximo scraping (min, 0 = sin límite)", 0, 240, 20, 5)
+
+    tabla_offline=st.file_uploader("Tabla offline de CPs/provincias (CSV)", type=["csv"],
+                                   help="Columnas: clave,lat,lon[,south,north,west,east]")
+
+    st.subheader("Caché local")
+    usar_cache=st.checkbox("Reutilizar respuestas guardadas (Google, Nominatim, webs)", value=True)
+    forzar_refresco=st.checkbox("Forzar refresco (ignorar caché)", value=False)
+    if usar_cache and st.button("Vaciar caché"):
+        ResponseCache().clear(); st.success("Caché vaciada")
+
+    st.subheader("Base local de negocios")
+    usar_base=st.checkbox("Guardar y actualizar los resultados en la base local", value=True,
+                          help="Las búsquedas repetidas solo vuelven a rastrear las webs nuevas o antiguas")
+    dias_reenriquecer=st.number_input("Volver a rastrear webs con más de (días)", 1, 365, 30, 1, disabled=not usar_base)
+    if usar_base and st.button("Ver base completa"):
+        _set_results(BusinessStore().to_df())
 
     st.subheader("Salida")
     base_filename = st.text_input("Nombre base del fichero", "resultado")
     st.session_state.base_filename = base_filename
     save_latest = st.checkbox("Guardar también *_latest", value=True)
+    save_parquet = st.checkbox("Guardar también Parquet", value=False, disabled=not parquet_available())
+    reanudar = st.checkbox("Reanudar búsquedas interrumpidas", value=True,
+                           help="Con los mismos parámetros, continúa donde se quedó sin repetir consultas ni webs")
+    en_segundo_plano = st.checkbox("Ejecutar en segundo plano (cola compartida)", value=True,
+                                   help="La búsqueda se encola y la app sigue respondiendo; todas las búsquedas "
+                                        "comparten un único límite de peticiones a Google. Desmárcalo para verla "
+                                        "en directo con el diagnóstico.")
 
     lanzar=st.button("🔎 Buscar")
 
@@ -366,234 +186,269 @@ def _step_progress(ph_title, bar, ph_detail, step, total, msg=""):
     ph_title.info(f"🔥 estamos buscando a fuego... {pct}%"); bar.progress(pct)
     if msg: ph_detail.write(msg)
 
-# ---------- Search orchestration ----------
-def grid_over_bbox(south,north,west,east,step_km):
-    pts=[]; lat_step=step_km/111.0; mid=(south+north)/2.0; lon_step=step_km/(111.0*max(0.1, math.cos(math.radians(mid))))
-    lat=south
-    while lat<=north:
-        lon=west
-        while lon<=east:
-            pts.append((lat,lon)); lon+=lon_step
-        lat+=lat_step
-    return pts
-
-def build_queries(g:str, provincia:Optional[str], extras:List[str])->List[str]:
-    out=[]
-    if provincia:
-        out.append(f"{g} en {provincia}")
-        for kw in extras: out.append(f"{g} {kw} en {provincia}")
-    else:
-        out.append(g)
-        for kw in extras: out.append(f"{g} {kw}")
-    return out
-
-def google_run_v1(gremio:str, center:Tuple[float,float], radius_km:float, provincia:Optional[str],
-                  extras:List[str], idioma:str):
-    allres=[]; first_meta={}
-    for q in build_queries(gremio, provincia, extras):
-        res, meta = v1_text_search(q, location=center, radius_m=int(radius_km*1000), language=idioma)
-        if not first_meta: first_meta=meta
-        allres+=res; time.sleep(0.2)
-    if len(allres)<30:
-        include_types = GREMIO_TO_TYPES.get(gremio, [])
-        try:
-            res2, meta2 = v1_nearby(center, int(radius_km*1000), include_types, idioma)
-            allres+=res2;  first_meta = first_meta or meta2
-        except requests.HTTPError:
-            pass
-    return allres, first_meta
-
-# ---------- Run ----------
-if lanzar:
-    items: List[Business] = []
-
-    total_steps = 1
-    if fuente in ("Google Places","Ambas"):
-        if modo=="Provincia":
-            s,n,w,e = geocode_bbox(f"{provincia}, España")
-            pts = grid_over_bbox(s,n,w,e,grid_km or 25.0)
-            total_steps = len(gremios) * len(pts)
-        elif modo=="Códigos postales":
-            total_steps = len(gremios) * len(postcodes or [])
-        else:
-            total_steps = len(gremios)
-    ph_title, bar, ph_detail, total = _prepare_progress(total_steps); step = 0
-
-    if fuente in ("Google Places","Ambas"):
-        if modo=="Provincia":
-            south,north,west,east = geocode_bbox(f"{provincia}, España")
-            for g in gremios:
-                for c in grid_over_bbox(south,north,west,east,grid_km or 25.0):
-                    res, meta = google_run_v1(g, c, grid_km or 25.0, provincia, extra_keywords, idioma)
-                    for r in res: items.append(v1_to_business(r,g))
-                    step += 1; _step_progress(ph_title, bar, ph_detail, step, total, f"Provincia {provincia} · {g}")
-        elif modo=="Códigos postales":
-            for pc in (postcodes or []):
-                lat,lon=geocode_latlon(f"{pc}, España")
-                for g in gremios:
-                    res, meta=google_run_v1(g, (lat,lon), pc_radio_km or 4.0, None, extra_keywords, idioma)
-                    for r in res: items.append(v1_to_business(r,g))
-                step += 1; _step_progress(ph_title, bar, ph_detail, step, total, f"CP {pc}")
-        else:
-            lat,lon=geocode_latlon(centro or "Madrid, España")
-            for g in gremios:
-                res, meta=google_run_v1(g, (lat,lon), radio_km or 5.0, None, extra_keywords, idioma)
-                for r in res: items.append(v1_to_business(r,g))
-                step += 1; _step_progress(ph_title, bar, ph_detail, step, total, f"Radio {radio_km} km · {g}")
-
-    items = dedupe_businesses(items)
-
-    if scrape_email and items:
-        extra_total = len(items); total += extra_total
-        for i, b in enumerate(items, 1):
-            if not b.email and b.website:
-                try:
-                    email, phone = extract_email_from_site(b.website, delay=scrape_delay, max_pages=8)
-                    if email: b.email = email
-                    if phone and not b.phone: b.phone = phone
-                except Exception:
-                    pass
-            step += 1; _step_progress(ph_title, bar, ph_detail, step, total, f"Emails desde web ({i}/{extra_total})")
-
-    df = pd.DataFrame([{
-        "Gremio": b.gremio,
-        "Nombre": b.name,
-        "Dirección": b.full_address(),
-        "Teléfono": b.phone,
-        "Email": b.email,
-        "Web": b.website,
-        "Rating": b.rating,
-        "Opiniones": b.reviews,
-        "AbiertoAhora": b.open_now,
-        "HorarioHoy": b.open_today,
-        "GoogleMaps": b.google_maps,
-        "Lat": b.lat, "Lon": b.lon,
-        "Fuente": b.source
-    } for b in items])
-
-    # Persistir resultados para no perderlos tras descargas/reruns
-    st.session_state.df = df
-    st.session_state.busqueda_meta = {
-        "timestamp": datetime.datetime.now(),
-        "modo": modo, "provincia": provincia, "postcodes": postcodes,
-        "centro": centro, "radio_km": radio_km, "grid_km": grid_km,
-        "gremios": gremios, "extras": extra_keywords, "n": len(df),
-    }
-    hist = st.session_state.get("historial_busquedas", [])
-    hist.append({"ts": st.session_state.busqueda_meta["timestamp"], "resultado": len(df), "gremios": ",".join(gremios)})
-    st.session_state.historial_busquedas = hist[-20:]  # últimas 20
-
-    st.success(f"Resultados: {len(df)}")
-    # --- Dashboard ---
+LIVE_REFRESH_S = 1.0  # como mucho un repintado por segundo de la tabla/mapa en vivo
+
+def _prepare_live():
+    ph_count = st.empty(); ph_map = st.empty(); ph_table = st.empty()
+    return {"count": ph_count, "map": ph_map, "table": ph_table, "last": 0.0}
+def _render_live(live, items: List[Business], force: bool = False):
+    now = time.monotonic()
+    if not items or (not force and now - live["last"] < LIVE_REFRESH_S): return
+    live["last"] = now
+    df_live = businesses_to_df(items)
+    live["count"].caption(f"Resultados provisionales: {len(df_live)} negocios")
+    df_map = df_live[["Lat","Lon"]].dropna()
+    if not df_map.empty: live["map"].map(df_map.rename(columns={"Lat":"lat","Lon":"lon"}))
+    live["table"].dataframe(df_live, use_container_width=True)
+def _clear_live(live):
+    for k in ("count", "map", "table"): live[k].empty()
+
+PAGE_SIZES = [50, 100, 250, 500, 1000]
+
+def _show_results(df: pd.DataFrame, key: str):
+    """Summary, charts, map and one filtered page of the table, from the memoized ResultView."""
+    view = result_view(df, key); m = view.metrics()
     st.subheader("📊 Resumen")
     c1, c2, c3 = st.columns(3)
-    with c1: st.metric("Negocios", len(df))
-    with c2:
-        try: st.metric("Rating medio", round(df["Rating"].dropna().astype(float).mean(), 2))
-        except: st.metric("Rating medio", "—")
-    with c3:
-        try: st.metric("Con email", int(df["Email"].notna().sum()))
-        except: st.metric("Con email", "—")
-
-    try:
+    with c1: st.metric("Negocios", m["negocios"])
+    with c2: st.metric("Rating medio", "—" if m["rating_medio"] is None else m["rating_medio"])
+    with c3: st.metric("Con email", m["con_email"])
+    if len(df):
         st.write("Distribución de ratings")
-        bins = pd.cut(df["Rating"].astype(float), bins=[0,1,2,3,4,5], include_lowest=True)
-        st.bar_chart(bins.value_counts().sort_index())
-    except: pass
-
-    try:
+        st.bar_chart(view.rating_hist().rename(index=str))
         st.write("Negocios por gremio")
-        st.bar_chart(df["Gremio"].value_counts())
-    except: pass
+        st.bar_chart(view.by_gremio())
+    pts = view.map_points()
+    if not pts.empty:
+        grouped = len(pts) < int(pts["n"].sum())
+        st.write("Mapa de resultados" + (f" ({len(pts)} zonas agrupadas; el tamaño indica cuántos negocios)"
+                                          if grouped else ""))
+        st.map(pts, size="size")
+
+    with st.expander("🔎 Filtrar tabla", expanded=False):
+        f1, f2, f3, f4 = st.columns([3, 2, 2, 3])
+        with f1: f_gremios = st.multiselect("Gremio", view.gremios(), key="f_gremios")
+        with f2: f_rating = st.slider("Rating mínimo", 0.0, 5.0, 0.0, 0.5, key="f_rating")
+        with f3: f_email = st.radio("Email", EMAIL_FILTERS, key="f_email", horizontal=True)
+        with f4: f_text = st.text_input("Nombre o dirección contiene", key="f_text")
+    sub = view.filtered(f_gremios, f_rating, f_email, f_text)
+    p1, p2 = st.columns([1, 1])
+    with p2: size = st.selectbox("Filas por página", PAGE_SIZES, index=1, key="f_page_size")
+    pages = max(1, -(-len(sub) // size))
+    with p1: page = st.number_input(f"Página (de {pages})", 1, pages, 1, 1, key="f_page") if pages > 1 else 1
+    rows, _ = view.page(sub, page, size)
+    st.dataframe(rows, use_container_width=True)
+    first = (page - 1) * size
+    st.caption(f"Filas {first + 1 if len(rows) else 0}–{first + len(rows)} de {len(sub)}"
+               + (f" (filtradas de {len(df)})" if len(sub) != len(df) else ""))
+
+def _download_buttons(bundle, base_filename: str):
+    """CSV/Excel(/Parquet) downloads from the shared bundle: each format is serialized once per result set."""
+    cols = st.columns(3 if parquet_available() else 2)
+    with cols[0]: st.download_button("⬇️ CSV", data=bundle.csv, file_name=f"{base_filename}.csv", mime="text/csv")
+    with cols[1]: st.download_button("⬇️ Excel", data=bundle.xlsx, file_name=f"{base_filename}.xlsx",
+                                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    if len(cols) > 2:
+        with cols[2]: st.download_button("⬇️ Parquet", data=bundle.parquet, file_name=f"{base_filename}.parquet",
+                                         mime="application/vnd.apache.parquet")
+
+def _show_trace(tracer: Tracer):
+    """Per-stage timings, busy-time timeline, nested breakdown and slowest sites/cells of one run."""
+    st.write("Tiempos por etapa")
+    st.dataframe(pd.DataFrame(tracer.summary()), use_container_width=True)
+    timeline = tracer.timeline(bucket_s=max(1.0, (time.perf_counter() - tracer.t0) / 60))
+    if timeline:
+        st.area_chart(pd.DataFrame(timeline).set_index("Segundo").fillna(0.0))
+        st.caption("Segundos ocupados por etapa en cada intervalo (las tareas en paralelo se suman)")
+    st.write("Desglose anidado")
+    st.dataframe(pd.DataFrame(tracer.tree()).drop(columns="Ruta"), use_container_width=True)
+    slowest = [("Webs más lentas", tracer.slowest("web.sitio", "dominio")),
+               ("Celdas más lentas (Google)", tracer.slowest("google.consulta", "celda"))]
+    for col, (title, rows) in zip(st.columns(2), slowest):
+        with col:
+            st.write(title)
+            if rows: st.table(pd.DataFrame(rows))
+    if tracer.dropped: st.caption(f"{tracer.dropped} spans no caben en memoria (sí en el fichero)")
+    if tracer.path: st.caption(f"Traza: `{tracer.path}`")
+
+# ---------- Trabajos en segundo plano ----------
+JOBS_REFRESH_S = 2.0
+
+@st.cache_resource(show_spinner=False)
+def _job_system():
+    """Queue and in-process worker pool shared by every session of this server (no worker with
+    LOCALIZADOR_JOB_WORKERS=0: jobs are then run by `python -m localizador.jobs`)."""
+    queue = JobQueue()
+    return queue, (JobWorker(queue).start() if JOB_WORKERS > 0 else None)
+
+def _job_label(job) -> str:
+    p = job.params
+    zona = {"Provincia": p.provincia, "Códigos postales": " ".join(p.postcodes or []), "Radio": p.centro}.get(p.modo)
+    return f"#{job.id} · {', '.join(p.gremios)} · {p.modo} {zona or ''}"
+
+@st.fragment(run_every=JOBS_REFRESH_S)
+def _jobs_panel():
+    """Status of this session's jobs, refreshed on its own without rerunning the whole page."""
+    queue, _worker = _job_system()
+    jobs = queue.list(ids=st.session_state.get("trabajos", []), limit=10)
+    if not jobs: return
+    st.subheader("⏳ Mis búsquedas")
+    for job in jobs:
+        c1, c2, c3 = st.columns([5, 2, 1])
+        with c1:
+            st.progress(job.progress, text=f"{_job_label(job)} — {job.state}"
+                        + (f" ({queue.position(job.id)} delante)" if job.state == "en_cola" else ""))
+            detail = f"{job.n} negocios ({job.n_email} con email)" + (f" · {job.message}" if job.message else "")
+            st.caption(detail + (f" · ❌ {job.error}" if job.error else ""))
+        with c2:
+            if job.n and st.button("Ver resultados", key=f"ver_{job.id}"):
+                df_job = queue.to_df(job.id)
+                _set_results(df_job)
+                st.session_state.busqueda_meta = {"timestamp": datetime.datetime.now(), "trabajo": job.id,
+                                                  "gremios": job.params.gremios, "n": len(df_job),
+                                                  "job_id": job.key, "coste_google": {"coste_usd": job.cost_usd}}
+                st.rerun()
+        with c3:
+            if job.active and st.button("Cancelar", key=f"cancelar_{job.id}"):
+                queue.cancel(job.id)
 
-    try:
-        df_map = df[["Lat","Lon"]].dropna()
-        if not df_map.empty:
-            st.write("Mapa de resultados")
-            st.map(df_map.rename(columns={"Lat":"lat","Lon":"lon"}))
-    except: pass
-
-    st.dataframe(df, use_container_width=True)
-
-    # --- Downloads & Save ---
-    def to_csv_bytes(df): return df.to_csv(index=False, encoding="utf-8-sig").encode("utf-8-sig")
-    def to_excel_bytes(df):
-        wb=Workbook(); ws=wb.active; ws.title="Resultado"
-        for r in dataframe_to_rows(df,index=False,header=True): ws.append(r)
-        out=io.BytesIO(); wb.save(out); return out.getvalue()
-
-    c1,c2 = st.columns(2)
-    with c1:  st.download_button("⬇️ CSV", data=to_csv_bytes(df), file_name=f"{base_filename}.csv", mime="text/csv")
-    with c2:  st.download_button("⬇️ Excel", data=to_excel_bytes(df),
-                                 file_name=f"{base_filename}.xlsx",
-                                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-
-    out_dir=os.path.join(os.getcwd(),"salidas"); os.makedirs(out_dir, exist_ok=True)
-    stamp=datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_path=os.path.join(out_dir, f"{base_filename}_{stamp}.csv")
-    xlsx_path=os.path.join(out_dir, f"{base_filename}_{stamp}.xlsx")
-    df.to_csv(csv_path, index=False, encoding="utf-8-sig")
-    try:
-        with open(xlsx_path,"wb") as f: f.write(to_excel_bytes(df))
-    except Exception as e:
-        xlsx_path=f"(No guardado: {e})"
-    if save_latest:
-        latest_csv=os.path.join(out_dir, f"{base_filename}_latest.csv")
-        latest_xlsx=os.path.join(out_dir, f"{base_filename}_latest.xlsx")
-        try:
-            df.to_csv(latest_csv, index=False, encoding="utf-8-sig")
-            with open(latest_xlsx,"wb") as f: f.write(to_excel_bytes(df))
-        except Exception:
-            pass
-    st.info(f"📁 Guardado en:\n- CSV: `{csv_path}`\n- Excel: `{xlsx_path}`")
+# ---------- Run ----------
+def _search_params() -> SearchParams:
+    return SearchParams(
+        gremios=gremios, modo=modo, provincia=provincia, postcodes=postcodes, centro=centro,
+        radio_km=radio_km, grid_km=grid_km, pc_radio_km=pc_radio_km,
+        malla_adaptativa=malla_adaptativa, celda_min_km=celda_min_km, extras=extra_keywords,
+        fuente=fuente, idioma=idioma, google_qps=google_qps, google_max_req=google_max_req or None,
+        google_budget_usd=google_budget_usd or None, google_two_phase=google_two_phase,
+        google_combine_types=google_combine, google_learn_keywords=google_learn,
+        scrape_email=scrape_email, scrape_delay=scrape_delay, scrape_workers=scrape_workers,
+        scrape_budget_s=(scrape_budget_min or 0) * 60 or None,
+        osm_url=osm_url if osm_url and osm_url != OVERPASS_URL else None, osm_pbf=osm_pbf)
+
+if lanzar and en_segundo_plano:
+    queue, worker = _job_system()
+    owner = st.session_state.setdefault("usuario", uuid.uuid4().hex[:8])
+    params = _search_params()
+    if worker: worker.attach(params.job_id(), api_key=google_api_key(),
+                             gazetteer=load_gazetteer(tabla_offline) if tabla_offline else None)
+    job_id = queue.submit(params, owner,
+                          JobOptions(usar_base=usar_base, dias_reenriquecer=dias_reenriquecer,
+                                     reanudar=reanudar, nombre_base=base_filename, parquet=save_parquet,
+                                     save_latest=save_latest, usar_cache=usar_cache, forzar_refresco=forzar_refresco,
+                                     diagnostico=diagnostico, guardar_traza=guardar_traza))
+    st.session_state.trabajos = [job_id] + [j for j in st.session_state.get("trabajos", []) if j != job_id]
+    job = queue.get(job_id)
+    if job and job.owner != owner:
+        st.info(f"Otra sesión ya estaba haciendo esta misma búsqueda con las mismas opciones: compartes su "
+                f"trabajo #{job_id} ({job.state}).")
+    else:
+        st.success(f"Búsqueda encolada como trabajo #{job_id}. Puedes seguir usando la app mientras se ejecuta.")
+
+if "trabajos" in st.session_state: _jobs_panel()
+
+if lanzar and not en_segundo_plano:
+    params = _search_params()
+    def _on_errors(msgs):
+        if diagnostico:
+            for m in msgs: st.error(m)
+    # caché, traza y ritmo de Google solo de esta búsqueda (otras sesiones y los trabajos siguen con los suyos);
+    # se cierran también si la ejecución se corta (st.stop, error)
+    with contextlib.ExitStack() as run_scope:
+        response_cache = run_scope.enter_context(
+            using_response_cache(ResponseCache(force_refresh=forzar_refresco) if usar_cache else None))
+        checkpoint = RunCheckpoint(params.job_id(), params.meta(), resume=reanudar and not forzar_refresco)
+        if checkpoint.resumed:
+            st.info(f"♻️ Reanudando la búsqueda `{checkpoint.job_id}`: {checkpoint.resumed_units} consultas "
+                    f"y {checkpoint.resumed_sites} webs ya hechas.")
+        tracer = run_scope.enter_context(
+            using_tracer(Tracer(trace_path(checkpoint.job_id) if guardar_traza else None) if diagnostico else None))
+        if tracer: run_scope.callback(tracer.close)
+        # el ritmo elegido y, a la vez, el límite común con los trabajos y las demás sesiones
+        limiter = run_scope.enter_context(contextlib.closing(google_limiter(local_qps=google_qps)))
+        search = SearchRun(params, api_key=google_api_key(),
+                           gazetteer=load_gazetteer(tabla_offline) if tabla_offline else None,
+                           on_errors=_on_errors, checkpoint=checkpoint,
+                           store=BusinessStore(max_age_days=dias_reenriquecer) if usar_base else None,
+                           limiter=limiter)
+
+        # La zona se geocodifica una sola vez: sirve para dimensionar el progreso y para la búsqueda
+        ph_title, bar, ph_detail, total = _prepare_progress(search.plan())
+        if search.uses_google:
+            est = search.estimate()
+            st.caption(f"💶 Coste estimado Google: {est['coste_min_usd']:.2f}–{est['coste_max_usd']:.2f} USD "
+                       f"({est['texto']} búsquedas de texto + hasta {est['nearby_max']} nearby"
+                       + ("; la malla adaptativa puede añadir más" if est["ampliable"] else "")
+                       + "; sin descontar caché)"
+                       + (f" + {est['detalle_usd']:.3f} USD por negocio nuevo" if est["detalle_usd"] else ""))
+        search.on_progress = lambda step, total, msg: _step_progress(ph_title, bar, ph_detail, step, total, msg)
+
+        live = _prepare_live()
+        for _batch in search:
+            _render_live(live, search.items)
+        _clear_live(live)
+        for w in search.warnings: st.warning(w)
+
+        df = search.to_df()  # con base local: la búsqueda leída de la base (incluye emails ya conocidos)
+
+        # Persistir resultados para no perderlos tras descargas/reruns
+        _set_results(df)
+        st.session_state.busqueda_meta = {
+            "timestamp": datetime.datetime.now(),
+            "modo": modo, "provincia": provincia, "postcodes": postcodes,
+            "centro": centro, "radio_km": radio_km, "grid_km": grid_km,
+            "gremios": gremios, "extras": extra_keywords, "n": len(df), "job_id": checkpoint.job_id,
+            "coste_google": search.ledger.as_meta(),
+        }
+        hist = st.session_state.get("historial_busquedas", [])
+        hist.append({"ts": st.session_state.busqueda_meta["timestamp"], "resultado": len(df),
+                     "gremios": ",".join(gremios), "coste_usd": search.ledger.as_meta()["coste_usd"]})
+        st.session_state.historial_busquedas = hist[-20:]  # últimas 20
+
+        st.success(f"Resultados: {len(df)}")
+        _show_results(df, st.session_state.df_key)
+
+        # --- Downloads & Save ---
+        bundle = export_bundle(df, st.session_state.df_key)
+        _download_buttons(bundle, base_filename)
+
+        csv_path, xlsx_path, *rest = save_outputs(df, base_filename, save_latest=save_latest,
+                                                  parquet=save_parquet, bundle=bundle)
+        st.info(f"📁 Guardado en:\n- CSV: `{csv_path}`\n- Excel: `{xlsx_path}`"
+                + (f"\n- Parquet: `{rest[0]}`" if rest else ""))
+
+    if diagnostico:
+        with st.expander("🩺 Diagnóstico", expanded=True):
+            st.write("Geocodificación: " + ", ".join(f"{k}={v}" for k, v in search.geo.stats.items()))
+            if search.uses_osm:
+                st.write("OSM: " + ", ".join(f"{k}={v}" for k, v in search.osm_stats.items()))
+            if search.uses_google:
+                st.write(f"Google: {search.ledger.billed} peticiones facturables · "
+                         f"{search.ledger.as_meta()['coste_usd']:.2f} USD")
+                if search.ledger.summary(): st.table(pd.DataFrame(search.ledger.summary()))
+            if search.store:
+                st.write(f"Base local: {search.store.reused_sites} webs reutilizables sin rastrear · "
+                         + ", ".join(f"{k}={v}" for k, v in search.store.stats().items()))
+            st.write(f"Duplicados fusionados ({search.dedupe.unique} únicos): "
+                     + ", ".join(f"{k}={v}" for k, v in search.dedupe.merged.items()))
+            st.write("Conexiones HTTP (keep-alive compartido)")
+            st.table(pd.DataFrame(get_http_client().summary()))
+            st.write("Caché local" + (" (refresco forzado)" if forzar_refresco else ""))
+            if response_cache and response_cache.stats:
+                st.table(pd.DataFrame(response_cache.summary()))
+                st.caption(f"`{response_cache.path}` · {response_cache.size_bytes/1e6:.1f} MB")
+            else:
+                st.write("Sin actividad de caché (desactivada o sin peticiones).")
+            if tracer: _show_trace(tracer)
 
 # ---------- Re-pintar último resultado si no se lanza búsqueda ----------
 elif "df" in st.session_state and isinstance(st.session_state.df, pd.DataFrame):
     df = st.session_state.df
     st.info(f"Mostrando los últimos resultados: {len(df)} filas. (Se mantendrán hasta que busques de nuevo)")
-
-    st.subheader("📊 Resumen")
-    c1, c2, c3 = st.columns(3)
-    with c1: st.metric("Negocios", len(df))
-    with c2:
-        try: st.metric("Rating medio", round(df["Rating"].dropna().astype(float).mean(), 2))
-        except: st.metric("Rating medio", "—")
-    with c3:
-        try: st.metric("Con email", int(df["Email"].notna().sum()))
-        except: st.metric("Con email", "—")
-
-    try:
-        st.write("Distribución de ratings")
-        bins = pd.cut(df["Rating"].astype(float), bins=[0,1,2,3,4,5], include_lowest=True)
-        st.bar_chart(bins.value_counts().sort_index())
-    except: pass
-
-    try:
-        st.write("Negocios por gremio")
-        st.bar_chart(df["Gremio"].value_counts())
-    except: pass
-
-    try:
-        df_map = df[["Lat","Lon"]].dropna()
-        if not df_map.empty:
-            st.write("Mapa de resultados")
-            st.map(df_map.rename(columns={"Lat":"lat","Lon":"lon"}))
-    except: pass
-
-    st.dataframe(df, use_container_width=True)
-
-    def to_excel_bytes(df):
-        wb=Workbook(); ws=wb.active; ws.title="Resultado"
-        for r in dataframe_to_rows(df,index=False,header=True): ws.append(r)
-        out=io.BytesIO(); wb.save(out); return out.getvalue()
+    if st.session_state.get("df_key") is None: _set_results(df)
+    _show_results(df, st.session_state.df_key)
 
     base_filename = st.session_state.get("base_filename","resultado")
-    c1,c2 = st.columns(2)
-    with c1:  st.download_button("⬇️ CSV", data=df.to_csv(index=False, encoding="utf-8-sig").encode("utf-8-sig"),
-                                 file_name=f"{base_filename}.csv", mime="text/csv")
-    with c2:  st.download_button("⬇️ Excel", data=to_excel_bytes(df),
-                                 file_name=f"{base_filename}.xlsx",
-                                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    _download_buttons(export_bundle(df, st.session_state.df_key), base_filename)
 
 # ---------- Portada si no hay resultados aún ----------
 else:
@@ -614,6 +469,5 @@ else:
                 for g in [x.strip() for x in gtxt.split(",") if x.strip()]:
                     cnt[g] = cnt.get(g, 0) + 1
             if cnt:
-                import pandas as _pd
-                st.bar_chart(_pd.Series(cnt).sort_values(ascending=False))
+                st.bar_chart(pd.Series(cnt).sort_values(ascending=False))
     st.caption("Consejo: añade varias palabras clave (SAT, urgencias, 24h) para ampliar resultados.")
@@ -0,0 +1 @@
+# conftest.py — pytest desde la raíz del repositorio: `localizador` se importa sin instalarlo
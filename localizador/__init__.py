@@ -0,0 +1,32 @@
+"""Motor de búsqueda del localizador multigremio (Google Places v1, OpenStreetMap + webs), sin Streamlit.
+
+Lo usan la app (`app_google_places_custom.py`) y la línea de comandos (`python -m localizador`)."""
+from .models import Business, RESULT_COLUMNS, businesses_to_df
+from .cache import ResponseCache, get_response_cache, set_response_cache, using_response_cache
+from .geocoding import Geocoder, load_gazetteer
+from .checkpoint import RunCheckpoint
+from .osm import GREMIO_TO_OSM_TAGS, OVERPASS_URL
+from .net import HttpClient, get_http_client, set_http_client
+from .trace import Tracer, get_tracer, set_tracer, trace_path, using_tracer
+from .quota import QuotaLedger, SKU_PRICE_USD_PER_1000
+from .planner import KeywordStats, QueryPlanner
+from .store import BusinessStore
+from .engine import SearchParams, SearchRun
+from .jobs import Job, JobOptions, JobQueue, JobWorker
+from .export import (ExportBundle, export_bundle, parquet_available, result_hash, save_outputs, to_csv_bytes,
+                     to_excel_bytes, to_parquet_bytes, write_output)
+from .views import ResultView, result_view
+
+__all__ = [
+    "Business", "RESULT_COLUMNS", "businesses_to_df",
+    "ResponseCache", "get_response_cache", "set_response_cache", "using_response_cache",
+    "Geocoder", "load_gazetteer",
+    "GREMIO_TO_OSM_TAGS", "OVERPASS_URL", "QuotaLedger", "SKU_PRICE_USD_PER_1000", "KeywordStats", "QueryPlanner",
+    "HttpClient", "get_http_client", "set_http_client",
+    "Tracer", "get_tracer", "set_tracer", "trace_path", "using_tracer",
+    "BusinessStore", "RunCheckpoint", "SearchParams", "SearchRun",
+    "Job", "JobOptions", "JobQueue", "JobWorker",
+    "ExportBundle", "export_bundle", "parquet_available", "result_hash", "save_outputs",
+    "ResultView", "result_view",
+    "to_csv_bytes", "to_excel_bytes", "to_parquet_bytes", "write_output",
+]
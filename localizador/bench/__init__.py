@@ -0,0 +1,5 @@
+"""Mediciones de rendimiento del localizador (sin Streamlit ni red real).
+
+    python -m localizador.bench.extract [CARPETA_HTML ...]   extracción de contactos
+    python -m localizador.bench.search [--escenarios ...]    búsqueda completa contra servicios simulados
+    python -m localizador.bench.startup [--sin-app]          arranque del motor y reruns de la app"""
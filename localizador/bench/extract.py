@@ -0,0 +1,106 @@
+# localizador/bench/extract.py — micro-benchmark de la extracción de contactos sobre páginas guardadas
+"""Uso:
+    python -m localizador.bench.extract salidas/paginas/          # .html/.htm de una carpeta
+    python -m localizador.bench.extract --desde-cache --max 500   # páginas de la caché de respuestas
+    python -m localizador.bench.extract                           # páginas sintéticas tipo WordPress
+
+Compara el extractor actual (una pasada, acotado) con el anterior (cuatro regex sobre todo el HTML
+más otra para los enlaces) y muestra tiempo por página, MB/s y candidatos encontrados. Los formatos que
+debe reconocer se comprueban en tests/test_contacts.py."""
+from __future__ import annotations
+
+import argparse, os, random, re, statistics, sys, time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from ..cache import CACHE_PATH, ResponseCache
+from ..contacts import extract_contacts
+
+# Extractor anterior, tal cual, como referencia
+_OLD_EMAIL = re.compile(r"[A-Z0-9._%+\-]+@[A-Z0-9.\-]+\.[A-Z]{2,}", re.I)
+_OLD_PHONE = re.compile(r"(?:\+?\d{1,3}[\s\.-]?)?(?:\(?\d{2,4}\)?[\s\.-]?)?\d{3,4}[\s\.-]?\d{3,4}")
+_OLD_OBF = re.compile(r"([A-Z0-9._%+\-]+)\s*[\[\(]?at[\]\)]\s*([A-Z0-9.\-]+)\s*[\[\(]?dot[\]\)]\s*([A-Z]{2,})", re.I)
+
+def legacy_extract(html: str) -> Tuple[list, list, list]:
+    emails = set(_OLD_EMAIL.findall(html))
+    for m in re.findall(r'href=["\']mailto:([^"\']+)["\']', html, flags=re.I):
+        emails.add(m.split("?")[0])
+    for a, b, c in _OLD_OBF.findall(html):
+        emails.add(f"{a}@{b}.{c}")
+    phones = [re.sub(r"\s+", " ", p.strip()) for p in _OLD_PHONE.findall(html)]
+    links = re.findall(r'href=["\']([^"\']+)["\']', html, flags=re.I)
+    return sorted(emails), phones, links
+
+def current_extract(html: str) -> Tuple[list, list, list]:
+    found = extract_contacts(html)
+    return found.emails, found.phones, found.links
+
+def synthetic_page(rng: random.Random, kb: int = 400) -> str:
+    """WordPress-like page: inline scripts/JSON, srcset with @2x images, plenty of numbers, contact footer."""
+    parts = ["<!doctype html><html><head>"]
+    while sum(len(p) for p in parts) < kb * 1024 * 0.8:
+        n = rng.randrange(10**9, 10**10)
+        parts.append(f'<script>var wp_data={{"ts":{n},"ver":"6.{rng.randrange(9)}.{rng.randrange(9)}",'
+                     f'"nonce":"{rng.getrandbits(64):016x}","ids":[{",".join(str(rng.randrange(10**6)) for _ in range(20))}]}};</script>')
+        parts.append(f'<img src="/wp-content/uploads/2023/0{rng.randrange(1, 9)}/foto-{n}.jpg" '
+                     f'srcset="/wp-content/uploads/logo@2x.png 2x, /img/banner@3x.webp 3x" width="1200" height="800">')
+        parts.append(f'<p>Lorem ipsum {rng.randrange(1000, 9999)} dolor sit amet, entrada {n % 100000} '
+                     f'<a href="/blog/entrada-{n % 100000}/">leer más</a></p>')
+    parts.append('</head><body><footer id="colophon" class="site-footer">'
+                 '<p>Teléfono: 912 34 56 78 · Móvil: <a href="tel:+34612345678">612 345 678</a></p>'
+                 '<p><a href="mailto:info@fontaneria-ejemplo.es">info@fontaneria-ejemplo.es</a> '
+                 'o presupuestos [at] fontaneria-ejemplo [dot] es</p></footer></body></html>')
+    return "".join(parts)
+
+def load_corpus(paths: Sequence[str], from_cache: bool, limit: Optional[int], seed: int) -> List[str]:
+    pages: List[str] = []
+    for path in paths:
+        files = [path] if os.path.isfile(path) else sorted(
+            os.path.join(root, f) for root, _, names in os.walk(path) for f in names
+            if f.lower().endswith((".html", ".htm")))
+        for f in files:
+            with open(f, encoding="utf-8", errors="replace") as fh: pages.append(fh.read())
+    if from_cache:
+        if not os.path.exists(CACHE_PATH): raise SystemExit(f"No existe la caché {CACHE_PATH}.")
+        pages += list(ResponseCache(CACHE_PATH).iter_values("html", limit))
+    if not paths and not from_cache:
+        rng = random.Random(seed)
+        pages = [synthetic_page(rng, kb) for kb in (50, 200, 400, 800, 1600, 3000)]
+    return pages[:limit] if limit else pages
+
+def run(name: str, fn: Callable[[str], Tuple[list, list, list]], pages: List[str], repeat: int) -> dict:
+    per_page: List[float] = []; emails = phones = links = 0
+    for html in pages:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter(); e, p, l = fn(html); best = min(best, time.perf_counter() - t0)
+        per_page.append(best); emails += len(e); phones += len(p); links += len(l)
+    total = sum(per_page); mb = sum(len(h) for h in pages) / 1e6
+    return {"extractor": name, "total_s": total, "p50_ms": statistics.median(per_page) * 1000,
+            "max_ms": max(per_page) * 1000, "mb_s": mb / total if total else 0.0,
+            "emails": emails, "phones": phones, "links": links}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m localizador.bench.extract",
+                                 description="Micro-benchmark de la extracción de emails/teléfonos.")
+    ap.add_argument("rutas", nargs="*", help="Carpetas o ficheros .html con páginas guardadas")
+    ap.add_argument("--desde-cache", action="store_true", help="Usar las páginas de la caché de respuestas")
+    ap.add_argument("--max", type=int, default=0, help="Número máximo de páginas (0 = todas)")
+    ap.add_argument("--repeticiones", type=int, default=3, help="Se toma el mejor tiempo de N pasadas")
+    ap.add_argument("--semilla", type=int, default=7, help="Semilla de las páginas sintéticas")
+    args = ap.parse_args(argv)
+    pages = load_corpus(args.rutas, args.desde_cache, args.max or None, args.semilla)
+    if not pages:
+        print("No hay páginas que medir.", file=sys.stderr); return 2
+    print(f"{len(pages)} páginas, {sum(len(h) for h in pages) / 1e6:.1f} MB")
+    rows = [run("anterior (4+1 pasadas)", legacy_extract, pages, args.repeticiones),
+            run("actual (1 pasada)", current_extract, pages, args.repeticiones)]
+    print(f"{'extractor':<24}{'total s':>9}{'p50 ms':>9}{'max ms':>9}{'MB/s':>8}{'emails':>8}{'tel.':>8}{'enlaces':>9}")
+    for r in rows:
+        print(f"{r['extractor']:<24}{r['total_s']:>9.3f}{r['p50_ms']:>9.2f}{r['max_ms']:>9.2f}{r['mb_s']:>8.1f}"
+              f"{r['emails']:>8}{r['phones']:>8}{r['links']:>9}")
+    if rows[1]["total_s"]:
+        print(f"Aceleración: x{rows[0]['total_s'] / rows[1]['total_s']:.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
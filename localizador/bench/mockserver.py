@@ -0,0 +1,235 @@
+# localizador/bench/mockserver.py — servidor local que imita Places v1, Nominatim y webs de negocios
+from __future__ import annotations
+
+import hashlib, json, math, random, threading, time, zlib
+from functools import lru_cache
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+@dataclass
+class MockConfig:
+    """Behaviour of the stand-in services. Latencies are mean milliseconds (exponential jitter)."""
+    places_latency_ms: float = 120.0
+    nominatim_latency_ms: float = 250.0
+    site_latency_ms: float = 150.0
+    error_rate: float = 0.0          # fracción de respuestas 503/429 (reintentables)
+    result_cap: int = 20             # tope de resultados por búsqueda (Google: 20)
+    density_per_cell: float = 0.15   # negocios por celda de 0,01° (~1 km²) y tipo, de media
+    area_deg: float = 0.25           # semilado del bbox/polígono que devuelve Nominatim
+    site_ratio: float = 0.6          # fracción de negocios con web
+    contact_ratio: float = 0.7       # fracción de webs con email en la página de contacto
+    site_posts: int = 25             # enlaces de blog en cada portada
+    site_hosts: int = 8              # puertos distintos para las webs (pools/conexiones separados)
+    seed: int = 7
+
+CELL_DEG = 0.01
+_NAME_A = ["Servicios", "Talleres", "Instalaciones", "Reformas", "Grupo", "Hermanos", "Soluciones", "Taller",
+           "Asistencia", "Montajes", "Técnicos", "Estudio"]
+_NAME_B = ["García", "López", "Martín", "Sánchez", "Ruiz", "Navarro", "Iglesias", "Ortega", "Delgado", "Castro",
+           "Romero", "Vidal", "Molina", "Serrano", "Blanco", "Suárez", "Prieto", "Cano", "Marín", "Peña"]
+
+def _rng(*parts: Any) -> random.Random:
+    return random.Random(hashlib.sha1(repr(parts).encode()).hexdigest())
+
+class MockWorld:
+    """Deterministic fake businesses on a lattice of CELL_DEG cells: the same area always holds
+    the same place ids, so overlapping searches overlap like the real API."""
+    def __init__(self, cfg: MockConfig):
+        self.cfg = cfg
+
+    @staticmethod
+    def kind_code(kind: str) -> str:
+        """Three-letter code of a place type or query word; part of the place id."""
+        return "".join(c for c in kind.lower() if c.isalpha())[:3].ljust(3, "z")
+
+    def cell_places(self, ci: int, cj: int, kind: str) -> List[Dict[str, Any]]:
+        return self._cell(ci, cj, self.kind_code(kind))
+
+    @lru_cache(maxsize=500_000)
+    def _cell(self, ci: int, cj: int, kind: str) -> List[Dict[str, Any]]:
+        r = random.Random(zlib.crc32(f"{self.cfg.seed}|{ci}|{cj}|{kind}".encode()))
+        out = []
+        for k in range(int(2 * self.cfg.density_per_cell * r.random() + r.random())):
+            pid = f"M{kind}{ci}x{cj}x{k}".replace("-", "n")
+            name = f"{r.choice(_NAME_A)} {r.choice(_NAME_B)} {r.choice(_NAME_B)} {r.randint(1, 999)}"
+            out.append({"id": pid, "name": name, "lat": (ci + r.random()) * CELL_DEG, "lon": (cj + r.random()) * CELL_DEG,
+                        "kind": kind, "web": r.random() < self.cfg.site_ratio, "rating": round(r.uniform(2.5, 5), 1),
+                        "reviews": r.randint(0, 400), "phone": f"9{r.randint(10, 99)} {r.randint(100, 999)} {r.randint(100, 999)}"})
+        return out
+
+    def search(self, lat: float, lon: float, radius_m: float, kind: str) -> List[Dict[str, Any]]:
+        """Places of `kind` within the circle, nearest first, capped at result_cap."""
+        r_deg = radius_m / 111_000.0; cos = max(0.2, math.cos(math.radians(lat)))
+        found = []
+        # un círculo muy grande se muestrea solo en su centro: el tope de resultados manda igualmente
+        span_i = min(int(r_deg / CELL_DEG) + 1, 60); span_j = min(int(r_deg / cos / CELL_DEG) + 1, 60)
+        ci0, cj0 = int(math.floor(lat / CELL_DEG)), int(math.floor(lon / CELL_DEG))
+        for ci in range(ci0 - span_i, ci0 + span_i + 1):
+            for cj in range(cj0 - span_j, cj0 + span_j + 1):
+                for p in self.cell_places(ci, cj, kind):
+                    d = math.hypot((p["lat"] - lat) * 111_000.0, (p["lon"] - lon) * 111_000.0 * cos)
+                    if d <= radius_m: found.append((d, p))
+        found.sort(key=lambda t: t[0])
+        return [p for _, p in found[:self.cfg.result_cap]]
+
+    def place(self, pid: str) -> Optional[Dict[str, Any]]:
+        try:
+            ci, cj, _k = (int(x.replace("n", "-")) for x in pid[4:].split("x"))
+        except ValueError:
+            return None
+        return next((p for p in self.cell_places(ci, cj, pid[1:4]) if p["id"] == pid), None)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, *a): pass
+
+    def _send(self, code: int, body: str, ctype: str = "application/json"):
+        data = body.encode("utf-8")
+        self.send_response(code); self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data))); self.end_headers(); self.wfile.write(data)
+
+    def _delay_or_fail(self, route: str, latency_ms: float) -> bool:
+        mock = self.server.mock; mock.count(route)
+        r = random.Random()
+        if latency_ms > 0: time.sleep(r.expovariate(1.0 / (latency_ms / 1000.0)))
+        if mock.cfg.error_rate and r.random() < mock.cfg.error_rate:
+            mock.count(route + " (error)")
+            self._send(r.choice((429, 503)), json.dumps({"error": {"message": "mock"}})); return False
+        return True
+
+    def do_POST(self):
+        u = urlparse(self.path); mock = self.server.mock
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if not u.path.startswith("/v1/places:"):
+            return self._send(404, "{}")
+        route = u.path.rsplit("/", 1)[-1]
+        if not self._delay_or_fail(route, mock.cfg.places_latency_ms): return
+        circle = (body.get("locationRestriction") or body.get("locationBias") or {}).get("circle")
+        if circle:
+            lat, lon, rad = circle["center"]["latitude"], circle["center"]["longitude"], circle.get("radius", 5000.0)
+        else:
+            lat, lon, rad = 40.4168, -3.7038, 50_000.0  # sin sesgo: centro de Madrid
+        kinds = body.get("includedPrimaryTypes") or [(body.get("textQuery") or "negocio").split()[0].lower()]
+        found = []
+        for kind in kinds:
+            found += [(kind, p) for p in mock.world.search(lat, lon, float(rad), kind)]
+        if len(kinds) > 1:  # varios tipos: los más cercanos de todos, como un único ranking
+            cos = max(0.2, math.cos(math.radians(lat)))
+            found.sort(key=lambda kp: math.hypot(kp[1]["lat"] - lat, (kp[1]["lon"] - lon) * cos))
+        fields = [f.split(".", 1)[-1] for f in (self.headers.get("X-Goog-FieldMask") or "").split(",") if f]
+        self._send(200, json.dumps({"places": [mock.place_json(p, fields, kind)
+                                               for kind, p in found[:mock.cfg.result_cap]]}))
+
+    def do_GET(self):
+        u = urlparse(self.path); mock = self.server.mock
+        if u.path == "/search":
+            if not self._delay_or_fail("nominatim", mock.cfg.nominatim_latency_ms): return
+            return self._send(200, json.dumps([mock.geocode(parse_qs(u.query))]))
+        if u.path.startswith("/v1/places/"):
+            if not self._delay_or_fail("details", mock.cfg.places_latency_ms): return
+            p = mock.world.place(unquote(u.path.rsplit("/", 1)[-1]))
+            if p is None: return self._send(404, json.dumps({"error": {"message": "NOT_FOUND"}}))
+            fields = [f for f in (self.headers.get("X-Goog-FieldMask") or "").split(",") if f]
+            return self._send(200, json.dumps(mock.place_json(p, fields)))
+        if u.path.startswith("/site/"):
+            if not self._delay_or_fail("web", mock.cfg.site_latency_ms): return
+            code, html = mock.site_page(u.path)
+            return self._send(code, html, "text/html; charset=utf-8")
+        self._send(404, "{}")
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockServer"
+
+    def handle_error(self, request, client_address):
+        pass  # el cliente cierra conexiones keep-alive al terminar; no es un fallo del servidor
+
+class MockServer:
+    """Local stand-in for places:searchText/searchNearby/details, Nominatim /search and business
+    websites, with configurable latency, result cap and error rate. Counts requests per route.
+
+        with MockServer(MockConfig(error_rate=0.02)) as srv:
+            ...  # apuntar places.V1_BASE a srv.places_base, geocoding.NOMINATIM_URL a srv.nominatim_url
+    """
+    def __init__(self, cfg: Optional[MockConfig] = None, host: str = "127.0.0.1"):
+        self.cfg = cfg or MockConfig()
+        self.world = MockWorld(self.cfg)
+        self.host = host
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._servers: List[_Server] = []
+
+    def start(self) -> "MockServer":
+        for _ in range(1 + max(1, self.cfg.site_hosts)):
+            srv = _Server((self.host, 0), _Handler); srv.mock = self
+            threading.Thread(target=srv.serve_forever, daemon=True, name="mock-http").start()
+            self._servers.append(srv)
+        return self
+
+    def stop(self):
+        for srv in self._servers: srv.shutdown(); srv.server_close()
+        self._servers = []
+
+    def __enter__(self): return self.start()
+    def __exit__(self, *exc): self.stop()
+
+    def _url(self, i: int = 0) -> str:
+        return f"http://{self.host}:{self._servers[i].server_address[1]}"
+
+    @property
+    def places_base(self) -> str: return self._url() + "/v1"
+    @property
+    def nominatim_url(self) -> str: return self._url() + "/search"
+
+    def count(self, route: str):
+        with self._lock: self.counts[route] = self.counts.get(route, 0) + 1
+
+    def reset_counts(self):
+        with self._lock: self.counts = {}
+
+    def site_url(self, pid: str) -> str:
+        return self._url(1 + int(hashlib.md5(pid.encode()).hexdigest(), 16) % (len(self._servers) - 1)) + f"/site/{pid}/"
+
+    def place_json(self, p: Dict[str, Any], fields: List[str], kind: Optional[str] = None) -> Dict[str, Any]:
+        full = {"id": p["id"], "displayName": {"text": p["name"], "languageCode": "es"},
+                "formattedAddress": f"Calle Falsa {int(hashlib.md5(p['id'].encode()).hexdigest(), 16) % 200}, España",
+                "location": {"latitude": p["lat"], "longitude": p["lon"]},
+                "nationalPhoneNumber": p["phone"], "rating": p["rating"], "userRatingCount": p["reviews"],
+                "googleMapsUri": f"https://maps.google.com/?cid={p['id']}"}
+        if p["web"]: full["websiteUri"] = self.site_url(p["id"])
+        if kind: full["primaryType"] = kind; full["types"] = [kind, "point_of_interest", "establishment"]
+        return {k: v for k, v in full.items() if not fields or k in fields}
+
+    def geocode(self, q: Dict[str, List[str]]) -> Dict[str, Any]:
+        text = (q.get("q") or [""])[0]
+        r = _rng(self.cfg.seed, text.lower())
+        lat, lon, a = 37.0 + r.random() * 6.0, -7.0 + r.random() * 9.0, self.cfg.area_deg
+        out = {"lat": str(lat), "lon": str(lon), "display_name": text,
+               "boundingbox": [str(lat - a), str(lat + a), str(lon - a), str(lon + a)]}
+        if (q.get("polygon_geojson") or ["0"])[0] == "1":
+            ring = [[lon - a, lat - a], [lon + a, lat - a], [lon + a, lat + a], [lon - a, lat + a], [lon - a, lat - a]]
+            out["geojson"] = {"type": "Polygon", "coordinates": [ring]}
+        return out
+
+    def site_page(self, path: str) -> Tuple[int, str]:
+        parts = [x for x in path.split("/") if x]
+        pid = parts[1] if len(parts) > 1 else ""
+        page = "/".join(parts[2:])
+        r = _rng(self.cfg.seed, pid)
+        has_contact = r.random() < self.cfg.contact_ratio
+        filler = "<p>" + "Lorem ipsum dolor sit amet. " * 40 + "</p>"
+        if page == "":
+            posts = "".join(f'<a href="blog/entrada-{i}/">Entrada {i}</a>' for i in range(self.cfg.site_posts))
+            return 200, (f'<html><head><link href="/wp-content/themes/x.css" rel="stylesheet"></head><body>'
+                         f'{posts}{filler}<a href="contacta-con-nosotros/">Contacto</a></body></html>')
+        if page.startswith("contacta-con-nosotros"):
+            if not has_contact: return 200, f"<html><body>{filler}<form>Formulario</form></body></html>"
+            return 200, (f'<html><body>{filler}<footer id="contacto">Tel: <a href="tel:+34912{r.randint(100000, 999999)}">'
+                         f'llámanos</a> · <a href="mailto:info@{pid.lower()}.es">info@{pid.lower()}.es</a></footer></body></html>')
+        if page.startswith("blog/"):
+            return 200, f"<html><body>{filler}</body></html>"
+        return 404, "<html><body>No encontrado</body></html>"
@@ -0,0 +1,185 @@
+# localizador/bench/search.py — benchmark de búsqueda + enriquecimiento contra el servidor simulado
+"""Uso:
+    python -m localizador.bench.search                                   # provincia, cp y radio
+    python -m localizador.bench.search --escenarios cp --latencia-google-ms 300 --errores 0.05
+    python -m localizador.bench.search --json salidas/bench.json          # para comparar entre versiones
+    python -m localizador.bench.search --escenarios provincia,provincia --aprender   # 2ª vez con lo aprendido
+
+Cada escenario ejecuta SearchRun de principio a fin contra MockServer (sin caché ni base local) y
+muestra tiempos por fase, latencias p50/p95 por tipo de petición, peticiones y negocios por segundo.
+Las palabras clave solo se aprenden con --aprender, en un fichero temporal que comparten los escenarios
+de esa ejecución."""
+from __future__ import annotations
+
+import argparse, contextlib, json, os, statistics, sys, tempfile, threading, time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from .. import geocoding, places, planner
+from ..cache import get_response_cache, set_response_cache
+from ..engine import SearchParams, SearchRun
+from ..net import HttpClient, RateLimiter, get_http_client, set_http_client
+from .mockserver import MockConfig, MockServer
+
+SCENARIOS = {
+    "provincia": dict(modo="Provincia", provincia="Benchmark", grid_km=25.0, malla_adaptativa=True, celda_min_km=3.0),
+    "cp": dict(modo="Códigos postales", postcodes=[f"{28001 + i:05d}" for i in range(12)], pc_radio_km=4.0),
+    "radio": dict(modo="Radio", centro="Benchmark centro", radio_km=20.0),
+}
+
+def _stage(method: str, url: str) -> str:
+    if url.endswith("/search") or "/search?" in url: return "nominatim"
+    if ":searchText" in url: return "searchText"
+    if ":searchNearby" in url: return "searchNearby"
+    if "/places/" in url: return "details"
+    return "web" if method == "GET" else "otros"
+
+class TimedHttpClient(HttpClient):
+    """HttpClient that records the latency of every request by stage; answers >= 400 and
+    transport errors count as failures (guessed contact pages that 404 included)."""
+    def __init__(self, *a, **kw):
+        super().__init__(*a, **kw)
+        self.samples: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+        self._samples_lock = threading.Lock()
+
+    def _record(self, stage: str, t0: float, ok: bool):
+        with self._samples_lock:
+            self.samples.setdefault(stage, []).append(time.perf_counter() - t0)
+            if not ok: self.failures[stage] = self.failures.get(stage, 0) + 1
+
+    def request(self, method: str, url: str, http2: bool = False, **kw):
+        t0 = time.perf_counter(); ok = False
+        try:
+            r = super().request(method, url, http2=http2, **kw); ok = r.status_code < 400
+            return r
+        finally:
+            self._record(_stage(method, url), t0, ok)
+
+    def fetch_page(self, url, headers=None, timeout=20, types=("text/html",)):
+        t0 = time.perf_counter(); ok = False
+        try:
+            status, ctype, text = super().fetch_page(url, headers, timeout, types); ok = status < 400
+            return status, ctype, text
+        finally:
+            self._record("web", t0, ok)
+
+@dataclass
+class ScenarioResult:
+    escenario: str
+    negocios: int = 0
+    con_email: int = 0
+    total_s: float = 0.0
+    fases_s: Dict[str, float] = field(default_factory=dict)
+    peticiones: Dict[str, int] = field(default_factory=dict)
+    latencias_ms: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    negocios_s: float = 0.0
+    peticiones_s: float = 0.0
+    avisos: List[str] = field(default_factory=list)
+
+def _pct(values: List[float], q: float) -> float:
+    if len(values) == 1: return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+@contextlib.contextmanager
+def pointed_at(server: MockServer):
+    """Send Places and Nominatim traffic to `server` (unpaced Nominatim, no cache) and restore afterwards."""
+    saved = (places.V1_BASE, geocoding.NOMINATIM_URL, geocoding.NOMINATIM_LIMITER, get_response_cache(), get_http_client())
+    places.V1_BASE = server.places_base; geocoding.NOMINATIM_URL = server.nominatim_url
+    geocoding.NOMINATIM_LIMITER = RateLimiter(0)
+    set_response_cache(None)
+    try:
+        yield
+    finally:
+        places.V1_BASE, geocoding.NOMINATIM_URL, geocoding.NOMINATIM_LIMITER = saved[:3]
+        set_response_cache(saved[3]); set_http_client(saved[4])
+
+def run_scenario(name: str, server: MockServer, gremios: List[str], qps: float, workers: int,
+                 scrape: bool, two_phase: bool, combine: bool = True, learn: bool = False) -> ScenarioResult:
+    client = TimedHttpClient(); set_http_client(client); server.reset_counts()
+    params = SearchParams(gremios=gremios, extras=["urgencias"], google_qps=qps, scrape_delay=0.0,
+                          scrape_workers=workers, scrape_email=scrape, google_two_phase=two_phase,
+                          google_combine_types=combine, google_learn_keywords=learn, **SCENARIOS[name])
+    marks: Dict[str, float] = {}
+    def _on_progress(_step, _total, msg):
+        if msg.startswith("Emails desde web") and "enriquecimiento" not in marks:
+            marks["enriquecimiento"] = time.perf_counter()
+    run = SearchRun(params, api_key="bench", gazetteer={}, on_progress=_on_progress)
+    t0 = time.perf_counter()
+    run.plan(); marks["plan"] = time.perf_counter()
+    run.run(); t1 = time.perf_counter()
+    client.close()
+    end_search = marks.get("enriquecimiento", t1)
+    res = ScenarioResult(name, negocios=len(run.items), con_email=sum(1 for b in run.items if b.email),
+                         total_s=round(t1 - t0, 3), avisos=list(run.warnings))
+    res.fases_s = {"geocodificación": round(marks["plan"] - t0, 3), "búsqueda": round(end_search - marks["plan"], 3),
+                   "webs": round(t1 - end_search, 3)}
+    res.peticiones = dict(sorted(server.counts.items()))
+    for stage, xs in sorted(client.samples.items()):
+        res.latencias_ms[stage] = {"n": len(xs), "fallos": client.failures.get(stage, 0),
+                                   "p50": round(_pct(xs, 50) * 1000, 1), "p95": round(_pct(xs, 95) * 1000, 1),
+                                   "max": round(max(xs) * 1000, 1)}
+    n_req = sum(len(xs) for xs in client.samples.values())
+    res.negocios_s = round(res.negocios / res.total_s, 2) if res.total_s else 0.0
+    res.peticiones_s = round(n_req / res.total_s, 2) if res.total_s else 0.0
+    return res
+
+def print_result(res: ScenarioResult):
+    print(f"\n== {res.escenario}: {res.negocios} negocios ({res.con_email} con email) en {res.total_s:.2f} s · "
+          f"{res.negocios_s} negocios/s · {res.peticiones_s} peticiones/s")
+    print("   fases: " + " · ".join(f"{k} {v:.2f} s" for k, v in res.fases_s.items()))
+    print(f"   {'petición':<14}{'n':>6}{'fallos':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for stage, row in res.latencias_ms.items():
+        print(f"   {stage:<14}{row['n']:>6}{row['fallos']:>8}{row['p50']:>9}{row['p95']:>9}{row['max']:>9}")
+    print("   servidor: " + ", ".join(f"{k}={v}" for k, v in res.peticiones.items()))
+    for w in res.avisos: print(f"   aviso: {w}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m localizador.bench.search",
+                                 description="Benchmark de búsqueda y enriquecimiento contra servicios simulados.")
+    ap.add_argument("--escenarios", default="provincia,cp,radio", help="provincia, cp y/o radio, separados por comas")
+    ap.add_argument("--gremios", default="Fontaneros,Electricistas")
+    ap.add_argument("--latencia-google-ms", type=float, default=MockConfig.places_latency_ms)
+    ap.add_argument("--latencia-nominatim-ms", type=float, default=MockConfig.nominatim_latency_ms)
+    ap.add_argument("--latencia-web-ms", type=float, default=MockConfig.site_latency_ms)
+    ap.add_argument("--errores", type=float, default=0.0, help="Fracción de respuestas 429/503 (0-1)")
+    ap.add_argument("--tope", type=int, default=MockConfig.result_cap, help="Resultados máximos por búsqueda")
+    ap.add_argument("--densidad", type=float, default=MockConfig.density_per_cell,
+                    help="Negocios por km² y gremio, de media")
+    ap.add_argument("--semilado-grados", type=float, default=MockConfig.area_deg,
+                    help="Tamaño de la provincia simulada (semilado del bbox en grados)")
+    ap.add_argument("--qps", type=float, default=20.0, help="Peticiones por segundo a Google")
+    ap.add_argument("--webs-paralelo", type=int, default=8)
+    ap.add_argument("--sin-email", action="store_true", help="No visitar las webs")
+    ap.add_argument("--dos-fases", action="store_true", help="Barrido solo de IDs + detalles")
+    ap.add_argument("--sin-agrupar", action="store_true", help="Un nearby por gremio en lugar de uno por celda")
+    ap.add_argument("--aprender", action="store_true",
+                    help="Aprender qué palabras clave aportan (los escenarios siguientes lo aplican)")
+    ap.add_argument("--json", help="Guardar los resultados en este fichero JSON")
+    args = ap.parse_args(argv)
+    names = [x.strip() for x in args.escenarios.split(",") if x.strip()]
+    bad = [n for n in names if n not in SCENARIOS]
+    if bad: ap.error(f"Escenarios desconocidos: {', '.join(bad)}")
+    cfg = MockConfig(places_latency_ms=args.latencia_google_ms, nominatim_latency_ms=args.latencia_nominatim_ms,
+                     site_latency_ms=args.latencia_web_ms, error_rate=args.errores, result_cap=args.tope,
+                     density_per_cell=args.densidad, area_deg=args.semilado_grados)
+    gremios = [g.strip() for g in args.gremios.split(",") if g.strip()]
+    results = []
+    with MockServer(cfg) as server, pointed_at(server), tempfile.TemporaryDirectory() as tmp:
+        saved_keywords = planner.KEYWORDS_PATH; planner.KEYWORDS_PATH = os.path.join(tmp, "palabras.sqlite")
+        try:
+            for name in names:
+                res = run_scenario(name, server, gremios, args.qps, args.webs_paralelo, not args.sin_email,
+                                   args.dos_fases, not args.sin_agrupar, args.aprender)
+                print_result(res); results.append(res)
+        finally:
+            planner.KEYWORDS_PATH = saved_keywords
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"config": asdict(cfg), "gremios": gremios, "resultados": [asdict(r) for r in results]},
+                      fh, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
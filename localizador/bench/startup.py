@@ -0,0 +1,72 @@
+# localizador/bench/startup.py — coste de arranque del motor y de cada rerun de la app
+"""Uso:
+    python -m localizador.bench.startup                     # import en frío + primera ejecución y reruns de la app
+    python -m localizador.bench.startup --sin-app --repeticiones 10
+
+Mide en procesos nuevos cuánto tarda `import localizador` y qué módulos pesados quedan cargados, lo que
+cuesta preparar el extractor de dominios, y con streamlit.testing la primera ejecución de la app y la
+mediana de sus reruns (lo que se paga en cada interacción con un widget)."""
+from __future__ import annotations
+
+import argparse, importlib.util, json, os, statistics, subprocess, sys, time
+from typing import Dict, List, Optional
+
+HEAVY_MODULES = ("pandas", "openpyxl", "tldextract", "PIL")
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                        "app_google_places_custom.py")
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter(); import localizador; t1 = time.perf_counter()
+loaded = [m for m in %r if m in sys.modules]
+from localizador.dedupe import normalize_domain
+t2 = time.perf_counter(); normalize_domain("https://www.fontaneria-ejemplo.es/contacto"); t3 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "dominio_s": t3 - t2, "cargados": loaded}))
+""" % (HEAVY_MODULES,)
+
+def cold_import(repeats: int) -> Dict[str, object]:
+    """Median `import localizador` time in fresh interpreters, and the first normalize_domain() call."""
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {"import_ms": round(1000 * statistics.median(r["import_s"] for r in runs), 1),
+            "primer_dominio_ms": round(1000 * statistics.median(r["dominio_s"] for r in runs), 1),
+            "cargados_al_importar": runs[-1]["cargados"]}
+
+def app_reruns(path: str, reruns: int) -> Dict[str, float]:
+    """First script run and median rerun time of the Streamlit app, without a browser."""
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(path, default_timeout=120)
+    t0 = time.perf_counter(); at.run(); first = time.perf_counter() - t0
+    if at.exception: raise RuntimeError(f"La app falló: {at.exception[0].value}")
+    times: List[float] = []
+    for _ in range(reruns):
+        t0 = time.perf_counter(); at.run(); times.append(time.perf_counter() - t0)
+    return {"primera_ms": round(1000 * first, 1), "rerun_p50_ms": round(1000 * statistics.median(times), 1),
+            "rerun_max_ms": round(1000 * max(times), 1)}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m localizador.bench.startup",
+                                 description="Tiempo de arranque del motor y de los reruns de la app.")
+    ap.add_argument("--repeticiones", type=int, default=5, help="Procesos nuevos para medir el import")
+    ap.add_argument("--reruns", type=int, default=20, help="Reruns de la app a medir")
+    ap.add_argument("--app", default=APP_PATH, help="Script de Streamlit")
+    ap.add_argument("--sin-app", action="store_true", help="Medir solo el motor")
+    args = ap.parse_args(argv)
+    res = cold_import(max(1, args.repeticiones))
+    print(f"import localizador: {res['import_ms']} ms (mediana de {args.repeticiones} procesos) · "
+          f"primer dominio: {res['primer_dominio_ms']} ms")
+    print("módulos pesados cargados al importar: " + (", ".join(res["cargados_al_importar"]) or "ninguno"))
+    if args.sin_app: return 0
+    if importlib.util.find_spec("streamlit") is None:
+        print("streamlit no está instalado: no se mide la app.", file=sys.stderr); return 0
+    if not os.path.exists(args.app):
+        print(f"No existe la app '{args.app}'.", file=sys.stderr); return 2
+    app = app_reruns(args.app, max(1, args.reruns))
+    print(f"app: primera ejecución {app['primera_ms']} ms · rerun p50 {app['rerun_p50_ms']} ms "
+          f"(máx {app['rerun_max_ms']} ms, {args.reruns} reruns)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
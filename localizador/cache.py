@@ -0,0 +1,115 @@
+# localizador/cache.py — caché local de respuestas (SQLite)
+from __future__ import annotations
+
+import contextlib, contextvars, hashlib, json, os, sqlite3, threading, time
+from typing import Any, Dict, List, Optional
+
+CACHE_PATH = os.path.join(os.getcwd(), ".cache", "respuestas.sqlite")
+CACHE_TTL_S = {"places": 7 * 86400, "nominatim": 90 * 86400, "html": 14 * 86400, "overpass": 7 * 86400,
+               "details": 30 * 86400}
+CACHE_MAX_MB = 512
+
+def cache_key(*parts: Any) -> str:
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """SQLite-backed cache of raw response bodies keyed by normalized request.
+
+    Entries expire after CACHE_TTL_S[source]; when the file grows past `max_mb` the least
+    recently used entries are evicted. With `force_refresh` lookups always miss but fresh
+    responses are still stored. Thread-safe."""
+    def __init__(self, path: str = CACHE_PATH, max_mb: float = CACHE_MAX_MB,
+                 ttl_s: Optional[Dict[str, float]] = None, force_refresh: bool = False):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_s = dict(CACHE_TTL_S, **(ttl_s or {}))
+        self.force_refresh = force_refresh
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, source TEXT, "
+                         "created REAL, accessed REAL, size INTEGER, value TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size),0) FROM entries").fetchone()[0]
+
+    def _count(self, source: str, what: str):
+        self.stats.setdefault(source, {"hits": 0, "misses": 0, "stores": 0})[what] += 1
+
+    def get(self, source: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = None
+            if not self.force_refresh:
+                row = self._db.execute("SELECT created, value FROM entries WHERE key=?", (key,)).fetchone()
+            now = time.time()
+            if row is None or now - row[0] > self.ttl_s.get(source, 0):
+                self._count(source, "misses"); return None
+            self._db.execute("UPDATE entries SET accessed=? WHERE key=?", (now, key))
+            self._count(source, "hits")
+            return row[1]
+
+    def put(self, source: str, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            now = time.time()
+            old = self._db.execute("SELECT size FROM entries WHERE key=?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?)",
+                             (key, source, now, now, size, value))
+            self._bytes += size - (old[0] if old else 0)
+            self._count(source, "stores")
+            if self._bytes > self.max_bytes: self._evict()
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9)
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if self._bytes <= target: break
+            self._db.execute("DELETE FROM entries WHERE key=?", (key,))
+            self._bytes -= size
+
+    def iter_values(self, source: str, limit: Optional[int] = None):
+        """Stored bodies of one source, newest first, whatever their age (benchmarks, inspection)."""
+        sql = "SELECT value FROM entries WHERE source=? AND value != '' ORDER BY created DESC"
+        if limit: sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._db.execute(sql, (source,)).fetchall()
+        for (value,) in rows: yield value
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries"); self._bytes = 0
+
+    def summary(self) -> List[Dict[str, Any]]:
+        out = []
+        for source, c in sorted(self.stats.items()):
+            total = c["hits"] + c["misses"]
+            out.append({"Fuente": source, "Aciertos": c["hits"], "Fallos": c["misses"], "Guardadas": c["stores"],
+                        "% acierto": round(100 * c["hits"] / total, 1) if total else None})
+        return out
+
+_RESPONSE_CACHE: Optional[ResponseCache] = None
+_RUN_CACHE: contextvars.ContextVar = contextvars.ContextVar("response_cache")
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The cache of the current run (using_response_cache), else the process-wide one."""
+    return _RUN_CACHE.get(_RESPONSE_CACHE)
+
+def set_response_cache(cache: Optional[ResponseCache]):
+    """Install the process-wide cache, used wherever no run installed its own (None disables caching)."""
+    global _RESPONSE_CACHE
+    _RESPONSE_CACHE = cache
+
+@contextlib.contextmanager
+def using_response_cache(cache: Optional[ResponseCache]):
+    """Use `cache` (None: no caching) for the code run inside the block, and the worker threads it
+    starts through PlacesScheduler/SiteEnricher, without touching other runs of the process."""
+    token = _RUN_CACHE.set(cache)
+    try:
+        yield cache
+    finally:
+        _RUN_CACHE.reset(token)
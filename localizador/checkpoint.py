@@ -0,0 +1,88 @@
+# localizador/checkpoint.py — progreso de cada búsqueda en disco para poder reanudarla
+from __future__ import annotations
+
+import datetime, hashlib, json, os, shutil
+from typing import Any, Dict, List, Optional, Tuple
+
+CHECKPOINT_DIR = os.path.join(os.getcwd(), "salidas", "checkpoints")
+
+def job_id_for(params: Dict[str, Any]) -> str:
+    raw = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+def _read_jsonl(path: str) -> List[Dict[str, Any]]:
+    out = []
+    if not os.path.exists(path): return out
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try: out.append(json.loads(line))
+            except ValueError: break  # última línea a medias si el proceso murió escribiendo
+    return out
+
+class RunCheckpoint:
+    """Append-only record of the finished work of one search job (CHECKPOINT_DIR/<job_id>/).
+
+    units.jsonl keeps the places returned by every completed Places request and sites.jsonl
+    the email/phone found on every crawled website. Opening an unfinished job with
+    `resume=True` loads both so the run can skip that work; a finished job (or resume=False)
+    starts from scratch. Writes happen from a single thread (the one iterating the run)."""
+    def __init__(self, job_id: str, params: Optional[Dict[str, Any]] = None,
+                 base_dir: Optional[str] = None, resume: bool = True):
+        self.job_id = job_id
+        self.dir = os.path.join(base_dir or CHECKPOINT_DIR, job_id)
+        state = self._read_state()
+        if os.path.isdir(self.dir) and (not resume or state.get("status") == "done"):
+            shutil.rmtree(self.dir, ignore_errors=True); state = {}
+        os.makedirs(self.dir, exist_ok=True)
+        self._units: Dict[str, Tuple[list, Dict[str, Any]]] = {
+            r["k"]: (r.get("places") or [], r.get("meta") or {}) for r in _read_jsonl(self._path("units.jsonl"))}
+        self._sites: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+            r["k"]: (r.get("email"), r.get("phone")) for r in _read_jsonl(self._path("sites.jsonl"))}
+        self.resumed_units = len(self._units); self.resumed_sites = len(self._sites)
+        self._write_state(dict(state, job_id=job_id, params=params or state.get("params"), status="running",
+                               created=state.get("created") or datetime.datetime.now().isoformat(timespec="seconds")))
+        self._units_fh = open(self._path("units.jsonl"), "a", encoding="utf-8")
+        self._sites_fh = open(self._path("sites.jsonl"), "a", encoding="utf-8")
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(self._path("state.json"), encoding="utf-8") as fh: return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state: Dict[str, Any]):
+        state["updated"] = datetime.datetime.now().isoformat(timespec="seconds")
+        tmp = self._path("state.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh: json.dump(state, fh, ensure_ascii=False, default=str)
+        os.replace(tmp, self._path("state.json"))
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.resumed_units or self.resumed_sites)
+
+    def get_unit(self, key: str) -> Optional[Tuple[list, Dict[str, Any]]]:
+        return self._units.pop(key, None)  # se entrega una vez: no hace falta seguir en memoria
+
+    def put_unit(self, key: str, places: list, meta: Dict[str, Any]):
+        self._units_fh.write(json.dumps({"k": key, "places": places, "meta": meta}, ensure_ascii=False) + "\n")
+        self._units_fh.flush()
+
+    def get_site(self, key: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        return self._sites.get(key)
+
+    def put_site(self, key: str, email: Optional[str], phone: Optional[str]):
+        self._sites_fh.write(json.dumps({"k": key, "email": email, "phone": phone}, ensure_ascii=False) + "\n")
+        self._sites_fh.flush()
+
+    def close(self):
+        for fh in (self._units_fh, self._sites_fh):
+            if not fh.closed: fh.close()
+
+    def finish(self):
+        """Mark the job as completed; the next run with the same parameters starts afresh."""
+        self.close()
+        state = self._read_state(); state["status"] = "done"
+        self._write_state(state)
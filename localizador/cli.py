@@ -0,0 +1,177 @@
+# localizador/cli.py — búsquedas por lotes sin Streamlit (cron, varias máquinas)
+"""Uso:
+    python -m localizador --gremios "Fontaneros,Cerrajeros" --modo provincia --provincia Madrid \\
+        --salida salidas/madrid.xlsx
+
+Códigos de salida: 0 correcto, 1 error durante la búsqueda, 2 argumentos inválidos,
+3 falta GOOGLE_API_KEY."""
+from __future__ import annotations
+
+import argparse, logging, os, sys
+from typing import List, Optional
+
+from .cache import ResponseCache, set_response_cache
+from .checkpoint import RunCheckpoint
+from .engine import SearchParams, SearchRun
+from .export import save_outputs, write_output
+from .geocoding import load_gazetteer
+from .net import get_http_client
+from .store import STORE_ENRICH_MAX_AGE_DAYS, BusinessStore
+from .trace import Tracer, set_tracer, trace_path
+
+log = logging.getLogger("localizador")
+
+EXIT_OK, EXIT_ERROR, EXIT_USAGE, EXIT_NO_KEY = 0, 1, 2, 3
+MODOS_CLI = {"provincia": "Provincia", "cp": "Códigos postales", "radio": "Radio"}
+FUENTES_CLI = {"google": "Google Places", "osm": "OSM", "ambas": "Ambas"}
+
+def _csv_list(text: str) -> List[str]:
+    return [x.strip() for x in (text or "").split(",") if x.strip()]
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m localizador",
+                                 description="Localizador multigremio — búsqueda por lotes (Google Places v1).")
+    ap.add_argument("--gremios", required=True, type=_csv_list, help="Gremios separados por comas")
+    ap.add_argument("--modo", choices=sorted(MODOS_CLI), default="provincia")
+    ap.add_argument("--provincia", help="Provincia (modo provincia)")
+    ap.add_argument("--cps", nargs="+", help="Códigos postales (modo cp)")
+    ap.add_argument("--centro", help="Dirección o ciudad (modo radio)")
+    ap.add_argument("--radio-km", type=float, default=20.0, help="Radio en modo radio")
+    ap.add_argument("--cp-radio-km", type=float, default=4.0, help="Radio por CP en modo cp")
+    ap.add_argument("--malla-km", type=float, default=25.0, help="Tamaño de celda inicial en modo provincia")
+    ap.add_argument("--celda-min-km", type=float, default=3.0, help="Celda mínima de la malla adaptativa")
+    ap.add_argument("--malla-fija", action="store_true", help="Malla uniforme en lugar de adaptativa")
+    ap.add_argument("--extras", type=_csv_list, default=["SAT", "urgencias", "24h"],
+                    help="Palabras clave extra separadas por comas")
+    ap.add_argument("--fuente", choices=sorted(FUENTES_CLI), default="google")
+    ap.add_argument("--overpass-url", help="Servidor Overpass (p.ej. una instancia local); por defecto el público")
+    ap.add_argument("--pbf", help="Extracto .osm.pbf local para la fuente OSM (requiere pyosmium)")
+    ap.add_argument("--idioma", choices=["es", "en"], default="es")
+    ap.add_argument("--qps", type=float, default=5.0, help="Peticiones por segundo a Google")
+    ap.add_argument("--presupuesto-usd", type=float, default=0.0,
+                    help="Tope de gasto en Google por búsqueda en USD (0 = sin límite)")
+    ap.add_argument("--solo-estimar", action="store_true",
+                    help="Geocodificar la zona, mostrar peticiones y coste estimados y salir")
+    ap.add_argument("--dos-fases", action="store_true",
+                    help="Barrido solo de IDs y después detalles de los negocios nuevos (más barato)")
+    ap.add_argument("--sin-agrupar", action="store_true",
+                    help="Un nearby por gremio y celda en lugar de uno con los tipos de todos los gremios")
+    ap.add_argument("--sin-aprender", action="store_true",
+                    help="Enviar siempre todas las palabras clave, aunque no hayan aportado en la zona")
+    ap.add_argument("--max-peticiones", type=int, default=0, help="Tope de peticiones a Google (0 = sin límite)")
+    ap.add_argument("--sin-email", action="store_true", help="No visitar las webs de los negocios")
+    ap.add_argument("--delay", type=float, default=0.8, help="Segundos entre peticiones al mismo dominio")
+    ap.add_argument("--webs-paralelo", type=int, default=8)
+    ap.add_argument("--tiempo-scraping-min", type=float, default=0, help="Tiempo máximo de scraping (0 = sin límite)")
+    ap.add_argument("--sin-cache", action="store_true", help="No usar la caché local de respuestas")
+    ap.add_argument("--refrescar", action="store_true", help="Ignorar la caché (pero guardar respuestas nuevas)")
+    ap.add_argument("--sin-reanudar", action="store_true",
+                    help="Empezar de cero aunque haya una ejecución interrumpida con los mismos parámetros")
+    ap.add_argument("--sin-base", action="store_true", help="No guardar ni reutilizar la base local de negocios")
+    ap.add_argument("--dias-reenriquecer", type=float, default=STORE_ENRICH_MAX_AGE_DAYS,
+                    help="Volver a rastrear las webs rastreadas hace más de N días")
+    ap.add_argument("--gazetteer", help="CSV offline de CPs/provincias (clave,lat,lon[,south,north,west,east])")
+    ap.add_argument("--salida", help="Fichero .csv, .xlsx o .parquet; si se omite se guarda en salidas/ como la app")
+    ap.add_argument("--parquet", action="store_true", help="Guardar también Parquet en salidas/ (requiere pyarrow)")
+    ap.add_argument("--nombre-base", default="resultado", help="Nombre base en salidas/ si no hay --salida")
+    ap.add_argument("--api-key", help="GOOGLE_API_KEY (por defecto, variable de entorno)")
+    ap.add_argument("--traza", nargs="?", const="", metavar="FICHERO",
+                    help="Guardar una traza JSONL de la ejecución (por defecto en salidas/traza_<búsqueda>_<fecha>.jsonl)")
+    ap.add_argument("-q", "--quiet", action="store_true")
+    return ap
+
+def params_from_args(args: argparse.Namespace) -> SearchParams:
+    return SearchParams(
+        gremios=args.gremios, modo=MODOS_CLI[args.modo], provincia=args.provincia, postcodes=args.cps,
+        centro=args.centro, radio_km=args.radio_km, grid_km=args.malla_km, pc_radio_km=args.cp_radio_km,
+        malla_adaptativa=not args.malla_fija, celda_min_km=args.celda_min_km, extras=args.extras,
+        fuente=FUENTES_CLI[args.fuente], idioma=args.idioma, google_qps=args.qps,
+        google_max_req=args.max_peticiones or None,
+        google_budget_usd=args.presupuesto_usd or None, google_two_phase=args.dos_fases,
+        google_combine_types=not args.sin_agrupar, google_learn_keywords=not args.sin_aprender,
+        scrape_email=not args.sin_email,
+        scrape_delay=args.delay, scrape_workers=args.webs_paralelo,
+        scrape_budget_s=(args.tiempo_scraping_min or 0) * 60 or None,
+        osm_url=args.overpass_url, osm_pbf=args.pbf)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # una línea por petición a Google
+    area_arg = {"provincia": args.provincia, "cp": args.cps, "radio": args.centro}[args.modo]
+    if not args.gremios or not area_arg:
+        ap.error(f"--gremios y el área del modo {args.modo} son obligatorios")
+    params = params_from_args(args)
+
+    api_key = args.api_key or os.getenv("GOOGLE_API_KEY")
+    gazetteer = load_gazetteer(args.gazetteer) if args.gazetteer else None
+    if args.solo_estimar:
+        try:
+            est = SearchRun(params, api_key=api_key, gazetteer=gazetteer).estimate()
+        except Exception as e:
+            log.error("No se pudo planificar la búsqueda: %s", e)
+            return EXIT_ERROR
+        print(f"Búsquedas de texto: {est['texto']}\nNearby (máx.): {est['nearby_max']}\n"
+              f"Coste estimado: {est['coste_min_usd']:.2f}–{est['coste_max_usd']:.2f} USD"
+              + (" (la malla adaptativa puede añadir más)" if est["ampliable"] else "")
+              + (f"\n+ {est['detalle_usd']:.3f} USD por negocio nuevo (detalles)" if est["detalle_usd"] else ""))
+        return EXIT_OK
+    if params.fuente in ("Google Places", "Ambas") and not api_key:
+        log.error("Falta GOOGLE_API_KEY (usa --api-key o la variable de entorno).")
+        return EXIT_NO_KEY
+    set_response_cache(None if args.sin_cache else ResponseCache(force_refresh=args.refrescar))
+
+    last = {"pct": -1}
+    def _on_progress(step, total, msg):
+        pct = min(100, int(step * 100 / max(1, total)))
+        if pct // 5 != last["pct"] // 5:
+            last["pct"] = pct; log.info("%3d%% %s", pct, msg)
+    checkpoint = RunCheckpoint(params.job_id(), params.meta(), resume=not (args.sin_reanudar or args.refrescar))
+    if checkpoint.resumed:
+        log.info("Reanudando %s: %d consultas y %d webs ya hechas", checkpoint.job_id,
+                 checkpoint.resumed_units, checkpoint.resumed_sites)
+    else:
+        log.info("Búsqueda %s", checkpoint.job_id)
+    tracer = Tracer(args.traza or trace_path(checkpoint.job_id)) if args.traza is not None else None
+    set_tracer(tracer)
+    try:
+        run = SearchRun(params, api_key=api_key, gazetteer=gazetteer, on_progress=_on_progress,
+                        on_errors=lambda msgs: [log.warning(m) for m in msgs], checkpoint=checkpoint,
+                        store=None if args.sin_base else BusinessStore(max_age_days=args.dias_reenriquecer))
+        try:
+            run.run()
+        except Exception as e:
+            log.error("La búsqueda falló: %s", e)
+            return EXIT_ERROR
+        for w in run.warnings: log.warning(w)
+        if run.uses_google:
+            cost = run.ledger.as_meta()
+            log.info("Google: %d peticiones facturables, %.2f USD", cost["peticiones_facturables"], cost["coste_usd"])
+        for row in get_http_client().summary():
+            log.debug("HTTP %s", row)
+        if run.store and run.store.reused_sites:
+            log.info("Base local: %d webs ya rastreadas recientemente", run.store.reused_sites)
+
+        df = run.to_df()
+        try:
+            if args.salida:
+                paths = [write_output(df, args.salida)]
+            else:
+                paths = list(save_outputs(df, args.nombre_base, parquet=args.parquet))
+        except (OSError, RuntimeError) as e:
+            log.error("No se pudo guardar el resultado: %s", e)
+            return EXIT_ERROR
+        log.info("Resultados: %d negocios (%s)", len(df), ", ".join(paths))
+        return EXIT_OK
+    finally:
+        set_tracer(None)
+        if tracer:
+            tracer.close()
+            for row in tracer.summary():
+                log.info("Traza %-16s %6d spans %9.2f s", row["Etapa"], row["Spans"], row["Total (s)"])
+            log.info("Traza guardada en %s", tracer.path)
+
+if __name__ == "__main__":
+    sys.exit(main())
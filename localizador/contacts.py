@@ -0,0 +1,143 @@
+# localizador/contacts.py — extracción de emails/teléfonos/enlaces de una página en una sola pasada
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+CONTACT_MAX_CHARS = 1_500_000  # de una página no se mira más allá (el cliente HTTP ya corta a 2 MB)
+
+# Una sola expresión con ramas que empiezan por algo barato de descartar: el correo se ancla en "@"
+# y se completa hacia atrás a mano, los teléfonos en su primer dígito/prefijo.
+_SCAN = re.compile(r"""
+    (?P<at>@)
+  | href\s*=\s*["'](?P<href>[^"'\s>]{1,512})["']
+  | (?P<obf>[\[(]\s*(?:at|arroba)\s*[\])]|arroba(?<=\w\sarroba)\s+(?=\w))
+  | (?P<block><footer\b|\b(?:id|class)\s*=\s*["'][^"']{0,80}?(?:contact|footer|pie)[^"']{0,80}["'])
+  | (?<!\w)(?P<phone>(?:\+|00)34[\s.\-]?[6789](?:[\s.\-]?\d){8}|[6789](?:[\s.\-]?\d){8})(?!\w)
+""", re.I | re.X)
+_LOCAL_TAIL = re.compile(r"(?<![\w.%+\-])([A-Z0-9._%+\-]{1,64})$", re.I)
+_OBF_LOCAL_TAIL = re.compile(r"(?<![\w.%+\-])([A-Z0-9._%+\-]{1,64})\s*$", re.I)
+_DOMAIN_HEAD = re.compile(r"[A-Z0-9](?:[A-Z0-9\-]{0,62}\.)+[A-Z]{2,24}\b", re.I)
+_OBF_TAIL = re.compile(r"\s*([A-Z0-9.\-]{1,253}?)\s*(?:[\[(]\s*(?:dot|punto)\s*[\])]|\s(?:dot|punto)\s)\s*([A-Z]{2,24})\b",
+                       re.I)
+_OBF_DOMAIN = re.compile(r"\s*([A-Z0-9](?:[A-Z0-9\-]{0,62}\.)+[A-Z]{2,24})\b", re.I)  # info(arroba)empresa.es
+_PHONE_LABEL = re.compile(r"(?:tel[eé]?f?o?n?o?|tlf|m[oó]vil|whatsapp|llámanos|ll[aá]manos|phone)\W{0,3}$", re.I)
+
+_ASSET_TLDS = {"png", "jpg", "jpeg", "gif", "svg", "webp", "avif", "ico", "bmp", "css", "js", "mjs", "json",
+               "woff", "woff2", "ttf", "eot", "mp4", "webm", "pdf", "php", "html", "htm", "xml", "map", "min"}
+_JUNK_EMAIL_DOMAINS = {"example.com", "example.es", "domain.com", "dominio.com", "email.com", "correo.com",
+                       "sentry.io", "wixpress.com", "sentry-next.wixpress.com", "yourdomain.com", "tudominio.com",
+                       "ingest.sentry.io", "godaddy.com", "2x.png"}
+_JUNK_EMAIL_LOCAL = ("noreply", "no-reply", "donotreply", "nombre", "tuemail", "your", "user", "usuario")
+_PREFERRED_LOCAL = ("info", "contacto", "contact", "hola", "hello", "admin", "administracion", "oficina",
+                    "comercial", "ventas", "atencion", "clientes", "presupuestos")
+_TAG = re.compile(r"<[^>]*>")
+_BLOCK_REACH = 4000  # un candidato cuenta como "pie/contacto" hasta N caracteres tras la marca
+
+@dataclass
+class PageContacts:
+    """Candidates found on one page, ranked best first, plus the page's links as (raw href, anchor text)."""
+    emails: List[Tuple[str, float]] = field(default_factory=list)
+    phones: List[Tuple[str, float]] = field(default_factory=list)
+    links: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def best_email(self) -> Optional[str]:
+        return self.emails[0][0] if self.emails else None
+
+    @property
+    def best_phone(self) -> Optional[str]:
+        return self.phones[0][0] if self.phones else None
+
+def valid_email(email: str) -> Optional[str]:
+    """Normalized email, or None for junk (asset names like logo@2x.png, placeholders, trackers)."""
+    email = email.strip().strip(".").lower()
+    if email.count("@") != 1: return None
+    local, domain = email.split("@")
+    if not local or not domain or ".." in email or local.startswith(".") or "." not in domain: return None
+    tld = domain.rsplit(".", 1)[1]
+    if tld in _ASSET_TLDS or not tld.isalpha(): return None
+    if domain in _JUNK_EMAIL_DOMAINS or any(domain.endswith("." + d) for d in _JUNK_EMAIL_DOMAINS): return None
+    if local.startswith(_JUNK_EMAIL_LOCAL): return None
+    if re.fullmatch(r"[0-9a-f]{16,}", local): return None  # identificadores de seguimiento
+    return email
+
+def spanish_phone(raw: str) -> Optional[str]:
+    """Spanish landline/mobile number as 'NNN NNN NNN', or None if it is not one."""
+    digits = re.sub(r"\D", "", raw)
+    if digits.startswith("0034"): digits = digits[4:]
+    elif digits.startswith("34") and len(digits) == 11: digits = digits[2:]
+    if len(digits) != 9 or digits[0] not in "6789": return None
+    if len(set(digits[1:])) == 1: return None  # 600000000, 999999999...
+    return f"{digits[:3]} {digits[3:6]} {digits[6:]}"
+
+def _email_domain_score(email: str, site_domain: Optional[str]) -> float:
+    if not site_domain: return 0.0
+    dom = email.split("@", 1)[1]
+    return 3.0 if dom == site_domain or dom.endswith("." + site_domain) or site_domain.endswith("." + dom) else 0.0
+
+def _anchor_text(text: str, start: int, end: int) -> str:
+    """Visible text of the <a> whose href spans start:end ("" for <link>, <area>... or very long anchors)."""
+    lt = text.rfind("<", max(0, start - 300), start)
+    if lt < 0 or text[lt + 1:lt + 2] not in "aA" or not text[lt + 2:lt + 3].isspace(): return ""
+    gt = text.find(">", end, end + 300)
+    if gt < 0: return ""
+    close = text.find("</a", gt, gt + 400)
+    return " ".join(_TAG.sub(" ", text[gt + 1:close]).split())[:80] if close > 0 else ""
+
+def extract_contacts(html: str, site_domain: Optional[str] = None,
+                     max_chars: int = CONTACT_MAX_CHARS) -> PageContacts:
+    """Emails, Spanish phones and links of a (possibly truncated) page in one regex pass.
+
+    Candidates score higher inside mailto:/tel: links, after a footer/contact block marker,
+    next to a phone label, on the site's own domain (emails) and when repeated; both lists
+    come back sorted by score."""
+    text = (html or "")[:max_chars]
+    emails: Dict[str, float] = {}; phones: Dict[str, float] = {}; links: List[Tuple[str, str]] = []
+    block_end = -1  # posición hasta la que dura la última marca de pie/contacto
+
+    def _add(bucket: Dict[str, float], key: str, score: float):
+        bucket[key] = bucket[key] + 0.5 if key in bucket else score
+
+    for m in _SCAN.finditer(text):
+        kind = m.lastgroup; pos = m.start()
+        in_block = pos <= block_end
+        if kind == "at":
+            tail = _LOCAL_TAIL.search(text, max(0, pos - 64), pos)
+            head = _DOMAIN_HEAD.match(text, pos + 1)
+            if tail and head:
+                e = valid_email(f"{tail.group(1)}@{head.group(0)}")
+                if e: _add(emails, e, 1.0 + (2.0 if in_block else 0.0))
+        elif kind == "href":
+            href = m.group("href"); low = href[:7].lower()
+            if low.startswith("mailto:"):
+                e = valid_email(href[7:].split("?", 1)[0])
+                if e: _add(emails, e, 4.0 + (1.0 if in_block else 0.0))
+            elif low.startswith("tel:"):
+                p = spanish_phone(href[4:])
+                if p: _add(phones, p, 4.0)
+            else:
+                links.append((href, _anchor_text(text, m.start(), m.end())))
+        elif kind == "obf":
+            tail = _OBF_LOCAL_TAIL.search(text, max(0, pos - 80), pos)
+            rest = _OBF_TAIL.match(text, m.end())
+            domain = f"{rest.group(1)}.{rest.group(2)}" if rest else None
+            if domain is None:
+                plain = _OBF_DOMAIN.match(text, m.end()); domain = plain.group(1) if plain else None
+            if tail and domain:
+                e = valid_email(f"{tail.group(1)}@{domain}")
+                if e: _add(emails, e, 2.0 + (2.0 if in_block else 0.0))
+        elif kind == "block":
+            block_end = pos + _BLOCK_REACH
+        else:
+            p = spanish_phone(m.group("phone"))
+            if p:
+                label = 2.0 if _PHONE_LABEL.search(text, max(0, pos - 20), pos) else 0.0
+                _add(phones, p, 1.0 + label + (1.0 if in_block else 0.0))
+
+    for e in emails:
+        local = e.split("@", 1)[0]
+        emails[e] += _email_domain_score(e, site_domain) + (1.0 if local.startswith(_PREFERRED_LOCAL) else 0.0)
+    rank = lambda d: sorted(d.items(), key=lambda kv: (-kv[1], len(kv[0]), kv[0]))
+    return PageContacts(rank(emails), rank(phones), links)
@@ -0,0 +1,136 @@
+# localizador/dedupe.py — deduplicación incremental de negocios
+from __future__ import annotations
+
+import math, re, unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .models import Business
+
+@lru_cache(maxsize=None)
+def tld_extractor():
+    """Process-wide tldextract extractor on the suffix list bundled with the package: it never goes
+    to the network nor writes a disk cache, and is built once (on the first domain normalized)."""
+    import tldextract
+    return tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+@lru_cache(maxsize=65536)
+def normalize_domain(url: Optional[str]) -> Optional[str]:
+    if not url: return None
+    if not re.match(r"^https?://", url, re.I): url = "http://" + url
+    ext = tld_extractor()(url)
+    # sin sufijo público (IP, localhost) no identifica a un negocio
+    return f"{ext.domain}.{ext.suffix}" if ext.domain and ext.suffix else None
+
+# Dominios compartidos por negocios sin relación (redes sociales, hosting gratuito, directorios)
+SHARED_DOMAINS = {"facebook.com", "instagram.com", "google.com", "business.site", "wixsite.com", "wix.com",
+                  "blogspot.com", "wordpress.com", "linktr.ee", "negocio.site", "paginasamarillas.es",
+                  "habitissimo.es", "cronoshare.com", "starofservice.es", "twitter.com", "linkedin.com"}
+LEGAL_SUFFIX = re.compile(r"\b(s\.?\s?l\.?\s?u?|s\.?\s?a\.?\s?u?|s\.?\s?c\.?|c\.?\s?b\.?)\s*$")
+DEDUPE_RADIUS_M = 150.0
+DEDUPE_NAME_RATIO = 0.85
+
+def normalize_name(name: Optional[str]) -> str:
+    n = unicodedata.normalize("NFKD", (name or "").lower()).encode("ascii", "ignore").decode("ascii")
+    n = LEGAL_SUFFIX.sub("", re.sub(r"[^\w\s.]+", " ", n).strip())
+    return re.sub(r"\W+", "", n)
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    d = re.sub(r"\D", "", phone or "")
+    if d.startswith("0034"): d = d[4:]
+    elif d.startswith("34") and len(d) == 11: d = d[2:]
+    return d if len(d) >= 9 else None
+
+def similar_names(a: str, b: str, ratio: float = DEDUPE_NAME_RATIO) -> bool:
+    """Whether two normalize_name() results are close enough to be the same business."""
+    if not a or not b: return False
+    if a == b: return True
+    m = SequenceMatcher(None, a, b, autojunk=False)
+    return m.real_quick_ratio() >= ratio and m.ratio() >= ratio
+
+class DedupeIndex:
+    """Incremental duplicate detector fed one Business at a time as results arrive.
+
+    Rules, cheapest first: same place_id; same normalized phone; same website domain with a
+    similar name; similar name within DEDUPE_RADIUS_M (spatial grid hash, so only neighbouring
+    cells are compared). A duplicate fills the fields still missing in the record it is merged
+    into. `merged` counts the duplicates each rule caught."""
+    def __init__(self, radius_m: float = DEDUPE_RADIUS_M, name_ratio: float = DEDUPE_NAME_RATIO):
+        self.radius_m = radius_m; self.name_ratio = name_ratio
+        self._cell_deg = radius_m / 111320.0
+        self._by_pid: Dict[str, Business] = {}
+        self._by_phone: Dict[str, Business] = {}
+        self._by_domain: Dict[str, List[Tuple[str, Business]]] = {}
+        self._grid: Dict[Tuple[int, int], List[Tuple[str, Business]]] = {}
+        self.merged = {"place_id": 0, "telefono": 0, "dominio": 0, "nombre_geo": 0}
+        self.unique = 0
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self._cell_deg)),
+                int(math.floor(lon * math.cos(math.radians(lat)) / self._cell_deg)))
+
+    def _similar(self, a: str, b: str) -> bool:
+        return similar_names(a, b, self.name_ratio)
+
+    def _find(self, b: Business, name: str, phone: Optional[str], domain: Optional[str]):
+        if b.place_id and b.place_id in self._by_pid: return "place_id", self._by_pid[b.place_id]
+        if phone and phone in self._by_phone: return "telefono", self._by_phone[phone]
+        if domain:
+            for other_name, other in self._by_domain.get(domain, ()):
+                if self._similar(name, other_name): return "dominio", other
+        if b.lat is not None and b.lon is not None and name:
+            ci, cj = self._cell(b.lat, b.lon)
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    for other_name, other in self._grid.get((ci + di, cj + dj), ()):
+                        if self._similar(name, other_name) and \
+                           distance_m(b.lat, b.lon, other.lat, other.lon) <= self.radius_m:
+                            return "nombre_geo", other
+        return None, None
+
+    def _index(self, b: Business, name: str, target: Optional[Business] = None):
+        """Index every key of `b` as leading to `target` (`b` itself unless it was merged into
+        another record). Domain and grid buckets hold each (name, record) pair once, so merging the
+        same duplicate again does not grow them."""
+        target = b if target is None else target
+        if b.place_id: self._by_pid.setdefault(b.place_id, target)
+        phone = normalize_phone(b.phone)
+        if phone: self._by_phone.setdefault(phone, target)
+        domain = normalize_domain(b.website) if b.website else None
+        if domain and domain not in SHARED_DOMAINS: _put(self._by_domain.setdefault(domain, []), name, target)
+        if b.lat is not None and b.lon is not None and name:
+            _put(self._grid.setdefault(self._cell(b.lat, b.lon), []), name, target)
+
+    def add(self, b: Business) -> Optional[Business]:
+        """Index `b`. Returns None if it is new, or the already indexed record it duplicates."""
+        name = normalize_name(b.name)
+        phone = normalize_phone(b.phone)
+        domain = normalize_domain(b.website) if b.website else None
+        if domain in SHARED_DOMAINS: domain = None
+        rule, kept = self._find(b, name, phone, domain)
+        if kept is None:
+            self._index(b, name); self.unique += 1
+            return None
+        self.merged[rule] += 1; gained = False
+        for f in ("street", "phone", "email", "website", "rating", "reviews", "lat", "lon",
+                  "place_id", "open_now", "open_today", "google_maps"):
+            if getattr(kept, f) is None and getattr(b, f) is not None:
+                setattr(kept, f, getattr(b, f)); gained = gained or f in ("lat", "lon")
+        # lo que trae el duplicado (otro teléfono, otra web, su nombre y posición) también lleva al conservado
+        self._index(b, name, kept)
+        if gained: self._index(kept, normalize_name(kept.name))
+        return kept
+
+def _put(bucket: List[Tuple[str, Business]], name: str, b: Business):
+    if not any(other is b and other_name == name for other_name, other in bucket): bucket.append((name, b))
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6371000.0 * math.hypot(x, y)
+
+def dedupe_businesses(items: List[Business], index: Optional[DedupeIndex] = None) -> List[Business]:
+    """Drop repeated businesses. Pass the same `index` across calls to dedupe a stream in batches."""
+    index = index if index is not None else DedupeIndex()
+    return [b for b in items if index.add(b) is None]
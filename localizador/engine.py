@@ -0,0 +1,355 @@
+# localizador/engine.py — orquestación de una búsqueda, sin dependencia de Streamlit
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .checkpoint import RunCheckpoint, job_id_for
+from .dedupe import DedupeIndex, dedupe_businesses
+from .geocoding import GAZETTEER_PATH, Geocoder, load_gazetteer
+from .models import Business, businesses_to_df
+from .net import RateLimiter
+from .planner import KeywordStats, QueryPlanner
+from .osm import osm_filters, osm_to_businesses, overpass_fetch, overpass_query, pbf_elements
+from .places import (GREMIO_TO_TYPES, V1_DETAILS_SKU, PlaceHydrator, PlacesScheduler, iter_google_sweep_v1,
+                     search_sku, v1_to_business)
+from .quota import QuotaLedger, estimate_cost, sku_price
+from .scraping import SiteEnricher
+from .store import BusinessStore
+from .sweep import cell_in_area, cells_over_bbox, grid_over_bbox, iter_adaptive_sweep_v1, point_in_area
+from .trace import span
+
+MODOS = ("Provincia", "Códigos postales", "Radio")
+FUENTES = ("Google Places", "OSM", "Ambas")
+
+@dataclass
+class SearchParams:
+    """Everything a search needs; mirrors the sidebar of the Streamlit app."""
+    gremios: List[str]
+    modo: str = "Provincia"
+    provincia: Optional[str] = None
+    postcodes: Optional[List[str]] = None
+    centro: Optional[str] = None
+    radio_km: Optional[float] = None
+    grid_km: Optional[float] = None
+    pc_radio_km: Optional[float] = None
+    malla_adaptativa: bool = False
+    celda_min_km: Optional[float] = None
+    extras: List[str] = field(default_factory=list)
+    fuente: str = "Google Places"
+    idioma: str = "es"
+    google_qps: float = 5.0
+    google_max_req: Optional[int] = None
+    google_budget_usd: Optional[float] = None
+    google_two_phase: bool = False         # barrido solo de IDs + detalles de los place_id nuevos
+    google_combine_types: bool = True      # un solo nearby por celda con los tipos de todos los gremios
+    google_learn_keywords: bool = True     # omitir palabras clave que no aportaron en la zona
+    scrape_email: bool = True
+    scrape_delay: float = 0.8
+    scrape_workers: int = 8
+    scrape_budget_s: Optional[float] = None
+    osm_url: Optional[str] = None          # Overpass propio; por defecto OVERPASS_URL
+    osm_pbf: Optional[str] = None          # extracto .osm.pbf local en lugar de Overpass
+
+    def job_id(self) -> str:
+        """Identity of the search for checkpointing: every field that changes what is searched
+        (not how fast), so a restart with the same parameters resumes the same job."""
+        fields = self.meta()
+        fields.update(pc_radio_km=self.pc_radio_km, malla_adaptativa=self.malla_adaptativa,
+                      celda_min_km=self.celda_min_km, fuente=self.fuente, idioma=self.idioma,
+                      scrape_email=self.scrape_email)
+        return job_id_for(fields)
+
+    def meta(self) -> Dict[str, Any]:
+        return {"modo": self.modo, "provincia": self.provincia, "postcodes": self.postcodes,
+                "centro": self.centro, "radio_km": self.radio_km, "grid_km": self.grid_km,
+                "gremios": self.gremios, "extras": self.extras}
+
+class SearchRun:
+    """One search: geocoding, Google sweep and/or OSM bulk query, incremental dedupe and
+    website enrichment.
+
+    plan() resolves the area once and returns the number of progress steps. Iterating the run
+    yields lists of businesses as they are found or enriched, while `items` always holds the
+    deduplicated results so far; run() simply drains it. `on_progress(step, total, msg)` and
+    `on_errors(messages)` are called from the iterating thread. With a `checkpoint` the run
+    skips the requests and crawls an interrupted run already finished, and marks the job
+    done once it completes. With a `store` (BusinessStore) every batch is upserted into it as a
+    new run, recent website crawls are reused instead of repeated, and to_df() reads the run
+    back from the store. A `limiter` (RateLimiter) paces Google instead of `google_qps`, so
+    several runs can share one quota. The `planner` (QueryPlanner) combines the nearby
+    fallbacks of the gremios of a cell and, while the run is iterated, learns from and applies
+    KeywordStats."""
+    def __init__(self, params: SearchParams, api_key: Optional[str] = None,
+                 gazetteer: Optional[Dict[str, Dict[str, Any]]] = None,
+                 on_progress: Optional[Callable[[int, int, str], None]] = None,
+                 on_errors: Optional[Callable[[List[str]], None]] = None,
+                 checkpoint: Optional[RunCheckpoint] = None, store: Optional[BusinessStore] = None,
+                 limiter: Optional[RateLimiter] = None):
+        self.params = params
+        self.checkpoint = checkpoint
+        self.store = store; self.run_id: Optional[int] = None
+        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        self.geo = Geocoder(gazetteer if gazetteer is not None else load_gazetteer(GAZETTEER_PATH))
+        self.dedupe = DedupeIndex()
+        self.ledger = QuotaLedger(params.google_budget_usd)
+        self.scheduler = PlacesScheduler(qps=params.google_qps, max_requests=params.google_max_req or None,
+                                         api_key=self.api_key, on_errors=on_errors, checkpoint=checkpoint,
+                                         ledger=self.ledger, limiter=limiter)
+        self.planner = QueryPlanner(combine_types=params.google_combine_types)
+        self.on_progress = on_progress
+        self.items: List[Business] = []
+        self.warnings: List[str] = []
+        self.enricher: Optional[SiteEnricher] = None
+        self.total = 1; self.step = 0
+        self._planned = False
+        self._area: Optional[Tuple[Tuple[float,float,float,float], List[List[Tuple[float,float]]]]] = None
+        self._pts: List[Tuple[float,float]] = []
+        self._google_steps = 0
+        self.hydrator = PlaceHydrator(self.scheduler, params.idioma)
+        self.osm_stats = {"elementos": 0, "negocios": 0}
+
+    @property
+    def uses_google(self) -> bool:
+        return self.params.fuente in ("Google Places", "Ambas")
+
+    @property
+    def uses_osm(self) -> bool:
+        return self.params.fuente in ("OSM", "Ambas")
+
+    def _progress(self, step: int, msg: str = ""):
+        self.step = step
+        if self.on_progress: self.on_progress(step, self.total, msg)
+
+    def plan(self) -> int:
+        """Geocode the area (once) and size the progress bar."""
+        p = self.params; total_steps = 0
+        with span("planificar", modo=p.modo) as sp:
+            if p.modo == "Provincia" and (self.uses_google or self.uses_osm):
+                self._area = self.geo.area(f"{p.provincia}, España")
+            if self.uses_google:
+                if p.modo == "Provincia":
+                    if p.malla_adaptativa:
+                        n_cells = sum(1 for c in cells_over_bbox(*self._area[0], p.grid_km or 25.0)
+                                      if cell_in_area(c, self._area[1]))
+                        total_steps = len(p.gremios) * n_cells
+                    else:
+                        self._pts = grid_over_bbox(*self._area[0], p.grid_km or 25.0)
+                        total_steps = len(p.gremios) * len(self._pts)
+                elif p.modo == "Códigos postales":
+                    total_steps = len(p.gremios) * len(p.postcodes or [])
+                else:
+                    total_steps = len(p.gremios)
+            sp.set(results=total_steps)
+        self._google_steps = total_steps
+        if self.uses_osm: total_steps += 1  # una sola consulta por zona
+        self.total = max(1, total_steps); self._planned = True
+        return self.total
+
+    def estimate(self) -> Dict[str, Any]:
+        """Google requests and cost (USD) the planned search will issue, before any is sent.
+
+        Text queries are an upper bound (keyword variants that never add anything in the zone are
+        dropped as the run goes); the searchNearby fallback only runs for targets that come back
+        thin, so it gives a range, and a combined one that comes back full is repeated per gremio.
+        With the adaptive grid dense cells are subdivided, adding requests on top of the estimate.
+        Cached answers are free and not discounted here. In two-phase mode the sweep is cheap and
+        each new place adds `detalle_usd`."""
+        if not self._planned: self.plan()
+        p = self.params
+        if not self.uses_google:
+            return {"texto": 0, "nearby_max": 0, "coste_min_usd": 0.0, "coste_max_usd": 0.0,
+                    "detalle_usd": 0.0, "ampliable": False}
+        per_gremio = self._google_steps // max(1, len(p.gremios))
+        text = self._google_steps * (1 + len(p.extras))
+        typed = sum(1 for g in p.gremios if GREMIO_TO_TYPES.get(g))
+        combined = p.google_combine_types and typed > 1
+        nearby = per_gremio * (typed + 1 if combined else typed)
+        text_sku = search_sku("searchText", p.google_two_phase)
+        near_sku = search_sku("searchNearby", p.google_two_phase, by_type=combined)
+        return {"texto": text, "nearby_max": nearby,
+                "coste_min_usd": round(estimate_cost(text, 0, text_sku), 2),
+                "coste_max_usd": round(estimate_cost(text, nearby, text_sku, near_sku), 2),
+                "detalle_usd": sku_price("placeDetails", V1_DETAILS_SKU) if p.google_two_phase else 0.0,
+                "ampliable": p.modo == "Provincia" and p.malla_adaptativa}
+
+    def _google_chunks(self) -> Iterator[Tuple[str, list]]:
+        p = self.params; total = self._google_steps
+        if p.modo == "Provincia" and p.malla_adaptativa:
+            bbox, rings = self._area
+            def _on_level(done, n, level):
+                self._progress(int(done * total / max(1, n)) if level == 0 else total,
+                               f"Provincia {p.provincia} · nivel {level} · {done}/{n}")
+            yield from iter_adaptive_sweep_v1(p.gremios, bbox, rings, p.grid_km or 25.0, p.celda_min_km or 3.0,
+                                              p.provincia, p.extras, p.idioma, self.scheduler, _on_level,
+                                              ids_only=p.google_two_phase, planner=self.planner)
+            return
+        targets = []
+        if p.modo == "Provincia":
+            for g in p.gremios:
+                for c in self._pts:
+                    targets.append((g, c, p.grid_km or 25.0, p.provincia))
+            label = f"Provincia {p.provincia}"
+        elif p.modo == "Códigos postales":
+            coords = self._postcode_coords()
+            missing = [pc for pc, ll in coords.items() if ll is None]
+            if missing: self.warnings.append("No se pudieron geocodificar: " + ", ".join(missing))
+            for pc in (p.postcodes or []):
+                if pc in missing: continue
+                lat, lon = coords[pc]
+                for g in p.gremios: targets.append((g, (lat, lon), p.pc_radio_km or 4.0, None))
+            label = "CPs " + " ".join(p.postcodes or [])
+        else:
+            lat, lon = self.geo.latlon(p.centro or "Madrid, España")
+            for g in p.gremios: targets.append((g, (lat, lon), p.radio_km or 5.0, None))
+            label = f"Radio {p.radio_km} km"
+        def _on_google(done, n):
+            self._progress(int(done * total / max(1, n)), f"{label} · {done}/{n}")
+        for t, res in iter_google_sweep_v1(targets, p.extras, p.idioma, self.scheduler, _on_google,
+                                           ids_only=p.google_two_phase, planner=self.planner):
+            yield targets[t][0], res
+
+    def _hydrate(self, gremio: str, stubs: list) -> List[Tuple[str, dict]]:
+        """Queue details for the stubs of an ID sweep (once per place_id, only inside the province)
+        and return the (gremio, place) details that have already arrived."""
+        rings = self._area[1] if self.params.modo == "Provincia" and self._area else None
+        if rings:
+            stubs = [s for s in stubs if not s.get("location") or
+                     point_in_area(s["location"].get("latitude"), s["location"].get("longitude"), rings)]
+        self.hydrator.submit(gremio, stubs)
+        return self.hydrator.poll()
+
+    def _postcode_coords(self) -> Dict[str, Optional[Tuple[float,float]]]:
+        pcs = self.params.postcodes or []
+        coords = self.geo.latlon_many([f"{pc}, España" for pc in pcs],
+                                      lambda i, n: self._progress(self.step, f"Geocodificando CPs ({i}/{n})"))
+        return {pc: coords.get(f"{pc}, España") for pc in pcs}
+
+    def _osm_businesses(self) -> List[Business]:
+        """All OSM matches for every gremio in one Overpass query (or one pass over the .osm.pbf)."""
+        p = self.params
+        filters = osm_filters(p.gremios)
+        missing = [g for g in p.gremios if not osm_filters([g])]
+        if missing: self.warnings.append("OSM: sin etiquetas para " + ", ".join(missing))
+        if not filters: return []
+        bbox, rings, circles = None, None, []
+        if p.modo == "Provincia":
+            bbox, rings = self._area
+        elif p.modo == "Códigos postales":
+            coords = self._postcode_coords()
+            circles = [(ll[0], ll[1], p.pc_radio_km or 4.0) for ll in coords.values() if ll]
+            if not self.uses_google:
+                bad = [pc for pc, ll in coords.items() if ll is None]
+                if bad: self.warnings.append("No se pudieron geocodificar: " + ", ".join(bad))
+            if not circles: return []
+        else:
+            lat, lon = self.geo.latlon(p.centro or "Madrid, España")
+            circles = [(lat, lon, p.radio_km or 5.0)]
+        if p.osm_pbf:
+            key = f"osm|pbf|{os.path.abspath(p.osm_pbf)}|{filters}|{bbox}|{circles}"
+        else:
+            query = overpass_query(filters, bbox=bbox, circles=circles)
+            key = f"osm|{p.osm_url or ''}|{query}"
+        saved = self.checkpoint.get_unit(key) if self.checkpoint else None
+        if saved is not None:
+            elements = saved[0]
+        else:
+            if p.osm_pbf:
+                if bbox is None:
+                    lats = [c[0] for c in circles]; lons = [c[1] for c in circles]; r = max(c[2] for c in circles) / 80.0
+                    bbox = (min(lats) - r, max(lats) + r, min(lons) - r * 1.5, max(lons) + r * 1.5)
+                try:
+                    elements, meta = pbf_elements(p.osm_pbf, filters, bbox), {"status": "OK"}
+                except RuntimeError as e:
+                    elements, meta = [], {"status": "ERROR", "error": str(e)}
+            else:
+                elements, meta = overpass_fetch(query, p.osm_url)
+            if meta.get("status") == "ERROR":
+                self.warnings.append(meta.get("error") or "OSM: error desconocido")
+                return []
+            if self.checkpoint: self.checkpoint.put_unit(key, elements, meta)
+        found = osm_to_businesses(elements, p.gremios, rings, circles)
+        self.osm_stats = {"elementos": len(elements), "negocios": len(found)}
+        return found
+
+    def __iter__(self) -> Iterator[List[Business]]:
+        """fetch (Google, then OSM) -> Business -> dedupe -> enriquecer (-> store), yielding each batch
+        of new/updated rows."""
+        if not self._planned: self.plan()
+        p = self.params
+        self.enricher = enricher = SiteEnricher(p.scrape_delay, 8, p.scrape_workers, p.scrape_budget_s,
+                                                checkpoint=self.checkpoint, store=self.store) if p.scrape_email else None
+        if p.google_learn_keywords and self.uses_google: self.planner.keywords = KeywordStats()
+        if self.store:
+            self.run_id = self.store.begin_run(self.checkpoint.job_id if self.checkpoint else p.job_id(), p.meta())
+        try:
+            for batch in self._iter_batches(enricher):
+                if self.store and batch:
+                    with span("base.guardar", results=len(batch)): self.store.upsert(batch, self.run_id)
+                yield batch
+            if self.checkpoint: self.checkpoint.finish()
+        finally:
+            self.hydrator.close(); self.scheduler.close()
+            if enricher: enricher.close()
+            if self.checkpoint: self.checkpoint.close()
+            if self.planner.keywords: self.planner.keywords.close(); self.planner.keywords = None
+
+    def _dedupe(self, found: List[Business], fuente: str) -> List[Business]:
+        with span("dedupe", fuente=fuente, entrada=len(found)) as sp:
+            new = dedupe_businesses(found, self.dedupe); sp.set(results=len(new))
+        return new
+
+    def _google_batch(self, places: List[Tuple[str, dict]], enricher: Optional[SiteEnricher]) -> List[Business]:
+        new = self._dedupe([v1_to_business(r, g) for g, r in places], "google")
+        self.items.extend(new)
+        if enricher:
+            enricher.submit(new); new = new + enricher.poll()
+        return new
+
+    def _iter_batches(self, enricher: Optional[SiteEnricher]) -> Iterator[List[Business]]:
+        p = self.params
+        if self.uses_google:
+            # en dos fases los detalles se piden mientras sigue el barrido de IDs, todos en el mismo pool
+            for g, places in self._google_chunks():
+                if p.google_two_phase: yield self._google_batch(self._hydrate(g, places), enricher)
+                else: yield self._google_batch([(g, r) for r in places], enricher)
+            for ready in self.hydrator.drain():
+                self._progress(self._google_steps, f"Detalles de Google · {self.hydrator.pending} pendientes")
+                yield self._google_batch(ready, enricher)
+            self._progress(self._google_steps)
+            if p.google_max_req and self.scheduler.requests_sent >= p.google_max_req:
+                self.warnings.append(f"Se alcanzó el límite de {p.google_max_req} peticiones a Google; "
+                                     "resultados parciales.")
+            self.warnings.extend(self.planner.summary())
+            if self.ledger.exhausted:
+                self.warnings.append(f"Se alcanzó el presupuesto de {p.google_budget_usd:.2f} USD en Google "
+                                     f"({self.ledger.refused} consultas sin enviar); resultados parciales.")
+        if self.uses_osm:
+            self._progress(self.step, "OpenStreetMap")
+            with span("osm", modo=p.modo) as sp:
+                found = self._osm_businesses(); sp.set(results=len(found))
+            new = self._dedupe(found, "osm")
+            self.items.extend(new)
+            if enricher:
+                enricher.submit(new); new = new + enricher.poll()
+            self._progress(self._google_steps + 1, f"OpenStreetMap · {self.osm_stats['negocios']} negocios")
+            yield new
+        if enricher:
+            self.total += enricher.total; base_step = self.step
+            self._progress(base_step + enricher.done, f"Emails desde web ({enricher.done}/{enricher.total})")
+            for changed in enricher.iter_drain():
+                self._progress(base_step + enricher.done, f"Emails desde web ({enricher.done}/{enricher.total})")
+                yield changed
+            self._progress(base_step + enricher.total)
+
+    def run(self) -> List[Business]:
+        for _ in self: pass
+        return self.items
+
+    def to_df(self) -> pd.DataFrame:
+        if self.store and self.run_id is not None: return self.store.to_df(self.run_id)
+        return businesses_to_df(self.items)
@@ -0,0 +1,128 @@
+# localizador/export.py — CSV/Excel/Parquet para descarga y guardado en salidas/
+from __future__ import annotations
+
+import datetime, hashlib, importlib.util, io, os, threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+from .trace import span
+
+if TYPE_CHECKING:
+    import pandas as pd  # pandas y openpyxl se importan al exportar, no al arrancar
+
+OUT_DIR = os.path.join(os.getcwd(), "salidas")
+EXPORT_MEMO_SIZE = 8  # conjuntos de resultados cuyas exportaciones se mantienen en memoria
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+def result_hash(df: pd.DataFrame) -> str:
+    """Content hash of a result table (values and column names)."""
+    import pandas as pd
+    h = hashlib.sha1("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+def _excel_rows(df: pd.DataFrame) -> Iterable[tuple]:
+    yield tuple(df.columns)
+    clean = df.astype(object).where(df.notna(), None)  # NaN -> celda vacía
+    yield from clean.itertuples(index=False, name=None)
+
+def write_excel(df: pd.DataFrame, target) -> None:
+    """Write `df` to a path or binary file object with openpyxl's write-only (streaming) mode,
+    which keeps memory flat however many rows there are."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True); ws = wb.create_sheet("Resultado")
+    for row in _excel_rows(df): ws.append(row)
+    wb.save(target)
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False, encoding="utf-8-sig").encode("utf-8-sig")
+
+def to_excel_bytes(df: pd.DataFrame) -> bytes:
+    out = io.BytesIO(); write_excel(df, out); return out.getvalue()
+
+def to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    if not parquet_available():
+        raise RuntimeError("Exportar a Parquet requiere pyarrow (pip install pyarrow).")
+    out = io.BytesIO(); df.to_parquet(out, index=False, compression="zstd"); return out.getvalue()
+
+class ExportBundle:
+    """Serialized forms of one result table, each built at most once and then reused for the
+    download buttons, the files in salidas/ and every rerun showing the same results."""
+    _builders = {"csv": to_csv_bytes, "xlsx": to_excel_bytes, "parquet": to_parquet_bytes}
+
+    def __init__(self, df: pd.DataFrame, key: Optional[str] = None):
+        self.df = df
+        self.key = key or result_hash(df)
+        self._data: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def get(self, fmt: str) -> bytes:
+        with self._lock:
+            if fmt not in self._data:
+                with span("exportar", fmt=fmt, results=len(self.df)) as sp:
+                    self._data[fmt] = self._builders[fmt](self.df); sp.set(bytes=len(self._data[fmt]))
+            return self._data[fmt]
+
+    @property
+    def csv(self) -> bytes: return self.get("csv")
+    @property
+    def xlsx(self) -> bytes: return self.get("xlsx")
+    @property
+    def parquet(self) -> bytes: return self.get("parquet")
+
+_BUNDLES: "OrderedDict[str, ExportBundle]" = OrderedDict()
+_BUNDLES_LOCK = threading.Lock()
+
+def export_bundle(df: pd.DataFrame, key: Optional[str] = None) -> ExportBundle:
+    """ExportBundle for `df`, shared by every caller (and session) with the same results; `key`
+    (result_hash) skips hashing the table again when it is already known."""
+    key = key or result_hash(df)
+    with _BUNDLES_LOCK:
+        bundle = _BUNDLES.get(key)
+        if bundle is None:
+            bundle = _BUNDLES[key] = ExportBundle(df, key)
+            while len(_BUNDLES) > EXPORT_MEMO_SIZE: _BUNDLES.popitem(last=False)
+        _BUNDLES.move_to_end(key)
+        return bundle
+
+def write_output(df: pd.DataFrame, path: str, bundle: Optional[ExportBundle] = None) -> str:
+    """Write `df` to `path` in the format given by its extension (.csv, .xlsx or .parquet)."""
+    fmt = os.path.splitext(path)[1].lower().lstrip(".") or "csv"
+    if fmt not in ExportBundle._builders: fmt = "csv"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if bundle is None and fmt == "xlsx":
+        with span("exportar", fmt=fmt, results=len(df)) as sp:
+            write_excel(df, path)  # directo a disco, sin pasar por memoria
+            sp.set(bytes=os.path.getsize(path))
+        return path
+    data = (bundle or ExportBundle(df)).get(fmt)
+    with open(path, "wb") as f: f.write(data)
+    return path
+
+def save_outputs(df: pd.DataFrame, base_filename: str, out_dir: Optional[str] = None,
+                 save_latest: bool = True, parquet: bool = False,
+                 bundle: Optional[ExportBundle] = None) -> Tuple[str, ...]:
+    """Write timestamped CSV/XLSX (and optionally Parquet) plus *_latest copies to `out_dir`;
+    returns the timestamped paths. Each format is serialized once and the bytes reused for
+    both copies. A failed Excel/Parquet write is reported in the returned path instead of raising."""
+    out_dir = out_dir or OUT_DIR; os.makedirs(out_dir, exist_ok=True)
+    bundle = bundle or export_bundle(df)
+    stamp=datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    paths = []
+    for fmt in ("csv", "xlsx") + (("parquet",) if parquet else ()):
+        path = os.path.join(out_dir, f"{base_filename}_{stamp}.{fmt}")
+        try:
+            data = bundle.get(fmt)
+            with open(path, "wb") as f: f.write(data)
+        except Exception as e:
+            if fmt == "csv": raise
+            paths.append(f"(No guardado: {e})"); continue
+        paths.append(path)
+        if save_latest:
+            try:
+                with open(os.path.join(out_dir, f"{base_filename}_latest.{fmt}"), "wb") as f: f.write(data)
+            except Exception:
+                pass
+    return tuple(paths)
@@ -0,0 +1,158 @@
+# localizador/frontier.py — qué páginas de una web visitar primero para encontrar el contacto
+from __future__ import annotations
+
+import heapq, itertools, re, threading, unicodedata
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
+
+# Puntuación de enlaces por su URL y por el texto del enlace (sin acentos, en minúsculas)
+_URL_SCORES = [
+    (re.compile(r"contact|contacto|contactar|contacte|contactanos|donde-estamos|localizacion|ubicacion"), 10.0),
+    (re.compile(r"aviso-legal|avisolegal|aviso_legal|legal|imprint|impressum"), 7.0),
+    (re.compile(r"privacidad|privacy|politica-de-privacidad|proteccion-de-datos"), 5.0),
+    (re.compile(r"quienes-somos|sobre-nosotros|nosotros|empresa|about|equipo"), 4.0),
+    (re.compile(r"presupuesto|cita|reserva|horario"), 3.0),
+]
+_ANCHOR_SCORES = [
+    (re.compile(r"\bcontact|\bescribenos|\bllamanos|\bdonde estamos|\blocalizacion"), 12.0),
+    (re.compile(r"\btel[eé]?f|\btlf|\bemail|\be-mail|\bcorreo|\bwhatsapp"), 8.0),
+    (re.compile(r"\baviso legal|\blegal|\bprivacidad|\bprivacy"), 6.0),
+    (re.compile(r"\bquienes somos|\bnosotros|\bempresa|\babout"), 4.0),
+]
+_URL_PENALTIES = [
+    (re.compile(r"/(?:blog|noticias|news|articulos?|post|tag|category|categoria|author|autor|page|feed|comments?)(?:/|$)"), -6.0),
+    (re.compile(r"/(?:producto|productos|product|products|tienda|shop|carrito|cart|checkout|mi-cuenta|account|login|wp-admin|wp-json)(?:/|$)"), -8.0),
+    (re.compile(r"/20\d\d/|/\d{3,}(?:/|$)"), -4.0),  # entradas por fecha o id
+]
+_SKIP_EXT = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".zip", ".rar", ".doc", ".docx", ".xls",
+             ".xlsx", ".mp4", ".mp3", ".css", ".js", ".xml", ".json", ".ico", ".woff", ".woff2")
+_SKIP_SCHEMES = ("mailto:", "tel:", "javascript:", "data:", "whatsapp:", "callto:", "sms:", "#")
+_TRACKING_PARAMS = re.compile(r"^(?:utm_.*|fbclid|gclid|msclkid|mc_[a-z]+|ref|replytocom|share)$", re.I)
+
+# Rutas que se prueban a ciegas si la portada no enlaza a nada mejor, con su prioridad inicial
+GUESSED_PATHS = {"/contacto": 6.0, "/contact": 5.0, "/aviso-legal": 4.0, "/contacta": 3.5, "/contactar": 3.5,
+                 "/legal": 3.0, "/privacidad": 2.0, "/quienes-somos": 2.0, "/empresa": 1.5, "/about": 1.0}
+CONTACT_LINK_SCORE = 8.0  # desde aquí un enlace se considera "de contacto"
+HOME_SCORE = 100.0
+
+# Huellas de gestores de contenido en el HTML de la portada
+_CMS_MARKERS = [("wordpress", ("wp-content/", "wp-includes/")), ("wix", ("wixstatic.com", "wix.com")),
+                ("joomla", ("/media/jui/", "joomla", "/components/com_")), ("prestashop", ("prestashop",)),
+                ("shopify", ("cdn.shopify.com",)), ("squarespace", ("squarespace.com",)),
+                ("webnode", ("webnode.",)), ("jimdo", ("jimdo",)), ("drupal", ("drupal.js", "/sites/default/files"))]
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+
+def detect_cms(html: str) -> str:
+    head = (html or "")[:200_000].lower()
+    for name, markers in _CMS_MARKERS:
+        if any(m in head for m in markers): return name
+    return "otro"
+
+def canonical_url(url: str) -> str:
+    """URL without fragment, tracking parameters, default port, 'www.' or trailing slash; the
+    scheme is dropped too, so http/https and '' / '/' variants of one page compare equal."""
+    p = urlparse(url.strip())
+    host = (p.hostname or "").lower()
+    if host.startswith("www."): host = host[4:]
+    port = f":{p.port}" if p.port and p.port not in (80, 443) else ""
+    path = re.sub(r"/{2,}", "/", p.path or "/")
+    path = re.sub(r"/(?:index|default)\.(?:html?|php|aspx?)$", "/", path, flags=re.I)
+    if len(path) > 1: path = path.rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+                             if not _TRACKING_PARAMS.match(k)))
+    return f"//{host}{port}{path}" + (f"?{query}" if query else "")
+
+def path_key(url: str) -> str:
+    """Path part of canonical_url ('/contacto'); what ContactPathMemory remembers."""
+    path = urlparse(canonical_url(url)).path or "/"
+    return path.lower()
+
+def link_score(url: str, anchor: str = "") -> float:
+    path = _fold(urlparse(url).path + "?" + urlparse(url).query)
+    score = max((s for rx, s in _URL_SCORES if rx.search(path)), default=0.0)
+    text = _fold(anchor)
+    if text: score += max((s for rx, s in _ANCHOR_SCORES if rx.search(text)), default=0.0)
+    score += sum(s for rx, s in _URL_PENALTIES if rx.search(path))
+    return score - 0.5 * path.strip("/?").count("/")
+
+class ContactPathMemory:
+    """Which paths gave a site's email/phone, per CMS, learned while crawling (thread-safe).
+
+    record() is called for every page fetched; suggestions() then ranks the paths that worked
+    most often on other sites of the same CMS, so they are tried before blind guesses."""
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, cms: str, url: str, found: bool):
+        key = path_key(url)
+        if key == "/" or key.count("/") > 2: return
+        with self._lock:
+            row = self._stats.setdefault(cms, {}).setdefault(key, [0, 0])
+            row[0] += int(found); row[1] += 1
+
+    def suggestions(self, cms: str, limit: int = 4) -> List[Tuple[str, float]]:
+        """(path, success rate) of paths that found something at least once for `cms`."""
+        with self._lock:
+            rows = [(p, h / n) for p, (h, n) in self._stats.get(cms, {}).items() if h]
+        rows.sort(key=lambda r: -r[1])
+        return rows[:limit]
+
+class CrawlFrontier:
+    """Priority queue of same-site URLs: best-scored first, each canonical URL at most once."""
+    def __init__(self, base: str):
+        self.base = base
+        self.host = (urlparse(base).hostname or "").lower().removeprefix("www.")
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seen: set = set()
+        self._seq = itertools.count()
+
+    def __len__(self): return len(self._heap)
+
+    def same_site(self, url: str) -> bool:
+        host = (urlparse(url).hostname or "").lower().removeprefix("www.")
+        return bool(host) and (host == self.host or host.endswith("." + self.host) or self.host.endswith("." + host))
+
+    def push(self, url: str, score: float) -> bool:
+        if url.lower().startswith(_SKIP_SCHEMES): return False
+        url = url.split("#", 1)[0]
+        if not url or not urlparse(url).scheme.startswith("http") or not self.same_site(url): return False
+        if urlparse(url).path.lower().endswith(_SKIP_EXT): return False
+        key = canonical_url(url)
+        if key in self._seen: return False
+        self._seen.add(key)
+        heapq.heappush(self._heap, (-score, next(self._seq), url))
+        return True
+
+    def add_links(self, page_url: str, links: List[Tuple[str, str]]):
+        for href, anchor in links:
+            href = href.strip()
+            if href.lower().startswith(_SKIP_SCHEMES): continue
+            nxt = urljoin(page_url, href)
+            self.push(nxt, link_score(nxt, anchor))
+
+    def add_guesses(self, cms: str, memory: Optional[ContactPathMemory] = None):
+        """Blind guesses (GUESSED_PATHS), boosted by what worked for other sites of this CMS."""
+        learned = dict(memory.suggestions(cms)) if memory else {}
+        for path in dict.fromkeys(list(learned) + list(GUESSED_PATHS)):
+            self.push(urljoin(self.base + "/", path.lstrip("/")),
+                      GUESSED_PATHS.get(path, 0.0) + 8.0 * learned.get(path, 0.0))
+
+    def best_score(self) -> Optional[float]:
+        return -self._heap[0][0] if self._heap else None
+
+    def pop(self) -> Tuple[str, float]:
+        score, _, url = heapq.heappop(self._heap)
+        return url, -score
+
+_LOC = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.I)
+
+def sitemap_urls(xml: str) -> Tuple[List[str], List[str]]:
+    """(page URLs, child sitemap URLs) listed in a sitemap or sitemap index."""
+    pages, children = [], []
+    for loc in _LOC.findall(xml or ""):
+        loc = loc.replace("&amp;", "&")
+        (children if urlparse(loc).path.lower().endswith((".xml", ".xml.gz")) else pages).append(loc)
+    return pages, children
@@ -0,0 +1,121 @@
+# localizador/geocoding.py — Nominatim, polígonos de provincia y tabla offline
+from __future__ import annotations
+
+import csv, io, json, os, re, unicodedata
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import cache_key, get_response_cache
+from .net import HEADERS_HTML, RateLimiter, get_http_client
+from .trace import span
+
+NOMINATIM_URL="https://nominatim.openstreetmap.org/search"
+NOMINATIM_LIMITER = RateLimiter(1.0)  # política de uso de Nominatim público: 1 petición/s
+def geocode_one(q:str, polygon:bool=False):
+    params={"q":q,"format":"jsonv2","limit":1,"addressdetails":1}
+    if polygon: params.update({"polygon_geojson":1, "polygon_threshold":0.005})
+    cache=get_response_cache(); key=cache_key("nominatim", NOMINATIM_URL, params) if cache else None
+    with span("geocodificar", q=q) as sp:
+        hit=cache.get("nominatim", key) if cache else None
+        if hit is not None:
+            data=json.loads(hit); sp.set(cache="HIT")
+        else:
+            NOMINATIM_LIMITER.acquire()
+            r=get_http_client().request("GET", NOMINATIM_URL, params=params, headers=HEADERS_HTML, timeout=30)
+            sp.set(cache="MISS", status=r.status_code, bytes=len(r.content))
+            r.raise_for_status()
+            data=r.json()
+            if cache and data: cache.put("nominatim", key, r.text)
+        sp.set(results=len(data or []))
+    if not data: raise RuntimeError(f"No se pudo geocodificar '{q}'.")
+    return data[0]
+def geocode_latlon(q:str)->Tuple[float,float]:
+    d=geocode_one(q); return float(d["lat"]), float(d["lon"])
+def geocode_bbox(q:str)->Tuple[float,float,float,float]:
+    d=geocode_one(q); bb=d.get("boundingbox")
+    if not bb or len(bb)<4: raise RuntimeError("No se obtuvo bounding box de la provincia.")
+    south,north,west,east=map(float,bb); return south,north,west,east
+def _geojson_rings(gj: Optional[Dict[str, Any]]) -> List[List[Tuple[float,float]]]:
+    if not gj: return []
+    if gj.get("type") == "Polygon": polys = [gj.get("coordinates") or []]
+    elif gj.get("type") == "MultiPolygon": polys = gj.get("coordinates") or []
+    else: return []
+    return [[(float(x), float(y)) for x, y, *_ in ring] for poly in polys for ring in poly if len(ring) >= 3]
+def geocode_area(q:str)->Tuple[Tuple[float,float,float,float], List[List[Tuple[float,float]]]]:
+    """Bounding box plus polygon rings [(lon, lat), ...] of an administrative area (rings may be empty)."""
+    d=geocode_one(q, polygon=True); bb=d.get("boundingbox")
+    if not bb or len(bb)<4: raise RuntimeError("No se obtuvo bounding box de la provincia.")
+    south,north,west,east=map(float,bb)
+    return (south,north,west,east), _geojson_rings(d.get("geojson"))
+
+# Tabla offline (CSV): clave,lat,lon[,south,north,west,east]; clave = CP ("28001") o provincia/municipio
+GAZETTEER_PATH = os.getenv("LOCALIZADOR_GAZETTEER", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "datos", "gazetteer_es.csv"))
+
+def gazetteer_key(q: str) -> str:
+    q = re.sub(r",\s*(españa|espana|spain)\s*$", "", (q or "").strip(), flags=re.I)
+    q = unicodedata.normalize("NFKD", q).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", q).strip().lower()
+
+def load_gazetteer(src) -> Dict[str, Dict[str, Any]]:
+    """Read an offline centroid table from a path or a text/binary file object."""
+    if isinstance(src, str):
+        if not os.path.exists(src): return {}
+        fh = open(src, encoding="utf-8-sig", newline="")
+    else:
+        raw = src.read()
+        fh = io.StringIO(raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw)
+    out: Dict[str, Dict[str, Any]] = {}
+    with fh:
+        for row in csv.DictReader(fh):
+            try:
+                entry: Dict[str, Any] = {"lat": float(row["lat"]), "lon": float(row["lon"])}
+            except (KeyError, TypeError, ValueError):
+                continue
+            try: entry["boundingbox"] = [float(row[k]) for k in ("south", "north", "west", "east")]
+            except (KeyError, TypeError, ValueError): pass
+            out[gazetteer_key(row.get("clave", ""))] = entry
+    return out
+
+class Geocoder:
+    """Per-run geocoder: offline gazetteer first, then Nominatim (1 req/s, cached), each place once."""
+    def __init__(self, gazetteer: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.gazetteer = gazetteer or {}
+        self._memo: Dict[Tuple[str, bool], Dict[str, Any]] = {}
+        self.stats = {"tabla": 0, "memoria": 0, "red": 0}
+
+    def lookup(self, q: str, polygon: bool = False) -> Dict[str, Any]:
+        k = (gazetteer_key(q), polygon)
+        if k in self._memo:
+            self.stats["memoria"] += 1; return self._memo[k]
+        entry = self.gazetteer.get(k[0])
+        if entry and not polygon:
+            self.stats["tabla"] += 1; d = entry
+        else:
+            try:
+                d = geocode_one(q, polygon=polygon); self.stats["red"] += 1
+            except Exception:
+                if not entry: raise
+                self.stats["tabla"] += 1; d = entry  # sin red: centroide/bbox de la tabla
+        self._memo[k] = d
+        return d
+
+    def latlon(self, q: str) -> Tuple[float, float]:
+        d = self.lookup(q); return float(d["lat"]), float(d["lon"])
+
+    def area(self, q: str) -> Tuple[Tuple[float,float,float,float], List[List[Tuple[float,float]]]]:
+        d = self.lookup(q, polygon=True); bb = d.get("boundingbox")
+        if not bb or len(bb) < 4: raise RuntimeError("No se obtuvo bounding box de la provincia.")
+        south, north, west, east = map(float, bb)
+        return (south, north, west, east), _geojson_rings(d.get("geojson"))
+
+    def latlon_many(self, queries: List[str], on_progress: Optional[Callable[[int, int], None]] = None
+                    ) -> Dict[str, Optional[Tuple[float, float]]]:
+        """Geocode a batch: table/memo hits are resolved at once, the rest go to Nominatim
+        one per second. Places that cannot be resolved map to None instead of aborting."""
+        uniq = list(dict.fromkeys(queries)); out: Dict[str, Optional[Tuple[float, float]]] = {}
+        offline = [q for q in uniq if (gazetteer_key(q), False) in self._memo or gazetteer_key(q) in self.gazetteer]
+        online = [q for q in uniq if q not in offline]
+        for i, q in enumerate(offline + online, 1):
+            try: out[q] = self.latlon(q)
+            except Exception: out[q] = None
+            if on_progress: on_progress(i, len(uniq))
+        return out
@@ -0,0 +1,402 @@
+# localizador/jobs.py — cola persistente de búsquedas en segundo plano, compartida por todas las sesiones
+"""Uso:
+    python -m localizador.jobs --trabajadores 2 --qps 10     # proceso trabajador dedicado
+    python -m localizador.jobs --lista                       # estado de la cola
+
+La app encola cada búsqueda (JobQueue.submit) y consulta su estado; los trabajadores (JobWorker,
+dentro del propio servidor de Streamlit o en un proceso aparte) las ejecutan con un único límite de
+peticiones a Google para todos los trabajos."""
+from __future__ import annotations
+
+import argparse, json, logging, os, socket, sqlite3, sys, threading, time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .cache import ResponseCache, get_response_cache, set_response_cache, using_response_cache
+from .checkpoint import RunCheckpoint, job_id_for
+from .engine import SearchParams, SearchRun
+from .export import save_outputs
+from .models import Business, businesses_to_df
+from .net import RateLimiter, SharedRateLimiter
+from .store import STORE_ENRICH_MAX_AGE_DAYS, BusinessStore
+from .trace import Tracer, trace_path, using_tracer
+
+log = logging.getLogger("localizador.jobs")
+
+JOBS_PATH = os.getenv("LOCALIZADOR_JOBS", os.path.join(os.getcwd(), "salidas", "trabajos.sqlite"))
+JOB_WORKERS = int(os.getenv("LOCALIZADOR_JOB_WORKERS", "2"))  # 0 = sin trabajadores en este proceso
+JOB_GOOGLE_QPS = float(os.getenv("LOCALIZADOR_JOB_QPS", "10"))  # para todos los procesos a la vez
+JOB_STALE_S = 120.0      # un trabajo "ejecutando" sin latido en este tiempo se devuelve a la cola
+JOB_HEARTBEAT_S = 30.0
+JOB_PROGRESS_S = 1.0     # como mucho una escritura de progreso por segundo y trabajo
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "en_cola", "ejecutando", "hecho", "error", "cancelado"
+ACTIVE = (QUEUED, RUNNING)
+
+@dataclass
+class JobOptions:
+    """How a job runs, besides its SearchParams (the rest of the sidebar)."""
+    usar_base: bool = True
+    dias_reenriquecer: float = STORE_ENRICH_MAX_AGE_DAYS
+    reanudar: bool = True
+    nombre_base: Optional[str] = None  # guardar CSV/Excel en salidas/ al terminar
+    parquet: bool = False
+    save_latest: bool = True           # y las copias *_latest
+    usar_cache: bool = True
+    forzar_refresco: bool = False      # pedir todo de nuevo (y no reanudar)
+    diagnostico: bool = False          # todos los errores en `warnings` y tiempos por etapa
+    guardar_traza: bool = False        # con diagnóstico, traza JSONL en salidas/ (queda en `paths`)
+
+@dataclass
+class Job:
+    id: int
+    owner: str
+    key: str
+    params: SearchParams
+    options: JobOptions
+    state: str = QUEUED
+    created: float = 0.0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    step: int = 0
+    total: int = 1
+    message: str = ""
+    n: int = 0
+    n_email: int = 0
+    cost_usd: float = 0.0
+    run_id: Optional[int] = None
+    error: Optional[str] = None
+    warnings: List[str] = field(default_factory=list)
+    paths: List[str] = field(default_factory=list)
+    cancel: bool = False
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE
+
+    @property
+    def progress(self) -> float:
+        return 1.0 if self.state == DONE else min(1.0, self.step / max(1, self.total))
+
+_COLUMNS = ("id", "owner", "key", "params", "options", "state", "created", "started", "finished", "step",
+            "total", "message", "n", "n_email", "cost_usd", "run_id", "error", "warnings", "paths", "cancel")
+
+class JobQueue:
+    """Persistent queue of search jobs in SQLite, shared by every session and worker process.
+
+    submit() enqueues a search (or returns the active job already running the same search with
+    the same JobOptions, so two users asking for the same province share one run — the job's
+    `owner` tells the second one it was shared); workers claim() jobs fairly — the owner with
+    fewest running jobs first, then the oldest — report progress (which doubles as heartbeat) and
+    partial results, and finish() them. A job whose worker stops beating for JOB_STALE_S goes back to
+    the queue and resumes from its RunCheckpoint. Thread- and process-safe."""
+    def __init__(self, path: str = JOBS_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, owner TEXT, "
+                         "key TEXT, params TEXT, options TEXT, state TEXT, created REAL, started REAL, "
+                         "finished REAL, step INTEGER DEFAULT 0, total INTEGER DEFAULT 1, message TEXT DEFAULT '', "
+                         "n INTEGER DEFAULT 0, n_email INTEGER DEFAULT 0, cost_usd REAL DEFAULT 0, run_id INTEGER, "
+                         "error TEXT, warnings TEXT DEFAULT '[]', paths TEXT DEFAULT '[]', cancel INTEGER DEFAULT 0, "
+                         "heartbeat REAL, worker TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS job_items (job_id INTEGER, pos INTEGER, data TEXT, "
+                         "PRIMARY KEY (job_id, pos))")
+
+    def _job(self, row) -> Job:
+        rec = dict(zip(_COLUMNS, row))
+        rec["params"] = SearchParams(**json.loads(rec["params"]))
+        rec["options"] = JobOptions(**json.loads(rec["options"]))
+        rec["warnings"] = json.loads(rec["warnings"] or "[]"); rec["paths"] = json.loads(rec["paths"] or "[]")
+        rec["cancel"] = bool(rec["cancel"])
+        return Job(**rec)
+
+    def _select(self, where: str = "", args: tuple = (), tail: str = "") -> List[Job]:
+        with self._lock:
+            rows = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs {where} {tail}", args).fetchall()
+        return [self._job(r) for r in rows]
+
+    def submit(self, params: SearchParams, owner: str = "", options: Optional[JobOptions] = None) -> int:
+        """Queue a search and return its job id. An active job with the same search and options is
+        reused (it may belong to another owner); different options always get their own job."""
+        key = params.job_id()
+        opts = json.dumps(asdict(options or JobOptions()), ensure_ascii=False)
+        with self._lock:
+            row = self._db.execute("SELECT id FROM jobs WHERE key=? AND options=? AND state IN (?,?) "
+                                   "ORDER BY id LIMIT 1", (key, opts, *ACTIVE)).fetchone()
+            if row: return int(row[0])
+            cur = self._db.execute(
+                "INSERT INTO jobs (owner, key, params, options, state, created) VALUES (?,?,?,?,?,?)",
+                (owner, key, json.dumps(asdict(params), ensure_ascii=False), opts, QUEUED, time.time()))
+            return int(cur.lastrowid)
+
+    def get(self, job_id: int) -> Optional[Job]:
+        jobs = self._select("WHERE id=?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def list(self, owner: Optional[str] = None, ids: Optional[List[int]] = None, limit: int = 50) -> List[Job]:
+        """Most recent jobs, optionally of one owner and/or among `ids`."""
+        where, args = [], []
+        if owner is not None: where.append("owner=?"); args.append(owner)
+        if ids is not None:
+            if not ids: return []
+            where.append(f"id IN ({', '.join('?' for _ in ids)})"); args += list(ids)
+        return self._select("WHERE " + " AND ".join(where) if where else "", tuple(args),
+                            f"ORDER BY id DESC LIMIT {int(limit)}")
+
+    def position(self, job_id: int) -> int:
+        """Queued jobs ahead of `job_id` (0 when it is next, running or finished)."""
+        job = self.get(job_id)
+        if job is None or job.state != QUEUED: return 0
+        with self._lock:
+            row = self._db.execute("SELECT COUNT(*) FROM jobs WHERE state=? AND created < ?",
+                                   (QUEUED, job.created)).fetchone()
+        return int(row[0])
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Take the next queued job for `worker`: the owner with fewest running jobs goes first."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT j.id FROM jobs j WHERE j.state=? ORDER BY "
+                    "(SELECT COUNT(*) FROM jobs r WHERE r.owner=j.owner AND r.state=?), j.created LIMIT 1",
+                    (QUEUED, RUNNING)).fetchone()
+                if row:
+                    now = time.time()
+                    self._db.execute("UPDATE jobs SET state=?, started=COALESCE(started, ?), heartbeat=?, worker=? "
+                                     "WHERE id=?", (RUNNING, now, now, worker, row[0]))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK"); raise
+        return self.get(int(row[0])) if row else None
+
+    def progress(self, job_id: int, step: int, total: int, message: str = "", n: int = 0, n_email: int = 0) -> bool:
+        """Record progress (and heartbeat); returns True if the job has been asked to stop."""
+        with self._lock:
+            self._db.execute("UPDATE jobs SET step=?, total=?, message=?, n=?, n_email=?, heartbeat=? WHERE id=?",
+                             (step, total, message, n, n_email, time.time(), job_id))
+            row = self._db.execute("SELECT cancel FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def beat(self, job_ids: List[int]):
+        if not job_ids: return
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET heartbeat=? WHERE id IN ({', '.join('?' for _ in job_ids)})",
+                             (time.time(), *job_ids))
+
+    def put_items(self, job_id: int, items: Dict[int, Business]):
+        """Insert or refresh partial results of a running job, by position in the run."""
+        if not items: return
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO job_items VALUES (?,?,?)",
+                                 [(job_id, pos, json.dumps(asdict(b), ensure_ascii=False)) for pos, b in items.items()])
+
+    def items(self, job_id: int) -> List[Business]:
+        with self._lock:
+            rows = self._db.execute("SELECT data FROM job_items WHERE job_id=? ORDER BY pos", (job_id,)).fetchall()
+        return [Business(**json.loads(r[0])) for r in rows]
+
+    def to_df(self, job_id: int) -> pd.DataFrame:
+        """Results of a job: from the business store once finished with it, else the partial rows."""
+        job = self.get(job_id)
+        if job and job.state == DONE and job.run_id is not None and job.options.usar_base:
+            return BusinessStore(max_age_days=job.options.dias_reenriquecer).to_df(job.run_id)
+        return businesses_to_df(self.items(job_id))
+
+    def finish(self, job_id: int, state: str, error: Optional[str] = None, run_id: Optional[int] = None,
+               cost_usd: float = 0.0, warnings: Optional[List[str]] = None, paths: Optional[List[str]] = None):
+        with self._lock:
+            self._db.execute("UPDATE jobs SET state=?, finished=?, error=?, run_id=?, cost_usd=?, warnings=?, "
+                             "paths=?, heartbeat=NULL WHERE id=?",
+                             (state, time.time(), error, run_id, cost_usd,
+                              json.dumps(warnings or [], ensure_ascii=False),
+                              json.dumps(paths or [], ensure_ascii=False), job_id))
+
+    def cancel(self, job_id: int):
+        """Drop a queued job at once; a running one stops at its next progress report."""
+        with self._lock:
+            self._db.execute("UPDATE jobs SET state=?, finished=? WHERE id=? AND state=?",
+                             (CANCELLED, time.time(), job_id, QUEUED))
+            self._db.execute("UPDATE jobs SET cancel=1 WHERE id=? AND state=?", (job_id, RUNNING))
+
+    def requeue_stale(self, max_age_s: float = JOB_STALE_S) -> int:
+        """Put back in the queue running jobs whose worker died (no heartbeat for `max_age_s`)."""
+        with self._lock:
+            cur = self._db.execute("UPDATE jobs SET state=?, worker=NULL WHERE state=? AND heartbeat < ?",
+                                   (QUEUED, RUNNING, time.time() - max_age_s))
+        return cur.rowcount
+
+    def close(self):
+        with self._lock: self._db.close()
+
+def google_limiter(path: str = JOBS_PATH, qps: float = JOB_GOOGLE_QPS,
+                   local_qps: Optional[float] = None) -> SharedRateLimiter:
+    """Pace to Google shared through the queue database by every process using it; `local_qps`
+    also keeps the caller's own lower pace (a foreground search's google_qps)."""
+    return SharedRateLimiter(path, qps, "google", RateLimiter(local_qps) if local_qps else None)
+
+class JobWorker:
+    """Pool of threads running queued jobs in this process. Google is paced by a SharedRateLimiter
+    kept in the queue's database, so every worker process (and the app's foreground searches,
+    see google_limiter) stays under one `qps` together.
+
+    Each job is a SearchRun with its RunCheckpoint (so a requeued job resumes) and, if asked, the
+    business store. `attach()` hands the jobs of a search key secrets that are not written to the
+    queue (the API key typed in a session, an uploaded gazetteer); call it before JobQueue.submit so
+    a worker never claims the job without them. Otherwise the worker uses GOOGLE_API_KEY. A response
+    cache is installed for the process if there is none; each job uses it, a force-refresh one or
+    none as its JobOptions say, and its own tracer when asked for diagnostics."""
+    def __init__(self, queue: JobQueue, workers: int = JOB_WORKERS, qps: float = JOB_GOOGLE_QPS,
+                 api_key: Optional[str] = None, poll_s: float = 1.0):
+        self.queue = queue
+        self.workers = max(1, int(workers))
+        self.limiter = google_limiter(queue.path, qps)
+        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        self.poll_s = poll_s
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._attached: Dict[str, Dict[str, Any]] = {}
+        self._running: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def attach(self, key: str, api_key: Optional[str] = None, gazetteer: Optional[Dict[str, Any]] = None):
+        """Secrets for the next job with SearchParams.job_id() == `key` run here (kept until it ends)."""
+        with self._lock: self._attached[key] = {"api_key": api_key, "gazetteer": gazetteer}
+
+    @property
+    def running(self) -> List[int]:
+        with self._lock: return list(self._running)
+
+    def start(self) -> "JobWorker":
+        if self._threads: return self
+        if get_response_cache() is None: set_response_cache(ResponseCache())
+        self.queue.requeue_stale()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"trabajo_{i}", daemon=True); t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat, name="trabajos_latido", daemon=True); t.start()
+        self._threads.append(t)
+        return self
+
+    def stop(self, wait: bool = False):
+        self._stop.set()
+        if wait:
+            for t in self._threads: t.join()
+
+    def _heartbeat(self):
+        while not self._stop.wait(JOB_HEARTBEAT_S):
+            try:
+                self.queue.beat(self.running); self.queue.requeue_stale()
+            except sqlite3.Error as e:
+                log.warning("Latido de trabajos: %s", e)
+
+    def _loop(self):
+        me = f"{self.name}/{threading.current_thread().name}"
+        while not self._stop.is_set():
+            job = self.queue.claim(me)
+            if job is None:
+                self._stop.wait(self.poll_s); continue
+            with self._lock:
+                self._running[job.id] = me; extra = self._attached.get(job.key)
+            try:
+                self.run_job(job, extra)
+            except Exception as e:  # un trabajo roto no tumba al trabajador
+                log.exception("Trabajo %s falló", job.id)
+                self.queue.finish(job.id, FAILED, error=str(e))
+            finally:
+                with self._lock:
+                    self._running.pop(job.id, None)
+                    # otra sesión puede haber adjuntado ya los suyos para un trabajo nuevo con la misma clave
+                    if extra is not None and self._attached.get(job.key) is extra: del self._attached[job.key]
+
+    def run_job(self, job: Job, extra: Optional[Dict[str, Any]] = None):
+        opt = job.options
+        cache = (ResponseCache(force_refresh=True) if opt.forzar_refresco else get_response_cache()) \
+            if opt.usar_cache else None
+        tracer = Tracer(trace_path(job.key) if opt.guardar_traza else None) if opt.diagnostico else None
+        try:
+            with using_response_cache(cache), using_tracer(tracer):
+                self._run(job, extra or {}, tracer)
+        finally:
+            if tracer: tracer.close()
+
+    def _run(self, job: Job, extra: Dict[str, Any], tracer: Optional[Tracer]):
+        p, opt = job.params, job.options
+        warnings: List[str] = []; keep = None if opt.diagnostico else 5
+        # la misma búsqueda con otras opciones puede estar en marcha a la vez: cada una con su checkpoint
+        checkpoint = RunCheckpoint(job_id_for({"busqueda": job.key, "opciones": asdict(opt)}), p.meta(),
+                                   resume=opt.reanudar and not opt.forzar_refresco)
+        run = SearchRun(p, api_key=extra.get("api_key") or self.api_key, gazetteer=extra.get("gazetteer"),
+                        on_errors=lambda msgs: warnings.extend(msgs[-keep:] if keep else msgs), checkpoint=checkpoint,
+                        store=BusinessStore(max_age_days=opt.dias_reenriquecer) if opt.usar_base else None,
+                        limiter=self.limiter)
+        state = {"t": 0.0, "cancel": False, "msg": ""}
+        def _on_progress(step, total, msg):
+            state["msg"] = msg or state["msg"]
+            now = time.monotonic()
+            if now - state["t"] < JOB_PROGRESS_S: return
+            state["t"] = now
+            state["cancel"] = self.queue.progress(job.id, step, total, state["msg"], len(run.items),
+                                                  sum(1 for b in run.items if b.email))
+        run.on_progress = _on_progress
+        run.plan()
+        pos: Dict[int, int] = {}; batches = iter(run)
+        try:
+            for batch in batches:
+                for b in run.items[len(pos):]: pos[id(b)] = len(pos)
+                self.queue.put_items(job.id, {pos[id(b)]: b for b in batch if id(b) in pos})
+                if state["cancel"]: break
+        finally:
+            batches.close()  # cierra webs y checkpoint también al cancelar
+        warnings = run.warnings + (warnings if opt.diagnostico else warnings[-20:])
+        if tracer:
+            warnings.append("Tiempos por etapa: " + ", ".join(f"{r['Etapa']} {r['Spans']}×{r['Total (s)']} s"
+                                                               for r in tracer.summary()[:8]))
+        if state["cancel"]:
+            self.queue.finish(job.id, CANCELLED, run_id=run.run_id, cost_usd=run.ledger.as_meta()["coste_usd"],
+                              warnings=warnings)
+            return
+        self.queue.progress(job.id, run.total, run.total, "Terminado", len(run.items),
+                            sum(1 for b in run.items if b.email))
+        paths: List[str] = []
+        if opt.nombre_base:
+            paths = list(save_outputs(run.to_df(), opt.nombre_base, save_latest=opt.save_latest,
+                                      parquet=opt.parquet))
+        if tracer and tracer.path: paths.append(tracer.path)
+        self.queue.finish(job.id, DONE, run_id=run.run_id, cost_usd=run.ledger.as_meta()["coste_usd"],
+                          warnings=warnings, paths=paths)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m localizador.jobs",
+                                 description="Trabajador de la cola de búsquedas en segundo plano.")
+    ap.add_argument("--trabajadores", type=int, default=max(1, JOB_WORKERS), help="Trabajos a la vez")
+    ap.add_argument("--qps", type=float, default=JOB_GOOGLE_QPS, help="Peticiones por segundo a Google, en total")
+    ap.add_argument("--cola", default=JOBS_PATH, help="Base SQLite de la cola")
+    ap.add_argument("--lista", action="store_true", help="Mostrar los últimos trabajos y salir")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr)
+    queue = JobQueue(args.cola)
+    if args.lista:
+        for j in queue.list(limit=30):
+            print(f"#{j.id:<5}{j.state:<11}{j.owner[:12]:<13}{int(100 * j.progress):>4}% {j.n:>6} negocios  "
+                  f"{', '.join(j.params.gremios)[:40]} · {j.message[:40]}")
+        return 0
+    worker = JobWorker(queue, args.trabajadores, args.qps).start()
+    log.info("Trabajador %s: %d trabajos a la vez, %.1f QPS a Google (cola %s)",
+             worker.name, worker.workers, args.qps, queue.path)
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        worker.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# localizador/models.py — registro de negocio y tabla de resultados
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd  # se importa al construir la primera tabla (arranque más rápido)
+
+def _intern(s):
+    return sys.intern(s) if type(s) is str else s
+
+@dataclass(slots=True)
+class Business:
+    """One business found. Slotted (no per-instance __dict__), and the values repeated across
+    thousands of rows (gremio, source, today's opening hours) are interned, so records decoded
+    from JSON or SQLite share one copy of each string."""
+    gremio: str
+    name: str
+    street: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    website: Optional[str] = None
+    rating: Optional[float] = None
+    reviews: Optional[int] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    source: str = "Google"
+    place_id: Optional[str] = None
+    open_now: Optional[bool] = None
+    open_today: Optional[str] = None
+    google_maps: Optional[str] = None
+
+    def __post_init__(self):
+        self.gremio = _intern(self.gremio); self.source = _intern(self.source)
+        self.open_today = _intern(self.open_today)
+
+    def full_address(self) -> str:
+        return self.street or ""
+
+# columna de la tabla de resultados -> atributo de Business
+RESULT_FIELDS = {"Gremio": "gremio", "Nombre": "name", "Dirección": "street", "Teléfono": "phone",
+                 "Email": "email", "Web": "website", "Rating": "rating", "Opiniones": "reviews",
+                 "AbiertoAhora": "open_now", "HorarioHoy": "open_today", "GoogleMaps": "google_maps",
+                 "Lat": "lat", "Lon": "lon", "Fuente": "source"}
+RESULT_COLUMNS = list(RESULT_FIELDS)
+CATEGORY_COLUMNS = ("Gremio", "Fuente")  # pocos valores distintos: categorías en vez de un objeto por fila
+_getters = [attrgetter(f) for f in RESULT_FIELDS.values()]
+
+def columns_to_df(cols: Sequence[Sequence]) -> pd.DataFrame:
+    """Result table from one sequence per column, ordered like RESULT_FIELDS; no dict per row."""
+    import pandas as pd
+    df = pd.DataFrame(dict(zip(RESULT_COLUMNS, cols)), columns=RESULT_COLUMNS)
+    df["Dirección"] = df["Dirección"].fillna("")
+    for c in CATEGORY_COLUMNS: df[c] = df[c].astype("category")
+    return df
+
+def rows_to_df(rows: Sequence[Sequence]) -> pd.DataFrame:
+    """Result table from row tuples ordered like RESULT_FIELDS (e.g. SQL rows)."""
+    return columns_to_df(list(zip(*rows)) or [()] * len(RESULT_COLUMNS))
+
+def businesses_to_df(items: List[Business]) -> pd.DataFrame:
+    return columns_to_df([list(map(g, items)) for g in _getters])
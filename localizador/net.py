@@ -0,0 +1,208 @@
+# localizador/net.py — cabeceras, ritmo de peticiones y reintentos compartidos
+from __future__ import annotations
+
+import importlib.util, logging, os, random, sqlite3, threading, time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# HTTP/2 opcional para la API de Google (pip install "httpx[http2]"); sin h2, httpx no negocia HTTP/2
+if importlib.util.find_spec("httpx") and importlib.util.find_spec("h2"):
+    import httpx  # type: ignore
+else:
+    httpx = None
+
+log = logging.getLogger("localizador.net")
+
+HEADERS_HTML = {"User-Agent":"localizador-custom/2.0","Accept":"text/html,application/json"}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def retry_wait(attempt: int, retry_after: Optional[str] = None) -> float:
+    try:
+        if retry_after: return min(30.0, float(retry_after))
+    except ValueError:
+        pass
+    return min(30.0, 2 ** attempt) * (0.5 + random.random())
+
+class HostThrottle:
+    """Polite per-host pacing: at most one request every `delay` seconds to the same host."""
+    def __init__(self, delay: float = 0.8):
+        self.delay = max(0.0, float(delay))
+        self._lock = threading.Lock()
+        self._next: Dict[str, float] = {}
+
+    def wait(self, url: str, deadline: Optional[float] = None) -> bool:
+        host = urlparse(url).netloc.split(":")[0].lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, 0.0))
+            if deadline is not None and slot >= deadline:
+                return False
+            self._next[host] = slot + self.delay
+        if slot > now: time.sleep(slot - now)
+        return True
+
+class RateLimiter:
+    """Thread-safe pacing to at most `qps` calls per second (0 = unlimited)."""
+    def __init__(self, qps: float = 5.0):
+        self.interval = 1.0 / qps if qps and qps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now: time.sleep(slot - now)
+
+class SharedRateLimiter:
+    """RateLimiter whose pace is shared by every process using the same SQLite file.
+
+    Each call takes the next free slot of the `name` row in one write transaction, so separate
+    `python -m localizador.jobs` workers, the app's worker and its foreground searches together
+    stay under `qps`. A `local` RateLimiter is waited for first, for a caller that also keeps a
+    lower pace of its own. If the file cannot be written the pacing falls back to this process."""
+    def __init__(self, path: str, qps: float, name: str = "google", local: Optional[RateLimiter] = None):
+        self.interval = 1.0 / qps if qps and qps > 0 else 0.0
+        self.name = name; self.local = local
+        self._fallback = RateLimiter(qps)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, next_at REAL)")
+
+    def acquire(self):
+        if self.local: self.local.acquire()
+        if not self.interval: return
+        try:
+            with self._lock:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._db.execute("SELECT next_at FROM rate_limits WHERE name=?", (self.name,)).fetchone()
+                    now = time.time(); slot = max(now, row[0] if row else 0.0)
+                    self._db.execute("INSERT OR REPLACE INTO rate_limits VALUES (?,?)",
+                                     (self.name, slot + self.interval))
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK"); raise
+        except sqlite3.Error as e:
+            log.warning("Límite compartido no disponible (%s): ritmo local", e)
+            return self._fallback.acquire()
+        if slot > now: time.sleep(slot - now)
+
+    def close(self):
+        with self._lock: self._db.close()
+
+# ---------- Cliente HTTP compartido ----------
+HTTP_PER_HOST = 4          # conexiones simultáneas máx. a la web de un negocio
+HTTP_PER_HOST_API = 16     # Google, Nominatim, Overpass
+HTTP_MAX_HOSTS = 256       # pools de conexiones abiertos a la vez
+HTML_MAX_BYTES = 2 * 1024 * 1024  # se deja de leer una página a partir de aquí
+HTTP2_ENABLED = os.getenv("LOCALIZADOR_HTTP2", "1") != "0"
+
+TRANSPORT_ERRORS: Tuple[type, ...] = (requests.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+class HttpClient:
+    """One HTTP layer for every I/O path: pooled keep-alive sessions (one for APIs, one for
+    business websites) with per-host connection caps, connect retries, a size limit for HTML
+    pages and HTTP/2 for the Google API when httpx[http2] is installed. Thread-safe;
+    summary() reports requests and connection reuse per channel."""
+    def __init__(self, per_host: int = HTTP_PER_HOST, api_per_host: int = HTTP_PER_HOST_API,
+                 http2: bool = HTTP2_ENABLED, html_max_bytes: int = HTML_MAX_BYTES):
+        self.html_max_bytes = html_max_bytes
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._web = self._session("web", per_host)
+        self._api = self._session("api", api_per_host)
+        self._h2 = None
+        if http2 and httpx is not None:
+            self._h2 = httpx.Client(http2=True, timeout=30, limits=httpx.Limits(
+                max_connections=api_per_host, max_keepalive_connections=api_per_host))
+
+    def _count(self, channel: str, **inc: int):
+        with self._lock:
+            row = self._stats.setdefault(channel, {"requests": 0, "connections": 0, "h2": 0, "truncated": 0})
+            for k, v in inc.items(): row[k] += v
+
+    def _session(self, channel: str, per_host: int) -> requests.Session:
+        s = requests.Session()
+        retry = Retry(total=2, connect=2, read=0, status=0, other=0, backoff_factor=0.3, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=HTTP_MAX_HOSTS, pool_maxsize=per_host, pool_block=True,
+                              max_retries=retry)
+        def _dispose(pool, _channel=channel):  # un pool expulsado: sus conexiones cuentan igual
+            self._count(_channel, connections=pool.num_connections); pool.close()
+        adapter.poolmanager.pools.dispose_func = _dispose
+        s.mount("http://", adapter); s.mount("https://", adapter)
+        return s
+
+    def request(self, method: str, url: str, *, http2: bool = False, **kw: Any):
+        """API request (Google, Nominatim, Overpass); `http2` routes it through httpx if available."""
+        if http2 and self._h2 is not None:
+            r = self._h2.request(method, url, **kw)
+            self._count("api-h2", requests=1, h2=int(r.http_version == "HTTP/2"))
+            return r
+        self._count("api", requests=1)
+        return self._api.request(method, url, **kw)
+
+    def fetch_page(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 20,
+                   types: Tuple[str, ...] = ("text/html",)) -> Tuple[int, str, Optional[str]]:
+        """GET a web page reading at most `html_max_bytes`: (status, content type, text or None).
+        Bodies whose content type contains none of `types` are not read."""
+        self._count("web", requests=1)
+        with self._web.get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=True) as r:
+            ctype = r.headers.get("Content-Type", "")
+            if r.status_code != 200 or not any(t in ctype for t in types): return r.status_code, ctype, None
+            chunks: List[bytes] = []; size = 0
+            for chunk in r.iter_content(64 * 1024):
+                chunks.append(chunk); size += len(chunk)
+                if size >= self.html_max_bytes:
+                    self._count("web", truncated=1); break
+            raw = b"".join(chunks)[:self.html_max_bytes]
+            return r.status_code, ctype, raw.decode(r.encoding or "utf-8", errors="replace")
+
+    def summary(self) -> List[Dict[str, Any]]:
+        live: Dict[str, Tuple[int, int]] = {}
+        for channel, sess in (("web", self._web), ("api", self._api)):
+            pools = sess.get_adapter("https://").poolmanager.pools
+            conns = 0
+            for key in list(pools.keys()):
+                try: conns += pools[key].num_connections
+                except KeyError: pass
+            live[channel] = (conns, len(pools))
+        out = []
+        with self._lock:
+            for channel, row in sorted(self._stats.items()):
+                conns = row["connections"] + live.get(channel, (0, 0))[0]
+                n = row["requests"]
+                out.append({"Canal": channel, "Peticiones": n,
+                            "Conexiones nuevas": conns if channel != "api-h2" else None,
+                            "% reutilizadas": round(100 * (1 - conns / n), 1) if n and channel != "api-h2" else None,
+                            "HTTP/2": row["h2"] if channel == "api-h2" else None,
+                            "Páginas recortadas": row["truncated"] if channel == "web" else None})
+        return out
+
+    def close(self):
+        self._web.close(); self._api.close()
+        if self._h2 is not None: self._h2.close()
+
+_HTTP_CLIENT: Optional[HttpClient] = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """The process-wide HttpClient (created on first use)."""
+    global _HTTP_CLIENT
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is None: _HTTP_CLIENT = HttpClient()
+        return _HTTP_CLIENT
+
+def set_http_client(client: Optional[HttpClient]):
+    """Replace the shared client (None: a fresh one is created on next use)."""
+    global _HTTP_CLIENT
+    with _HTTP_CLIENT_LOCK:
+        old, _HTTP_CLIENT = _HTTP_CLIENT, client
+    if old is not None and old is not client: old.close()
@@ -0,0 +1,164 @@
+# localizador/osm.py — OpenStreetMap como fuente masiva: Overpass (público o local) o extracto .osm.pbf
+from __future__ import annotations
+
+import json, math, os, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .cache import cache_key, get_response_cache
+from .models import Business
+from .net import HEADERS_HTML, RETRY_STATUS, TRANSPORT_ERRORS, RateLimiter, get_http_client, retry_wait
+from .sweep import point_in_area
+from .trace import span
+
+OVERPASS_URL = os.getenv("LOCALIZADOR_OVERPASS", "https://overpass-api.de/api/interpreter")
+OVERPASS_LIMITER = RateLimiter(0.5)  # el servidor público reparte "slots"; sin ráfagas
+OVERPASS_TIMEOUT_S = 180
+
+# Etiquetas OSM (clave, valor) de cada gremio; se consultan todas en una sola petición por zona
+GREMIO_TO_OSM_TAGS = {
+    "Fontaneros": [("craft", "plumber")],
+    "Electricistas": [("craft", "electrician")],
+    "Cerrajeros": [("shop", "locksmith"), ("craft", "locksmith")],
+    "Reparación de electrodomésticos": [("craft", "electronics_repair"), ("shop", "appliance")],
+    "Carpinteros": [("craft", "carpenter")],
+    "Pintores": [("craft", "painter")],
+    "Dentistas": [("amenity", "dentist"), ("healthcare", "dentist")],
+    "Abogados": [("office", "lawyer")],
+    "Fisioterapeutas": [("healthcare", "physiotherapist")],
+    "Psicólogos": [("healthcare", "psychotherapist"), ("office", "psychologist")],
+    "Informáticos": [("shop", "computer"), ("office", "it")],
+}
+
+Circle = Tuple[float, float, float]  # lat, lon, radio_km
+
+def osm_filters(gremios: Sequence[str]) -> List[Tuple[str, str]]:
+    """Distinct (key, value) tag filters covering `gremios`, in first-seen order."""
+    out: List[Tuple[str, str]] = []
+    for g in gremios:
+        for kv in GREMIO_TO_OSM_TAGS.get(g, []):
+            if kv not in out: out.append(kv)
+    return out
+
+def overpass_query(filters: Sequence[Tuple[str, str]], bbox: Optional[Tuple[float,float,float,float]] = None,
+                   circles: Sequence[Circle] = (), timeout: int = OVERPASS_TIMEOUT_S) -> str:
+    """One Overpass QL query for every tag filter over a bbox (south, north, west, east) or a set of circles."""
+    if bbox:
+        s, n, w, e = bbox; scopes = [f"({s:.6f},{w:.6f},{n:.6f},{e:.6f})"]
+    else:
+        scopes = [f"(around:{int(r * 1000)},{lat:.6f},{lon:.6f})" for lat, lon, r in circles]
+    body = "".join(f'nwr["{k}"="{v}"]{sc};' for k, v in filters for sc in scopes)
+    return f"[out:json][timeout:{int(timeout)}];({body});out center tags;"
+
+def overpass_fetch(query: str, url: Optional[str] = None, retries: int = 3) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """POST a query with retry/backoff on 429/5xx; returns (elements, meta). Answers are cached
+    under (url, query). A local Overpass instance (url other than the public one) is not paced."""
+    url = url or OVERPASS_URL
+    cache = get_response_cache(); key = cache_key("overpass", url, query) if cache else None
+    hit = cache.get("overpass", key) if cache else None
+    if hit is not None:
+        return json.loads(hit).get("elements", []), {"cache": "HIT"}
+    msg = ""
+    for attempt in range(retries + 1):
+        try:
+            if url == OVERPASS_URL: OVERPASS_LIMITER.acquire()
+            with span("osm.overpass", attempt=attempt) as sp:
+                r = get_http_client().request("POST", url, data={"data": query}, headers=HEADERS_HTML,
+                                              timeout=OVERPASS_TIMEOUT_S + 30)
+                sp.set(status=r.status_code, bytes=len(r.content))
+            if r.status_code in RETRY_STATUS and attempt < retries:
+                time.sleep(retry_wait(attempt, r.headers.get("Retry-After"))); continue
+            r.raise_for_status()
+            data = r.json()
+            remark = data.get("remark")  # p.ej. "runtime error: Query timed out"
+            if remark and "error" in remark.lower():
+                return [], {"status": "ERROR", "error": f"Overpass: {remark}"}
+            if cache: cache.put("overpass", key, r.text)
+            return data.get("elements", []) or [], {"status": "OK"}
+        except TRANSPORT_ERRORS + (ValueError,) as e:
+            msg = str(e)
+            if attempt < retries: time.sleep(retry_wait(attempt))
+    return [], {"status": "ERROR", "error": f"Overpass: {msg}"}
+
+def pbf_elements(path: str, filters: Sequence[Tuple[str, str]],
+                 bbox: Optional[Tuple[float,float,float,float]] = None) -> List[Dict[str, Any]]:
+    """Nodes and ways matching `filters` in a local .osm.pbf extract, shaped like Overpass
+    `out center` elements (ways get the mean of their node locations; relations are skipped)."""
+    try:
+        import osmium  # type: ignore
+    except ImportError:
+        raise RuntimeError("Leer extractos .osm.pbf requiere pyosmium (pip install osmium).")
+    if not os.path.exists(path): raise RuntimeError(f"No existe el extracto OSM '{path}'.")
+    wanted = set(filters); keys = {k for k, _ in wanted}
+    out: List[Dict[str, Any]] = []
+
+    def _match(tags) -> Optional[Dict[str, str]]:
+        if not any((k, tags.get(k)) in wanted for k in keys if k in tags): return None
+        return {t.k: t.v for t in tags}
+
+    def _keep(lat, lon) -> bool:
+        return bbox is None or (bbox[0] <= lat <= bbox[1] and bbox[2] <= lon <= bbox[3])
+
+    class _Handler(osmium.SimpleHandler):
+        def node(self, n):
+            tags = _match(n.tags)
+            if tags and n.location.valid() and _keep(n.location.lat, n.location.lon):
+                out.append({"type": "node", "id": n.id, "lat": n.location.lat, "lon": n.location.lon, "tags": tags})
+        def way(self, w):
+            tags = _match(w.tags)
+            if not tags: return
+            locs = [(nd.lat, nd.lon) for nd in w.nodes if nd.location.valid()]
+            if not locs: return
+            lat = sum(a for a, _ in locs) / len(locs); lon = sum(b for _, b in locs) / len(locs)
+            if _keep(lat, lon):
+                out.append({"type": "way", "id": w.id, "center": {"lat": lat, "lon": lon}, "tags": tags})
+
+    _Handler().apply_file(path, locations=True)
+    return out
+
+def element_latlon(el: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    c = el.get("center") or el
+    lat, lon = c.get("lat"), c.get("lon")
+    return (float(lat), float(lon)) if lat is not None and lon is not None else (None, None)
+
+def in_scope(lat: float, lon: float, rings: Optional[List[List[Tuple[float,float]]]] = None,
+             circles: Sequence[Circle] = ()) -> bool:
+    """Point inside the province polygon (if any) or within one of the circles (if any)."""
+    if rings and not point_in_area(lat, lon, rings): return False
+    if circles:
+        for clat, clon, r in circles:
+            dy = (lat - clat) * 111.0; dx = (lon - clon) * 111.0 * math.cos(math.radians(clat))
+            if dx * dx + dy * dy <= r * r: return True
+        return False
+    return True
+
+def osm_gremios(el: Dict[str, Any], gremios: Sequence[str]) -> List[str]:
+    tags = el.get("tags") or {}
+    return [g for g in gremios if any(tags.get(k) == v for k, v in GREMIO_TO_OSM_TAGS.get(g, []))]
+
+def osm_to_business(el: Dict[str, Any], gremio: str) -> Optional[Business]:
+    tags = el.get("tags") or {}
+    name = tags.get("name") or tags.get("brand")
+    if not name: return None  # sin nombre no sirve como contacto
+    street = " ".join(x for x in (tags.get("addr:street"), tags.get("addr:housenumber")) if x)
+    place = " ".join(x for x in (tags.get("addr:postcode"), tags.get("addr:city")) if x)
+    addr = ", ".join(x for x in (street, place) if x) or None
+    phone = tags.get("phone") or tags.get("contact:phone") or tags.get("contact:mobile")
+    if phone: phone = phone.split(";")[0].strip()
+    lat, lon = element_latlon(el)
+    return Business(gremio=gremio, name=name, street=addr, phone=phone,
+                    email=tags.get("email") or tags.get("contact:email"),
+                    website=tags.get("website") or tags.get("contact:website") or tags.get("url"),
+                    lat=lat, lon=lon, source="OSM", place_id=f"osm:{el.get('type')}/{el.get('id')}")
+
+def osm_to_businesses(elements: List[Dict[str, Any]], gremios: Sequence[str],
+                      rings: Optional[List[List[Tuple[float,float]]]] = None,
+                      circles: Sequence[Circle] = ()) -> List[Business]:
+    """Map elements to one Business per matching gremio, dropping unnamed ones and those outside the area."""
+    out: List[Business] = []
+    for el in elements:
+        lat, lon = element_latlon(el)
+        if lat is None or not in_scope(lat, lon, rings, circles): continue
+        for g in osm_gremios(el, gremios):
+            b = osm_to_business(el, g)
+            if b: out.append(b)
+    return out
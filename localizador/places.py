@@ -0,0 +1,484 @@
+# localizador/places.py — Google Places API v1: peticiones, scheduler y barrido
+from __future__ import annotations
+
+import contextvars, datetime, json, os, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .cache import cache_key, get_response_cache
+from .models import Business
+from .net import RETRY_STATUS, TRANSPORT_ERRORS, RateLimiter, get_http_client, retry_wait
+from .quota import QuotaLedger, sku_for_field_mask
+from .trace import span
+
+if TYPE_CHECKING:
+    from .planner import QueryPlanner
+
+V1_BASE="https://places.googleapis.com/v1"
+V1_MAX_RESULTS = 20  # tope por respuesta de searchText/searchNearby
+V1_FIELD_MASK = ("places.id,places.displayName,places.formattedAddress,places.location,"
+                 "places.nationalPhoneNumber,places.websiteUri,places.rating,places.userRatingCount,"
+                 "places.googleMapsUri,places.currentOpeningHours,places.regularOpeningHours")
+V1_SKU = sku_for_field_mask(V1_FIELD_MASK)  # tramo de facturación de cada búsqueda
+# Barrido en dos fases: primero solo IDs (searchText "IDs Only" no se factura; searchNearby no tiene
+# ese tramo y se pide también la ubicación), después detalles de los place_id nuevos.
+V1_ID_FIELD_MASK = {"searchText": "places.id", "searchNearby": "places.id,places.location"}
+V1_TYPE_FIELDS = "places.primaryType,places.types"  # para repartir un nearby multigremio entre gremios
+NEARBY_SPLIT_HITS = V1_MAX_RESULTS - 2  # un nearby multigremio así de lleno se repite gremio a gremio
+V1_DETAILS_FIELD_MASK = ",".join(f.split(".", 1)[1] for f in V1_FIELD_MASK.split(","))
+V1_DETAILS_SKU = sku_for_field_mask(V1_DETAILS_FIELD_MASK)
+GREMIO_TO_TYPES = {
+    "Fontaneros": ["plumber"],
+    "Electricistas": ["electrician"],
+    "Cerrajeros": ["locksmith"],
+    "Reparación de electrodomésticos": ["appliance_store", "electronics_store", "home_goods_store"],
+    "Carpinteros": ["carpenter"],
+    "Pintores": ["painter"],
+    "Dentistas": ["dentist"],
+    "Abogados": ["lawyer"],
+    "Fisioterapeutas": ["physiotherapist"],
+    "Psicólogos": ["psychologist"],
+    "Informáticos": ["electronics_store", "computer_store"],
+}
+
+def _request_json(method, url, headers, body=None, timeout=30, retries=3, source="places", limiter=None):
+    """GET/POST with retry/backoff on 429/5xx and network errors. Safe to call from worker threads.
+
+    Successful responses are cached under (url, field mask, body) in the response cache as
+    `source`; only requests that actually go to the network wait for `limiter`."""
+    cache = get_response_cache()
+    key = cache_key(source, url, headers.get("X-Goog-FieldMask"), body) if cache else None
+    hit = cache.get(source, key) if cache else None
+    if hit is not None:
+        return json.loads(hit), {"cache": "HIT"}
+    msg = ""
+    for attempt in range(retries + 1):
+        try:
+            if limiter: limiter.acquire()
+            with span("google.http", endpoint=url.rsplit("/", 1)[-1].split("?")[0], attempt=attempt) as sp:
+                r = get_http_client().request(method, url, http2=True, headers=headers, json=body, timeout=timeout)
+                sp.set(status=r.status_code, bytes=len(r.content))
+            if r.status_code == 200:
+                if cache: cache.put(source, key, r.text)
+                return r.json(), {}
+            try: err = r.json()
+            except Exception: err = r.text[:800]
+            msg = f"HTTP {r.status_code} at {url.split('/')[-1]}: {err}"
+            if r.status_code not in RETRY_STATUS or attempt == retries: break
+            time.sleep(retry_wait(attempt, r.headers.get("Retry-After")))
+        except TRANSPORT_ERRORS as e:
+            msg = f"RequestException at {url.split('/')[-1]}: {e}"
+            if attempt == retries: break
+            time.sleep(retry_wait(attempt))
+    return None, {"status":"ERROR","error":msg}
+
+def _post_json(url, headers, body, timeout=30, retries=3, limiter=None):
+    return _request_json("POST", url, headers, body, timeout, retries, limiter=limiter)
+
+def v1_text_search(query:str, location:Optional[Tuple[float,float]]=None, radius_m:Optional[int]=None,
+                   language:str="es", api_key:Optional[str]=None, field_mask:str=V1_FIELD_MASK, limiter=None):
+    key=api_key or os.getenv("GOOGLE_API_KEY")
+    if not key: return [], {"status":"NO_KEY"}
+    headers={
+        "X-Goog-Api-Key": key,
+        "X-Goog-FieldMask": field_mask,
+        "Content-Type": "application/json"
+    }
+    body={"textQuery":query,"languageCode":language,"regionCode":"ES"}
+    if location and radius_m:
+        body["locationBias"]={"circle":{"center":{"latitude":location[0], "longitude":location[1]},"radius":float(radius_m)}}
+    data, meta_err = _post_json(f"{V1_BASE}/places:searchText", headers, body, timeout=30, limiter=limiter)
+    if data is None:
+        return [], meta_err
+    return data.get("places",[]) or [], (meta_err or data or {})
+
+def v1_nearby(center: Tuple[float,float], radius_m: int, include_types: list, language: str = "es",
+              api_key: Optional[str] = None, field_mask: str = V1_FIELD_MASK, limiter=None):
+    key = api_key or os.getenv("GOOGLE_API_KEY")
+    if not key: return [], {"status": "NO_KEY"}
+    if not include_types: return [], {"status": "SKIPPED_NO_TYPES"}
+    headers = {
+        "X-Goog-Api-Key": key,
+        "X-Goog-FieldMask": field_mask,
+        "Content-Type": "application/json",
+    }
+    body = {
+        "maxResultCount": V1_MAX_RESULTS,
+        "languageCode": language,
+        "rankPreference": "POPULARITY",
+        "locationRestriction": {
+            "circle": {
+                "center": {"latitude": center[0], "longitude": center[1]},
+                "radius": float(radius_m),
+            }
+        },
+        "includedPrimaryTypes": include_types,
+    }
+    data, meta_err = _post_json(f"{V1_BASE}/places:searchNearby", headers, body, timeout=30, limiter=limiter)
+    if data is None:
+        return [], meta_err
+    return data.get("places", []) or [], (meta_err or data or {})
+
+def v1_place_details(place_id: str, language: str = "es", api_key: Optional[str] = None,
+                     field_mask: str = V1_DETAILS_FIELD_MASK, limiter=None):
+    """Place Details (New) for one place_id, shaped like a search: ([place], meta).
+
+    Cached as "details", whose longer TTL makes the cache the store of fresh details."""
+    key = api_key or os.getenv("GOOGLE_API_KEY")
+    if not key: return [], {"status": "NO_KEY"}
+    headers = {"X-Goog-Api-Key": key, "X-Goog-FieldMask": field_mask}
+    data, meta_err = _request_json("GET", f"{V1_BASE}/places/{place_id}?languageCode={language}&regionCode=ES",
+                                   headers, timeout=30, source="details", limiter=limiter)
+    if data is None:
+        return [], meta_err
+    return [data], (meta_err or {})
+
+def _opening_text(place: Dict[str, Any]) -> Tuple[Optional[bool], Optional[str]]:
+    oh = place.get("currentOpeningHours") or {}
+    open_now = oh.get("openNow")
+    weekday = oh.get("weekdayDescriptions") or []
+    try:
+        today_idx = datetime.datetime.today().weekday()
+        today_line = weekday[today_idx] if 0 <= today_idx < len(weekday) else (weekday[0] if weekday else None)
+    except Exception:
+        today_line = weekday[0] if weekday else None
+    return open_now, today_line
+
+def v1_to_business(p:Dict[str,Any], gremio:str)->Business:
+    name=(p.get("displayName") or {}).get("text") if isinstance(p.get("displayName"), dict) else p.get("displayName")
+    addr=p.get("formattedAddress")
+    phone=p.get("nationalPhoneNumber")
+    web=p.get("websiteUri")
+    rating=p.get("rating"); reviews=p.get("userRatingCount")
+    loc=p.get("location") or {}; lat=loc.get("latitude"); lon=loc.get("longitude")
+    pid=p.get("id")
+    gmaps = p.get("googleMapsUri")
+    open_now, today_text = _opening_text(p)
+    return Business(gremio=gremio, name=name or "", street=addr, phone=phone, website=web,
+                    rating=rating, reviews=reviews, lat=lat, lon=lon, source="Google", place_id=pid,
+                    open_now=open_now, open_today=today_text, google_maps=gmaps)
+
+def build_queries(g:str, provincia:Optional[str], extras:List[str])->List[str]:
+    out=[]
+    if provincia:
+        out.append(f"{g} en {provincia}")
+        for kw in extras: out.append(f"{g} {kw} en {provincia}")
+    else:
+        out.append(g)
+        for kw in extras: out.append(f"{g} {kw}")
+    return out
+
+def search_field_mask(endpoint: str, ids_only: bool = False, by_type: bool = False) -> str:
+    """Field mask of a searchText/searchNearby request (minimal in phase 1, plus types for a combined nearby)."""
+    mask = V1_ID_FIELD_MASK[endpoint] if ids_only else V1_FIELD_MASK
+    return f"{mask},{V1_TYPE_FIELDS}" if by_type else mask
+
+def search_sku(endpoint: str, ids_only: bool = False, by_type: bool = False) -> str:
+    """Billing tier of such a request, to price searches before building their PlacesJob."""
+    return sku_for_field_mask(search_field_mask(endpoint, ids_only, by_type))
+
+# ---------- Scheduler Google Places (concurrente) ----------
+@dataclass
+class PlacesJob:
+    gremio: str
+    center: Tuple[float,float]
+    radius_km: float
+    query: Optional[str] = None         # searchText si hay query, searchNearby si no
+    include_types: Optional[list] = None
+    language: str = "es"
+    ids_only: bool = False              # máscara mínima (fase 1 del barrido en dos fases)
+    place_id: Optional[str] = None      # Place Details en lugar de búsqueda
+    by_type: bool = False               # nearby de varios gremios: pide el tipo de cada sitio
+
+    @property
+    def endpoint(self) -> str:
+        if self.place_id is not None: return "placeDetails"
+        return "searchText" if self.query is not None else "searchNearby"
+
+    @property
+    def field_mask(self) -> str:
+        if self.place_id is not None: return V1_DETAILS_FIELD_MASK
+        return search_field_mask(self.endpoint, self.ids_only, self.by_type)
+
+    @property
+    def sku(self) -> str:
+        return sku_for_field_mask(self.field_mask)
+
+    def key(self) -> str:
+        """Stable identity of the request, used to checkpoint finished jobs."""
+        if self.place_id is not None: return f"details|{self.place_id}|{self.language}"
+        what = f"text|{self.query}" if self.query is not None else "nearby|" + ",".join(self.include_types or [])
+        if self.ids_only: what = "ids|" + what
+        return f"{what}|{self.gremio}|{self.center[0]:.6f},{self.center[1]:.6f}|{self.radius_km:.4f}|{self.language}"
+
+# Nombre de la traza de cada tipo de petición (ver trace.py)
+_SPAN_NAMES = {"searchText": "google.consulta", "searchNearby": "google.nearby", "placeDetails": "google.detalles"}
+
+class PlacesScheduler:
+    """Runs PlacesJob lists concurrently under a shared QPS limit and a request budget.
+
+    Results come back in job order whatever the completion order. Once `max_requests`
+    have been sent to Google (answers from the local cache don't count) the remaining jobs are
+    answered with status QUOTA_EXCEEDED, and once the
+    `ledger` (QuotaLedger) budget is spent with BUDGET_EXCEEDED. Failed
+    requests are passed to `on_errors(messages)` from the iterating thread. With a
+    `checkpoint` (RunCheckpoint), jobs already finished in an interrupted run are answered
+    from disk and every new successful response is recorded. A `limiter` shared with other
+    schedulers (e.g. every job of a JobWorker) replaces the scheduler's own `qps` pacing.
+    Requests run on one pool of `workers` threads kept for the scheduler's life (close() ends
+    it), shared by every iter_run() and PlaceHydrator fed from it."""
+    def __init__(self, qps: float = 5.0, max_requests: Optional[int] = None, workers: int = 8,
+                 api_key: Optional[str] = None, on_errors: Optional[Callable[[List[str]], None]] = None,
+                 checkpoint: Any = None, ledger: Optional[QuotaLedger] = None,
+                 limiter: Optional[RateLimiter] = None):
+        self.limiter = limiter or RateLimiter(qps)
+        self.ledger = ledger or QuotaLedger()
+        self.on_errors = on_errors
+        self.checkpoint = checkpoint
+        self.resumed = 0
+        self.max_requests = max_requests or None
+        self.workers = max(1, int(workers))
+        self.api_key = api_key
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, job: PlacesJob) -> Future:
+        """Start `job` on the scheduler's pool (or answer it from the checkpoint); see result()."""
+        hit = self.checkpoint.get_unit(job.key()) if self.checkpoint else None
+        if hit is not None:
+            self.resumed += 1; fut: Future = Future(); fut.set_result(hit); fut.resumed = True
+            return fut
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="places")
+            pool = self._pool
+        # cada petición hereda la caché y la traza de la búsqueda que la lanza
+        return pool.submit(contextvars.copy_context().run, self._run_one, job)
+
+    def result(self, job: PlacesJob, fut: Future) -> Tuple[list, Dict[str, Any]]:
+        """(places, meta) of a finished submit(); a new answer is checkpointed, an error returned as meta."""
+        try: places, meta = fut.result()
+        except Exception as e: places, meta = [], {"status": "ERROR", "error": str(e)}
+        if getattr(fut, "resumed", False): return places, meta
+        if self.checkpoint and meta.get("status") not in ("ERROR", "NO_KEY", "QUOTA_EXCEEDED", "BUDGET_EXCEEDED"):
+            self.checkpoint.put_unit(job.key(), places, {})
+        return places, meta
+
+    def close(self):
+        """Stop the pool; requests not started yet are dropped (a later submit starts a new one)."""
+        with self._lock: pool, self._pool = self._pool, None
+        if pool: pool.shutdown(wait=False, cancel_futures=True)
+
+    def _take_quota(self) -> bool:
+        with self._lock:
+            if self.max_requests is not None and self.requests_sent >= self.max_requests:
+                return False
+            self.requests_sent += 1
+            return True
+
+    def _refund_quota(self):
+        with self._lock: self.requests_sent -= 1
+
+    def _run_one(self, job: PlacesJob):
+        if not self._take_quota():
+            return [], {"status": "QUOTA_EXCEEDED"}
+        endpoint, sku = job.endpoint, job.sku
+        if not self.ledger.reserve(endpoint, sku):
+            self._refund_quota()
+            return [], {"status": "BUDGET_EXCEEDED"}
+        radius_m = int(job.radius_km * 1000); t0 = time.monotonic(); res = None
+        with span(_SPAN_NAMES[endpoint], gremio=job.gremio, query=job.query, place_id=job.place_id,
+                  celda=f"{job.center[0]:.3f},{job.center[1]:.3f}/{job.radius_km:g}km") as sp:
+            try:
+                if job.place_id is not None:
+                    res = v1_place_details(job.place_id, job.language, api_key=self.api_key, limiter=self.limiter)
+                elif job.query is not None:
+                    res = v1_text_search(job.query, location=job.center, radius_m=radius_m, language=job.language,
+                                         api_key=self.api_key, field_mask=job.field_mask, limiter=self.limiter)
+                else:
+                    res = v1_nearby(job.center, radius_m, job.include_types or [], job.language,
+                                    api_key=self.api_key, field_mask=job.field_mask, limiter=self.limiter)
+                return res
+            finally:
+                meta = res[1] if res else {"status": "ERROR"}
+                outcome = ("cached" if meta.get("cache") == "HIT" else
+                           "errors" if meta.get("status") in ("ERROR", "NO_KEY", "SKIPPED_NO_TYPES") else "billed")
+                self.ledger.settle(endpoint, sku, outcome, time.monotonic() - t0)
+                # como en el ledger: solo cuenta contra max_requests lo que llegó a enviarse
+                if outcome == "cached" or meta.get("status") in ("NO_KEY", "SKIPPED_NO_TYPES"): self._refund_quota()
+                sp.set(results=len(res[0]) if res else 0, cache="HIT" if outcome == "cached" else "MISS")
+                if outcome == "errors": sp.set(error=meta.get("status"))
+
+    def iter_run(self, jobs: List[PlacesJob], on_progress: Optional[Callable[[int, int], None]] = None):
+        """Yield (index, (places, meta)) in job order, each as soon as it and all earlier jobs are done."""
+        if not jobs: return
+        done = 0; ready: Dict[int, Any] = {}; nxt = 0
+        pending: Dict[Future, int] = {}
+        try:
+            for i, j in enumerate(jobs):
+                fut = self.submit(j)
+                if getattr(fut, "resumed", False): ready[i] = fut.result(); done += 1
+                else: pending[fut] = i
+            while True:
+                if on_progress and done: on_progress(done, len(jobs))
+                while nxt in ready:
+                    yield nxt, ready.pop(nxt); nxt += 1
+                if not pending: break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                errors = []
+                for fut in finished:
+                    i = pending.pop(fut); done += 1
+                    ready[i] = self.result(jobs[i], fut)
+                    if ready[i][1].get("status") == "ERROR": errors.append(ready[i][1].get("error", ""))
+                if errors and self.on_errors: self.on_errors(errors)
+        finally:
+            for fut in pending: fut.cancel()  # abandonada a medias: lo no empezado no se envía
+
+    def run(self, jobs: List[PlacesJob], on_progress: Optional[Callable[[int, int], None]] = None):
+        results: List[Any] = [None] * len(jobs)
+        for i, res in self.iter_run(jobs, on_progress): results[i] = res
+        return results
+
+def _merge_meta(acc: Dict[str, Any], res: list, meta: Dict[str, Any]):
+    acc["requests"] = acc.get("requests", 0) + 1
+    acc["max_hits"] = max(acc.get("max_hits", 0), len(res))
+    if meta.get("status") in ("ERROR", "NO_KEY", "QUOTA_EXCEEDED", "BUDGET_EXCEEDED"):
+        acc.setdefault("errors", []).append(meta.get("error") or meta["status"])
+
+def iter_google_sweep_v1(targets: List[Tuple[str, Tuple[float,float], float, Optional[str]]], extras: List[str],
+                         idioma: str, scheduler: PlacesScheduler,
+                         on_progress: Optional[Callable[[int, int], None]] = None,
+                         metas: Optional[List[Dict[str, Any]]] = None, ids_only: bool = False,
+                         planner: Optional[QueryPlanner] = None):
+    """Search every (gremio, center, radius_km, provincia) target, yielding (target_index, places)
+    chunks in a fixed order as responses arrive. With `ids_only` the places are id(/location)
+    stubs to be completed with a PlaceHydrator.
+
+    Phase 1 sends all text queries at once; phase 2 sends the searchNearby fallback for the
+    targets that got fewer than 30 hits. With a `planner` (QueryPlanner) the keyword variants
+    it drops are not sent and the ones sent are measured, and the fallbacks of several gremios
+    at the same cell share one request, repeated gremio by gremio (phase 3) only when it comes
+    back nearly full. If `metas` is given it is filled with one summary per target: requests
+    sent, `max_hits` of the fullest single response (used to detect saturated cells) and any
+    errors."""
+    text_jobs: List[PlacesJob] = []; owner: List[int] = []; keyword: List[Optional[str]] = []
+    last_job: Dict[int, int] = {}
+    for t, (g, c, rkm, prov) in enumerate(targets):
+        kws = planner.keywords_for(g, c, rkm, prov, extras) if planner else extras
+        for kw, q in zip([None, *kws], build_queries(g, prov, kws)):
+            last_job[t] = len(text_jobs)
+            text_jobs.append(PlacesJob(g, c, rkm, query=q, language=idioma, ids_only=ids_only))
+            owner.append(t); keyword.append(kw)
+    metas = metas if metas is not None else []
+    metas[:] = [{} for _ in targets]; hits = [0] * len(targets)
+    n_units = len(targets)
+    def _phase_progress(lo, hi):
+        return (lambda d, n: on_progress(int(lo + (hi - lo) * d / max(1, n)), n_units)) if on_progress else None
+    responses: Dict[int, list] = {}
+    try:
+        for j, (res, meta) in scheduler.iter_run(text_jobs, _phase_progress(0, n_units * 0.8)):
+            t = owner[j]; hits[t] += len(res); _merge_meta(metas[t], res, meta)
+            if planner:
+                responses.setdefault(t, []).append((keyword[j], res))
+                if last_job[t] == j:
+                    done = responses.pop(t)
+                    if "errors" not in metas[t]: planner.observe(*targets[t], done)
+            if res: yield t, res
+    finally:
+        if planner: planner.flush()
+    groups: Dict[Any, List[int]] = {}
+    for t, (g, c, rkm, _prov) in enumerate(targets):
+        if hits[t] < 30 and GREMIO_TO_TYPES.get(g):
+            groups.setdefault((c, rkm) if planner and planner.combine_types else t, []).append(t)
+    near_jobs: List[PlacesJob] = []; near_owner: List[List[int]] = []
+    for ts in groups.values():
+        gs = [targets[t][0] for t in ts]; c, rkm = targets[ts[0]][1], targets[ts[0]][2]
+        types = list(dict.fromkeys(ty for g in gs for ty in GREMIO_TO_TYPES[g]))
+        near_jobs.append(PlacesJob("+".join(gs), c, rkm, include_types=types, language=idioma,
+                                   ids_only=ids_only, by_type=len(ts) > 1)); near_owner.append(ts)
+    split_jobs: List[PlacesJob] = []; split_owner: List[int] = []
+    for j, (res, meta) in scheduler.iter_run(near_jobs, _phase_progress(n_units * 0.8, n_units)):
+        ts = near_owner[j]
+        if len(ts) == 1:
+            _merge_meta(metas[ts[0]], res, meta)
+            if res: yield ts[0], res
+            continue
+        parts = planner.classify(res, [targets[t][0] for t in ts])
+        for t in ts:
+            g, c, rkm, _prov = targets[t]; _merge_meta(metas[t], parts[g], meta)
+            if parts[g]: yield t, parts[g]
+            if len(res) >= NEARBY_SPLIT_HITS:
+                split_jobs.append(PlacesJob(g, c, rkm, include_types=GREMIO_TO_TYPES[g], language=idioma,
+                                            ids_only=ids_only)); split_owner.append(t)
+    for j, (res, meta) in scheduler.iter_run(split_jobs):
+        t = split_owner[j]; _merge_meta(metas[t], res, meta)
+        if res: yield t, res
+    if on_progress: on_progress(n_units, n_units)
+
+class PlaceHydrator:
+    """Phase 2 of the two-phase sweep, fed while the ID sweep runs.
+
+    submit() asks Place Details for the stubs whose place_id was neither completed nor asked
+    yet, on the scheduler's pool, so the details of every chunk of the sweep form one stream of
+    requests instead of a small burst per chunk; poll() hands back the (gremio, place) details
+    that have arrived and drain() waits for the rest. Only details that came back mark a place
+    as done: one whose request failed or was refused is asked for again the next time a search
+    returns it. Details still fresh in the local cache are answered without a billed request."""
+    def __init__(self, scheduler: PlacesScheduler, idioma: str = "es"):
+        self.scheduler = scheduler; self.idioma = idioma
+        self.done: set = set()
+        self._pending: Dict[Future, PlacesJob] = {}
+        self._asked: set = set()
+        self._ready: List[Tuple[str, Dict[str, Any]]] = []
+
+    def submit(self, gremio: str, stubs: List[Dict[str, Any]]):
+        for p in stubs:
+            pid = p.get("id")
+            if not pid or pid in self.done or pid in self._asked: continue
+            job = PlacesJob(gremio, (0.0, 0.0), 0.0, language=self.idioma, place_id=pid)
+            self._asked.add(pid); self._pending[self.scheduler.submit(job)] = job
+
+    def _collect(self, finished) -> List[Tuple[str, Dict[str, Any]]]:
+        errors = []
+        for fut in finished:
+            job = self._pending.pop(fut); self._asked.discard(job.place_id)
+            places, meta = self.scheduler.result(job, fut)
+            if places: self.done.add(job.place_id); self._ready.extend((job.gremio, p) for p in places)
+            elif meta.get("status") == "ERROR": errors.append(meta.get("error", ""))
+        if errors and self.scheduler.on_errors: self.scheduler.on_errors(errors)
+        out, self._ready = self._ready, []
+        return out
+
+    def poll(self) -> List[Tuple[str, Dict[str, Any]]]:
+        return self._collect([f for f in self._pending if f.done()])
+
+    def drain(self) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        while self._pending:
+            finished, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+            out = self._collect(finished)
+            if out: yield out
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def close(self):
+        for fut in self._pending: fut.cancel()
+        self._pending.clear(); self._asked.clear()
+
+def google_sweep_v1(targets: List[Tuple[str, Tuple[float,float], float, Optional[str]]], extras: List[str],
+                    idioma: str, scheduler: PlacesScheduler,
+                    on_progress: Optional[Callable[[int, int], None]] = None,
+                    planner: Optional[QueryPlanner] = None):
+    """Non-streaming iter_google_sweep_v1: returns [(places, meta)] aligned with `targets`."""
+    metas: List[Dict[str, Any]] = []; out: List[list] = [[] for _ in targets]
+    for t, res in iter_google_sweep_v1(targets, extras, idioma, scheduler, on_progress, metas, planner=planner):
+        out[t].extend(res)
+    return list(zip(out, metas))
+
+def google_run_v1(gremio:str, center:Tuple[float,float], radius_km:float, provincia:Optional[str],
+                  extras:List[str], idioma:str, scheduler:Optional[PlacesScheduler]=None):
+    scheduler = scheduler or PlacesScheduler()
+    return google_sweep_v1([(gremio, center, radius_km, provincia)], extras, idioma, scheduler)[0]
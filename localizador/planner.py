@@ -0,0 +1,142 @@
+# localizador/planner.py — plan de consultas a Google: nearby multigremio y palabras clave que aportan
+from __future__ import annotations
+
+import os, sqlite3, threading, time, zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .places import GREMIO_TO_TYPES
+
+KEYWORDS_PATH = os.getenv("LOCALIZADOR_KEYWORDS", os.path.join(os.getcwd(), ".cache", "palabras_clave.sqlite"))
+KEYWORD_MIN_TRIALS = 6      # celdas con una palabra en una región antes de juzgarla
+KEYWORD_MIN_NEW = 0.5       # place_id nuevos por consulta por debajo de los cuales se deja de enviar
+KEYWORD_EXPLORE = 0.1       # fracción de celdas en las que una palabra descartada se sigue probando
+REGION_DEG = 0.5            # sin provincia, la región es una celda de ~50 km
+
+def region_of(center: Tuple[float, float], provincia: Optional[str]) -> str:
+    """Where keyword statistics are pooled: the province, else a REGION_DEG grid cell."""
+    if provincia: return f"prov:{provincia.strip().lower()}"
+    return f"{int(center[0] // REGION_DEG)},{int(center[1] // REGION_DEG)}"
+
+def cell_of(center: Tuple[float, float], radius_km: float) -> str:
+    return f"{center[0]:.5f},{center[1]:.5f}/{radius_km:.3f}"
+
+class KeywordStats:
+    """What each keyword variant ("SAT", "urgencias"...) of a gremio query has added, per region.
+
+    One observation per (gremio, keyword, cell): how many place_ids the variant returned that
+    the plain gremio query and the variants before it had not. Re-searching a cell (cached
+    answers, resumed runs) replaces its observation instead of counting it twice. Thread-safe."""
+    def __init__(self, path: Optional[str] = None):
+        path = path or KEYWORDS_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS observations (gremio TEXT, keyword TEXT, region TEXT, "
+                         "cell TEXT, new_ids INTEGER, updated REAL, PRIMARY KEY (gremio, keyword, cell))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS observations_region ON observations(region, gremio)")
+
+    def record(self, rows: Iterable[Tuple[str, str, str, str, int]]):
+        """Store (gremio, keyword, region, cell, new_ids) observations."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO observations VALUES (?,?,?,?,?,?)",
+                                 [(*r, now) for r in rows])
+
+    def stats(self, region: str, gremio: str) -> Dict[str, Tuple[int, int]]:
+        """keyword -> (cells observed, new place_ids) in `region` for `gremio`."""
+        with self._lock:
+            rows = self._db.execute("SELECT keyword, COUNT(*), SUM(new_ids) FROM observations "
+                                    "WHERE region=? AND gremio=? GROUP BY keyword", (region, gremio)).fetchall()
+        return {kw: (n, total or 0) for kw, n, total in rows}
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per gremio and keyword over every region: cells, new place_ids and their mean."""
+        with self._lock:
+            rows = self._db.execute("SELECT gremio, keyword, COUNT(DISTINCT region), COUNT(*), SUM(new_ids) "
+                                    "FROM observations GROUP BY gremio, keyword ORDER BY gremio, keyword").fetchall()
+        return [{"Gremio": g, "Palabra": kw, "Regiones": nr, "Celdas": n, "Nuevos": total,
+                 "Nuevos/consulta": round(total / n, 2)} for g, kw, nr, n, total in rows]
+
+    def close(self):
+        with self._lock: self._db.close()
+
+class QueryPlanner:
+    """Decides which Google requests a sweep sends beyond the plain gremio query.
+
+    With `combine_types` the searchNearby fallback of several gremios at the same cell goes out
+    as one request with all their includedPrimaryTypes, and classify() gives each place back to
+    the gremios its primaryType belongs to. With `keywords` (KeywordStats) the text query
+    variants that past runs found adding fewer than `min_new` new place_ids per cell in a region
+    are dropped there, except in an `explore` fraction of cells (fixed per cell, so a resumed
+    run sends the same requests) where they keep being measured. `skipped` counts the text
+    queries left out per (gremio, keyword)."""
+    def __init__(self, combine_types: bool = True, keywords: Optional[KeywordStats] = None,
+                 min_trials: int = KEYWORD_MIN_TRIALS, min_new: float = KEYWORD_MIN_NEW,
+                 explore: float = KEYWORD_EXPLORE):
+        self.combine_types = combine_types
+        self.keywords = keywords
+        self.min_trials = min_trials; self.min_new = min_new; self.explore = explore
+        self.skipped: Dict[Tuple[str, str], int] = {}
+        self._dropped: Dict[Tuple[str, str], frozenset] = {}
+        self._pending: List[Tuple[str, str, str, str, int]] = []
+        self._lock = threading.Lock()
+
+    def _dropped_in(self, region: str, gremio: str) -> frozenset:
+        """Keywords judged useless for `gremio` in `region` (read once per run)."""
+        key = (region, gremio)
+        with self._lock:
+            if key not in self._dropped:
+                stats = self.keywords.stats(region, gremio)
+                self._dropped[key] = frozenset(kw for kw, (n, new) in stats.items()
+                                               if n >= self.min_trials and new / n < self.min_new)
+            return self._dropped[key]
+
+    def keywords_for(self, gremio: str, center: Tuple[float, float], radius_km: float,
+                     provincia: Optional[str], extras: Sequence[str]) -> List[str]:
+        """The `extras` worth a text query for `gremio` at this cell."""
+        if self.keywords is None or not extras: return list(extras)
+        dropped = self._dropped_in(region_of(center, provincia), gremio)
+        if not dropped: return list(extras)
+        cell = cell_of(center, radius_km); out = []
+        for kw in extras:
+            if kw in dropped and zlib.crc32(f"{gremio}|{kw}|{cell}".encode()) % 1000 >= self.explore * 1000:
+                with self._lock: self.skipped[(gremio, kw)] = self.skipped.get((gremio, kw), 0) + 1
+                continue
+            out.append(kw)
+        return out
+
+    def observe(self, gremio: str, center: Tuple[float, float], radius_km: float, provincia: Optional[str],
+                responses: Sequence[Tuple[Optional[str], list]]):
+        """Learn from the text responses of one cell, plain query (keyword None) first."""
+        if self.keywords is None: return
+        seen: set = set(); region = region_of(center, provincia); cell = cell_of(center, radius_km); rows = []
+        for kw, places in responses:
+            ids = {p.get("id") for p in places if p.get("id")}
+            if kw is not None: rows.append((gremio, kw, region, cell, len(ids - seen)))
+            seen |= ids
+        with self._lock: self._pending.extend(rows)
+
+    def flush(self):
+        """Write the observations gathered so far."""
+        with self._lock: rows, self._pending = self._pending, []
+        if rows and self.keywords is not None: self.keywords.record(rows)
+
+    def classify(self, places: List[Dict[str, Any]], gremios: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Split the answer of a combined searchNearby among `gremios` by primaryType (or, failing
+        that, any of `types`); a place whose type several gremios share goes to each of them."""
+        out: Dict[str, List[Dict[str, Any]]] = {g: [] for g in gremios}
+        for p in places:
+            primary = p.get("primaryType"); types = set(p.get("types") or ())
+            owners = [g for g in gremios if primary in GREMIO_TO_TYPES.get(g, ())] or \
+                     [g for g in gremios if types.intersection(GREMIO_TO_TYPES.get(g, ()))]
+            for g in owners: out[g].append(p)
+        return out
+
+    def summary(self) -> List[str]:
+        """Readable notes on what the plan left out."""
+        if not self.skipped: return []
+        per = ", ".join(f"{kw} ({g}) ×{n}" for (g, kw), n in sorted(self.skipped.items()))
+        return [f"Se omitieron {sum(self.skipped.values())} consultas con palabras clave que no aportaron "
+                f"negocios nuevos en esta zona en búsquedas anteriores: {per}."]
@@ -0,0 +1,103 @@
+# localizador/quota.py — contabilidad de peticiones a Google Places (endpoint, SKU, coste) y presupuesto
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# USD por 1000 peticiones facturables (Places API New, tarifa estándar sin tramo gratuito mensual).
+# Ajustable si cambia la tarifa o hay descuento por volumen.
+SKU_PRICE_USD_PER_1000 = {
+    # Text/Nearby Search no tienen tramo Essentials: esos campos se facturan como Pro
+    "searchText": {"IDs Only": 0.0, "Essentials": 32.0, "Pro": 32.0, "Enterprise": 35.0,
+                   "Enterprise + Atmosphere": 40.0},
+    "searchNearby": {"Essentials": 32.0, "Pro": 32.0, "Enterprise": 35.0, "Enterprise + Atmosphere": 40.0},
+    "placeDetails": {"IDs Only": 0.0, "Essentials": 5.0, "Pro": 17.0, "Enterprise": 20.0,
+                     "Enterprise + Atmosphere": 25.0},
+}
+
+# Campos de la máscara que suben de tramo (sin prefijo "places.")
+_ENTERPRISE_FIELDS = {"nationalPhoneNumber", "internationalPhoneNumber", "websiteUri", "rating",
+                      "userRatingCount", "currentOpeningHours", "regularOpeningHours", "priceLevel"}
+_ATMOSPHERE_FIELDS = {"reviews", "editorialSummary", "servesBreakfast", "delivery", "takeout",
+                      "dineIn", "outdoorSeating", "goodForChildren", "allowsDogs"}
+_ESSENTIALS_FIELDS = {"id", "name", "formattedAddress", "location", "addressComponents", "types",
+                      "plusCode", "viewport", "shortFormattedAddress"}
+
+def sku_for_field_mask(mask: str) -> str:
+    """Billing tier a field mask falls into: the most expensive field requested decides it."""
+    fields = {f.strip().split(".")[-1] for f in (mask or "").split(",") if f.strip()}
+    if fields & _ATMOSPHERE_FIELDS: return "Enterprise + Atmosphere"
+    if fields & _ENTERPRISE_FIELDS: return "Enterprise"
+    if fields <= {"id", "name"}: return "IDs Only"
+    if fields <= _ESSENTIALS_FIELDS: return "Essentials"
+    return "Pro"
+
+def sku_price(endpoint: str, sku: str) -> float:
+    """USD per single request; unknown combinations are priced at the endpoint's most expensive tier."""
+    prices = SKU_PRICE_USD_PER_1000.get(endpoint, {})
+    per_1000 = prices.get(sku, max(prices.values()) if prices else 0.0)
+    return per_1000 / 1000.0
+
+class QuotaLedger:
+    """Thread-safe per-run accounting of Places requests by (endpoint, SKU).
+
+    reserve() is called before a request is sent and refuses it once the reserved spend would
+    pass `budget_usd`; settle() then records the outcome. Cached answers and failed requests
+    are not billed by Google, so their reservation is returned to the budget."""
+    def __init__(self, budget_usd: Optional[float] = None):
+        self.budget_usd = budget_usd or None
+        self.spent_usd = 0.0
+        self.refused = 0
+        self._rows: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _row(self, endpoint: str, sku: str) -> Dict[str, float]:
+        return self._rows.setdefault((endpoint, sku), {"billed": 0, "cached": 0, "errors": 0,
+                                                       "latency_s": 0.0, "usd": 0.0})
+
+    def reserve(self, endpoint: str, sku: str) -> bool:
+        price = sku_price(endpoint, sku)
+        with self._lock:
+            if self.budget_usd is not None and self.spent_usd + price > self.budget_usd + 1e-9:
+                self.refused += 1
+                return False
+            self.spent_usd += price
+            return True
+
+    def settle(self, endpoint: str, sku: str, outcome: str, latency_s: float = 0.0):
+        """outcome: "billed" (answered by Google), "cached" or "errors"."""
+        price = sku_price(endpoint, sku)
+        with self._lock:
+            row = self._row(endpoint, sku)
+            row[outcome] += 1; row["latency_s"] += latency_s
+            if outcome == "billed": row["usd"] += price
+            else: self.spent_usd -= price
+
+    @property
+    def exhausted(self) -> bool:
+        return self.refused > 0
+
+    @property
+    def billed(self) -> int:
+        return int(sum(r["billed"] for r in self._rows.values()))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        out = []
+        with self._lock:
+            for (endpoint, sku), r in sorted(self._rows.items()):
+                sent = r["billed"] + r["errors"]
+                out.append({"Endpoint": endpoint, "SKU": sku, "Facturables": int(r["billed"]),
+                            "Caché": int(r["cached"]), "Errores": int(r["errors"]),
+                            "Latencia media (s)": round(r["latency_s"] / sent, 3) if sent else None,
+                            "Coste (USD)": round(r["usd"], 2)})
+        return out
+
+    def as_meta(self) -> Dict[str, Any]:
+        """Actuals for busqueda_meta / history."""
+        return {"peticiones_facturables": self.billed, "coste_usd": round(sum(r["usd"] for r in self._rows.values()), 2),
+                "presupuesto_usd": self.budget_usd, "rechazadas_por_presupuesto": self.refused,
+                "detalle": self.summary()}
+
+def estimate_cost(text_requests: int, nearby_requests: int, sku: str, nearby_sku: Optional[str] = None) -> float:
+    return (text_requests * sku_price("searchText", sku)
+            + nearby_requests * sku_price("searchNearby", nearby_sku or sku))
@@ -0,0 +1,225 @@
+# localizador/scraping.py — emails/teléfonos desde la web de cada negocio
+from __future__ import annotations
+
+import contextvars, time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import cache_key, get_response_cache
+from .contacts import extract_contacts
+from .dedupe import normalize_domain
+from .frontier import (CONTACT_LINK_SCORE, HOME_SCORE, ContactPathMemory, CrawlFrontier, detect_cms,
+                       link_score, sitemap_urls)
+from .models import Business
+from .net import HEADERS_HTML, TRANSPORT_ERRORS, HostThrottle, get_http_client
+from .trace import span
+
+def cached_html(url: str) -> Optional[str]:
+    """Cached body of `url`: None if not cached, "" for a page known to be useless."""
+    cache = get_response_cache()
+    return cache.get("html", cache_key("html", url)) if cache else None
+
+def fetch_html(url: str, timeout: float = 20, types: Tuple[str, ...] = ("text/html",), check_cache: bool = True):
+    cache = get_response_cache(); key = cache_key("html", url) if cache else None
+    if cache and check_cache:
+        hit = cache.get("html", key)
+        if hit is not None: return hit or None  # "" = página sin HTML útil (404, PDF...)
+    with span("web.pagina", url=url) as sp:
+        try:
+            status, _ctype, text = get_http_client().fetch_page(url, HEADERS_HTML, timeout, types)
+            sp.set(status=status, bytes=len(text or ""), cache="MISS")
+            if text is not None:
+                if cache: cache.put("html", key, text)
+                return text
+            if cache and status < 500: cache.put("html", key, "")
+        except TRANSPORT_ERRORS as e:
+            sp.set(error=type(e).__name__)
+            return None
+    return None
+
+def _extract_emails_phones_from_html(html: str, site_domain: Optional[str] = None) -> Tuple[list, list]:
+    """Valid emails and Spanish phones of a page, best candidate first (see extract_contacts)."""
+    found = extract_contacts(html, site_domain)
+    return [e for e, _ in found.emails], [p for p, _ in found.phones]
+
+SITEMAP_TYPES = ("xml",)
+
+def extract_email_from_site(website: str, delay: float = 0.8, max_pages: int = 8,
+                            throttle: Optional[HostThrottle] = None, deadline: Optional[float] = None,
+                            memory: Optional[ContactPathMemory] = None):
+    """Best (email, phone) of a website, visiting at most `max_pages` pages best-first.
+
+    The home page goes first; its links are ranked by URL and anchor text (contacto, aviso legal,
+    teléfono...) next to blind guesses (GUESSED_PATHS plus, with a `memory`, the paths that worked
+    on other sites of the same CMS). If nothing looks like a contact page, /sitemap.xml is read.
+    Cached pages are not paced by the throttle but count against `max_pages`."""
+    if not website: return None, None
+    if not website.lower().startswith(("http://","https://")):
+        website = "http://" + website
+    base = website.rstrip("/")
+    throttle = throttle or HostThrottle(delay)
+    site_domain = normalize_domain(base)
+    frontier = CrawlFrontier(base); frontier.push(base + "/", HOME_SCORE)
+    best_email = None; best_phone = None; pages = 0; cached = 0
+    cms: Optional[str] = None; sitemap_done = False
+
+    def _visit(url: str, types: Tuple[str, ...] = ("text/html",)) -> Tuple[bool, Optional[str]]:
+        nonlocal pages, cached
+        html = cached_html(url)
+        if html is None:
+            if not throttle.wait(url, deadline): return False, None
+            timeout = 20 if deadline is None else min(20, max(1.0, deadline - time.monotonic()))
+            html = fetch_html(url, timeout, types, check_cache=False)
+        else: cached += 1
+        pages += 1
+        return True, html or None
+
+    with span("web.sitio", dominio=site_domain or base) as sp:
+        while frontier and pages < max_pages:
+            if cms is not None and not sitemap_done and (frontier.best_score() or 0.0) < CONTACT_LINK_SCORE:
+                sitemap_done = True  # nada parece de contacto: se mira el sitemap (una vez)
+                ok, xml = _visit(base + "/sitemap.xml", SITEMAP_TYPES)
+                if not ok: break
+                urls, children = sitemap_urls(xml or "")
+                if children and not urls and pages < max_pages:
+                    ok, xml = _visit(max(children, key=lambda u: ("page" in u.lower(), -len(u))), SITEMAP_TYPES)
+                    if not ok: break
+                    urls = sitemap_urls(xml or "")[0]
+                for u in urls:
+                    score = link_score(u)
+                    if score > 0: frontier.push(u, score)
+                continue
+            url, _score = frontier.pop()
+            ok, html = _visit(url)
+            if not ok: break
+            if cms is None:  # portada
+                cms = detect_cms(html or "")
+                frontier.add_guesses(cms, memory)
+            if not html:
+                if memory: memory.record(cms, url, False)
+                continue
+            found = extract_contacts(html, site_domain)  # una pasada: emails, teléfonos y enlaces
+            if memory: memory.record(cms, url, bool((found.best_email and not best_email)
+                                                    or (found.best_phone and not best_phone)))
+            best_phone = best_phone or found.best_phone
+            best_email = best_email or found.best_email
+            if best_email and best_phone: break
+            frontier.add_links(url, found.links)
+        sp.set(pages=pages, cached_pages=cached, cache="HIT" if pages and cached == pages else "MISS", results=int(bool(best_email)) + int(bool(best_phone)),
+               email=bool(best_email), telefono=bool(best_phone))
+    return best_email, best_phone
+
+class SiteEnricher:
+    """Background website crawler that can be fed businesses while the search is still running.
+
+    submit() queues the sites of new businesses (each distinct website is crawled once, requests
+    to the same host paced by `delay`); poll()/drain() collect finished crawls and write the
+    results into the Business objects from the calling thread, so callers may update Streamlit
+    widgets. The `budget_s` time budget starts with the first submitted site; sites still pending
+    when it runs out are abandoned. With a `checkpoint` (RunCheckpoint) sites crawled by an
+    interrupted run are answered from disk and every completed crawl is recorded. A `store`
+    (BusinessStore) works the same way across searches: sites crawled recently are not
+    crawled again."""
+    def __init__(self, delay: float = 0.8, max_pages: int = 8, workers: int = 8, budget_s: Optional[float] = None,
+                 checkpoint: Any = None, store: Any = None):
+        self.delay = delay; self.max_pages = max_pages; self.budget_s = budget_s
+        self.checkpoint = checkpoint; self.store = store
+        self.throttle = HostThrottle(delay)
+        self.paths = ContactPathMemory()  # rutas de contacto aprendidas en esta búsqueda, por CMS
+        self.deadline: Optional[float] = None
+        self.updated = 0
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="enrich")
+        self._sites: Dict[str, List[Business]] = {}
+        self._results: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._pending: Dict[Any, str] = {}
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    @property
+    def total(self) -> int: return len(self._sites)
+    @property
+    def done(self) -> int: return len(self._results)
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def submit(self, items: List[Business]) -> List[Business]:
+        """Queue businesses; returns those updated at once from a site already crawled."""
+        changed = []
+        for b in items:
+            if not b.website or b.email: continue
+            key = b.website.strip().rstrip("/").lower()
+            if key in self._sites:
+                self._sites[key].append(b)
+                if key in self._results: changed += self._apply([b], *self._results[key])
+                continue
+            self._sites[key] = [b]
+            hit = self.checkpoint.get_site(key) if self.checkpoint else None
+            if hit is None and self.store: hit = self.store.get_site(key)
+            if hit is not None:
+                self._results[key] = hit; changed += self._apply([b], *hit)
+                continue
+            if self.deadline is None and self.budget_s: self.deadline = time.monotonic() + self.budget_s
+            if self.expired(): continue
+            # el rastreo hereda la caché y la traza de la búsqueda que lo lanza
+            fut = self._pool.submit(contextvars.copy_context().run, extract_email_from_site, b.website,
+                                    self.delay, self.max_pages, self.throttle, self.deadline, self.paths)
+            self._pending[fut] = key
+        return changed
+
+    def _apply(self, bs: List[Business], email: Optional[str], phone: Optional[str]) -> List[Business]:
+        changed = []
+        for b in bs:
+            if email: b.email = email
+            if phone and not b.phone: b.phone = phone
+            if email or phone: changed.append(b)
+        self.updated += len(changed)
+        return changed
+
+    def poll(self, timeout: Optional[float] = 0.0) -> List[Business]:
+        """Apply the crawls finished within `timeout` seconds; returns the businesses updated."""
+        if not self._pending: return []
+        finished, _ = wait(self._pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        changed = []
+        for fut in finished:
+            key = self._pending.pop(fut)
+            try: email, phone = fut.result()
+            except Exception: email, phone = None, None
+            self._results[key] = (email, phone)
+            if not self.expired():  # un rastreo cortado por el presupuesto se repetirá
+                if self.checkpoint: self.checkpoint.put_site(key, email, phone)
+                if self.store: self.store.put_site(key, email, phone)
+            changed += self._apply(self._sites[key], email, phone)
+        return changed
+
+    def iter_drain(self):
+        """Yield the businesses updated by each finished crawl until every queued site is done
+        or the time budget runs out."""
+        while self._pending:
+            before = self.done
+            timeout = None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+            changed = self.poll(timeout)
+            if self.done == before: break  # presupuesto agotado
+            yield changed
+
+    def drain(self, on_progress: Optional[Callable[[int, int], None]] = None,
+              on_update: Optional[Callable[[List[Business]], None]] = None):
+        """Block until every queued site is crawled or the time budget runs out."""
+        for changed in self.iter_drain():
+            if on_update and changed: on_update(changed)
+            if on_progress: on_progress(self.done, self.total)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def enrich_businesses(items: List[Business], delay: float = 0.8, max_pages: int = 8, workers: int = 8,
+                      budget_s: Optional[float] = None,
+                      on_progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """Crawl the websites of `items` in parallel and fill missing email/phone in place.
+
+    Returns the number of businesses that got new data (see SiteEnricher)."""
+    with SiteEnricher(delay, max_pages, workers, budget_s) as enricher:
+        enricher.submit(items)
+        enricher.drain(on_progress)
+        return enricher.updated
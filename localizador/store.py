@@ -0,0 +1,195 @@
+# localizador/store.py — base local de negocios (SQLite): upsert por búsqueda y enriquecimiento incremental
+from __future__ import annotations
+
+import json, math, os, sqlite3, threading, time
+from dataclasses import fields
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .dedupe import (DEDUPE_RADIUS_M, SHARED_DOMAINS, distance_m, normalize_domain, normalize_name,
+                     normalize_phone, similar_names)
+from .models import RESULT_FIELDS, Business, rows_to_df
+
+STORE_PATH = os.getenv("LOCALIZADOR_STORE", os.path.join(os.getcwd(), "salidas", "negocios.sqlite"))
+STORE_ENRICH_MAX_AGE_DAYS = 30  # pasado este tiempo se vuelve a rastrear la web
+
+_FIELDS = [f.name for f in fields(Business)]
+_SQL_TYPES = {"rating": "REAL", "lat": "REAL", "lon": "REAL", "reviews": "INTEGER", "open_now": "INTEGER"}
+
+def business_key(b: Business) -> str:
+    """Key of a business first stored from `b`: place_id (Google/OSM), else website domain, else
+    name + position. Later records of it from another source are found through its aliases."""
+    if b.place_id: return b.place_id
+    dom = normalize_domain(b.website)
+    if dom and dom not in SHARED_DOMAINS: return f"dom:{dom}"
+    pos = f"{b.lat:.4f},{b.lon:.4f}" if b.lat is not None and b.lon is not None else ""
+    return f"nom:{normalize_name(b.name)}@{pos}"
+
+def _aliases(b: Business) -> List[str]:
+    """Identities other records of the same business may share: place_id, phone and own domain."""
+    out = [f"pid:{b.place_id}"] if b.place_id else []
+    phone = normalize_phone(b.phone)
+    if phone: out.append(f"tel:{phone}")
+    dom = normalize_domain(b.website) if b.website else None
+    if dom and dom not in SHARED_DOMAINS: out.append(f"dom:{dom}")
+    return out
+
+class BusinessStore:
+    """Local database of every business found, kept across searches.
+
+    Each search opens a run (begin_run) and upserts its businesses. A record is matched to a
+    stored business with the DedupeIndex rules (same place_id or phone, same domain and similar
+    name, similar name within DEDUPE_RADIUS_M), so one found through OSM and through Google is
+    stored once. A record with the place_id seen before refreshes the search fields, keeping the
+    email/phone already known when it lacks them; a record of it from another source only fills
+    what the stored business lacks. The gremio each run found it for is kept with the run (the business
+    keeps the first one), and first/last-seen times are tracked. Website crawls are recorded per site with their time,
+    so get_site()/put_site() (the interface SiteEnricher uses for checkpoints too) let a new
+    search reuse enrichment newer than `max_age_days` for an unchanged website. Results and
+    exports are queries over the store (to_df). Thread-safe."""
+    def __init__(self, path: str = STORE_PATH, max_age_days: float = STORE_ENRICH_MAX_AGE_DAYS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_age_s = max(0.0, float(max_age_days)) * 86400
+        self.reused_sites = 0
+        self._run_pos: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        cols = ", ".join(f"{n} {_SQL_TYPES.get(n, 'TEXT')}" for n in _FIELDS)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS businesses (key TEXT PRIMARY KEY, {cols}, "
+                         "first_seen REAL, last_seen REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sites (site TEXT PRIMARY KEY, email TEXT, phone TEXT, "
+                         "enriched_at REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "started REAL, job_id TEXT, meta TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS run_items (run_id INTEGER, pos INTEGER, key TEXT, "
+                         "gremio TEXT, PRIMARY KEY (run_id, key))")
+        if "gremio" not in {r[1] for r in self._db.execute("PRAGMA table_info(run_items)")}:
+            self._db.execute("ALTER TABLE run_items ADD COLUMN gremio TEXT")  # bases anteriores
+        self._db.execute("CREATE TABLE IF NOT EXISTS aliases (alias TEXT, key TEXT, PRIMARY KEY (alias, key))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS businesses_pos ON businesses (lat, lon)")
+        if not self._db.execute("SELECT 1 FROM aliases LIMIT 1").fetchone():  # bases anteriores
+            rows = self._db.execute(f"SELECT key, {', '.join(_FIELDS)} FROM businesses").fetchall()
+            self._db.executemany("INSERT OR IGNORE INTO aliases VALUES (?,?)",
+                                 [(a, r[0]) for r in rows for a in _aliases(Business(**dict(zip(_FIELDS, r[1:]))))])
+
+    def begin_run(self, job_id: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> int:
+        with self._lock:
+            cur = self._db.execute("INSERT INTO runs (started, job_id, meta) VALUES (?,?,?)",
+                                   (time.time(), job_id, json.dumps(meta or {}, ensure_ascii=False, default=str)))
+            return int(cur.lastrowid)
+
+    def _resolve(self, b: Business) -> Tuple[Optional[str], bool]:
+        """(key of the stored business `b` is a record of by the DedupeIndex rules, or None;
+        whether it was found by `b`'s own place_id)."""
+        for alias in _aliases(b):
+            if alias.startswith("dom:"): continue
+            row = self._db.execute("SELECT key FROM aliases WHERE alias=? LIMIT 1", (alias,)).fetchone()
+            if row: return row[0], alias.startswith("pid:")
+        name = normalize_name(b.name)
+        if not name: return None, False
+        dom = normalize_domain(b.website) if b.website else None
+        if dom and dom not in SHARED_DOMAINS:
+            for key, other in self._db.execute("SELECT a.key, b.name FROM aliases a JOIN businesses b "
+                                               "ON b.key = a.key WHERE a.alias=?", (f"dom:{dom}",)):
+                if similar_names(name, normalize_name(other)): return key, False
+        if b.lat is not None and b.lon is not None:
+            dlat = DEDUPE_RADIUS_M / 111320.0; dlon = dlat / max(0.1, math.cos(math.radians(b.lat)))
+            for key, other, lat, lon in self._db.execute(
+                    "SELECT key, name, lat, lon FROM businesses WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?",
+                    (b.lat - dlat, b.lat + dlat, b.lon - dlon, b.lon + dlon)):
+                if similar_names(name, normalize_name(other)) and \
+                   distance_m(b.lat, b.lon, lat, lon) <= DEDUPE_RADIUS_M: return key, False
+        return None, False
+
+    def upsert(self, items: Iterable[Business], run_id: Optional[int] = None):
+        """Insert or merge `items` into the businesses they are records of (see the class docstring)."""
+        now = time.time()
+        names = ", ".join(_FIELDS)
+        marks = ", ".join("?" for _ in _FIELDS)
+        # mismo place_id: los campos de búsqueda se refrescan; otra fuente: solo completa lo que falta.
+        # Gremio, fuente y place_id quedan los del primer registro (la clave no cambia).
+        first = {"gremio", "source", "place_id"}
+        refresh = ", ".join(f"{n}=COALESCE(excluded.{n}, {n})" for n in _FIELDS if n not in first)
+        fill = ", ".join(f"{n}=COALESCE({n}, excluded.{n})" for n in _FIELDS)
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for b in items:
+                    key, same = self._resolve(b)
+                    if key is None: key, same = business_key(b), True
+                    self._db.execute(
+                        f"INSERT INTO businesses (key, {names}, first_seen, last_seen) VALUES (?, {marks}, ?, ?) "
+                        f"ON CONFLICT(key) DO UPDATE SET {refresh if same else fill}, "
+                        "last_seen=excluded.last_seen",
+                        (key, *(getattr(b, n) for n in _FIELDS), now, now))
+                    self._db.executemany("INSERT OR IGNORE INTO aliases VALUES (?,?)",
+                                         [(a, key) for a in _aliases(b)])
+                    if run_id is not None:
+                        pos = self._run_pos.get(run_id, 0)
+                        if self._db.execute("INSERT OR IGNORE INTO run_items VALUES (?,?,?,?)",
+                                            (run_id, pos, key, b.gremio)).rowcount:
+                            self._run_pos[run_id] = pos + 1
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK"); raise
+
+    def get_site(self, site: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """(email, phone) of a crawl of `site` newer than max_age_days, else None."""
+        with self._lock:
+            row = self._db.execute("SELECT email, phone, enriched_at FROM sites WHERE site=?", (site,)).fetchone()
+        if row is None or time.time() - row[2] > self.max_age_s: return None
+        self.reused_sites += 1
+        return row[0], row[1]
+
+    def put_site(self, site: str, email: Optional[str], phone: Optional[str]):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO sites VALUES (?,?,?,?)", (site, email, phone, time.time()))
+
+    def _select(self, cols: List[str], run_id: Optional[int], gremios: Optional[List[str]]) -> List[tuple]:
+        # en una búsqueda, el gremio por el que esa búsqueda lo encontró
+        gremio = "COALESCE(r.gremio, b.gremio)" if run_id is not None else "b.gremio"
+        sql = f"SELECT {', '.join(gremio if n == 'gremio' else 'b.' + n for n in cols)} FROM businesses b"
+        args: List[Any] = []; where = []
+        if run_id is not None:
+            sql += " JOIN run_items r ON r.key = b.key"; where.append("r.run_id=?"); args.append(run_id)
+        if gremios:
+            marks = ", ".join("?" for _ in gremios)
+            if run_id is not None:
+                where.append(f"{gremio} IN ({marks})"); args += gremios
+            else:  # cualquier gremio por el que se haya encontrado
+                where.append(f"(b.gremio IN ({marks}) OR "
+                             f"b.key IN (SELECT key FROM run_items WHERE gremio IN ({marks})))")
+                args += gremios + gremios
+        if where: sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY r.pos" if run_id is not None else " ORDER BY b.last_seen DESC"
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def query(self, run_id: Optional[int] = None, gremios: Optional[List[str]] = None) -> List[Business]:
+        """Businesses of one run (in the order found) or the whole store, optionally by gremio."""
+        out = []
+        for row in self._select(_FIELDS, run_id, gremios):
+            rec = dict(zip(_FIELDS, row))
+            if rec["open_now"] is not None: rec["open_now"] = bool(rec["open_now"])
+            out.append(Business(**rec))
+        return out
+
+    def to_df(self, run_id: Optional[int] = None, gremios: Optional[List[str]] = None) -> pd.DataFrame:
+        """Like query(), as the result table: built straight from the SQL rows, with no Business in between."""
+        df = rows_to_df(self._select(list(RESULT_FIELDS.values()), run_id, gremios))
+        df["AbiertoAhora"] = df["AbiertoAhora"].map({1: True, 0: False})
+        return df
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            n = self._db.execute("SELECT COUNT(*) FROM businesses").fetchone()[0]
+            s = self._db.execute("SELECT COUNT(*) FROM sites").fetchone()[0]
+            r = self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        return {"negocios": n, "webs": s, "busquedas": r}
+
+    def close(self):
+        with self._lock: self._db.close()
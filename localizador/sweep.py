@@ -0,0 +1,95 @@
+# localizador/sweep.py — mallas sobre una zona y barrido adaptativo (quadtree)
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .places import PlacesScheduler, iter_google_sweep_v1
+
+if TYPE_CHECKING:
+    from .planner import QueryPlanner
+
+def grid_over_bbox(south,north,west,east,step_km):
+    pts=[]; lat_step=step_km/111.0; mid=(south+north)/2.0; lon_step=step_km/(111.0*max(0.1, math.cos(math.radians(mid))))
+    lat=south
+    while lat<=north:
+        lon=west
+        while lon<=east:
+            pts.append((lat,lon)); lon+=lon_step
+        lat+=lat_step
+    return pts
+
+SATURATION_HITS = 18  # una respuesta con >= 18 de V1_MAX_RESULTS se considera "llena"
+
+def _ring_contains(ring: List[Tuple[float,float]], lon: float, lat: float) -> bool:
+    inside = False; j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]; xj, yj = ring[j]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+def point_in_area(lat: float, lon: float, rings: List[List[Tuple[float,float]]]) -> bool:
+    """Even-odd test over all rings (outer rings and holes alike) of a (multi)polygon."""
+    inside = False
+    for ring in rings:
+        if _ring_contains(ring, lon, lat): inside = not inside
+    return inside
+
+def cell_in_area(cell: Tuple[float,float,float,float], rings: Optional[List[List[Tuple[float,float]]]]) -> bool:
+    """True if the cell touches the area: a corner/center is inside or a polygon vertex falls in the cell."""
+    if not rings: return True
+    s, n, w, e = cell
+    probes = [(s, w), (s, e), (n, w), (n, e), ((s+n)/2, (w+e)/2)]
+    if any(point_in_area(la, lo, rings) for la, lo in probes): return True
+    return any(s <= la <= n and w <= lo <= e for ring in rings for lo, la in ring)
+
+def cells_over_bbox(south, north, west, east, step_km) -> List[Tuple[float,float,float,float]]:
+    lat_step = step_km/111.0; mid = (south+north)/2.0
+    lon_step = step_km/(111.0*max(0.1, math.cos(math.radians(mid))))
+    cells = []; lat = south
+    while lat < north:
+        lon = west
+        while lon < east:
+            cells.append((lat, min(north, lat+lat_step), lon, min(east, lon+lon_step))); lon += lon_step
+        lat += lat_step
+    return cells
+
+def split_cell(cell):
+    s, n, w, e = cell; ml = (s+n)/2; mo = (w+e)/2
+    return [(s, ml, w, mo), (s, ml, mo, e), (ml, n, w, mo), (ml, n, mo, e)]
+
+def cell_center_radius(cell) -> Tuple[Tuple[float,float], float]:
+    """Center of the cell and the radius (km) of the circle that circumscribes it."""
+    s, n, w, e = cell; lat = (s+n)/2; lon = (w+e)/2
+    h_km = (n-s)*111.0/2; w_km = (e-w)*111.0*math.cos(math.radians(lat))/2
+    return (lat, lon), math.hypot(h_km, w_km)
+
+def iter_adaptive_sweep_v1(gremios: List[str], bbox: Tuple[float,float,float,float],
+                           rings: Optional[List[List[Tuple[float,float]]]], start_km: float, min_km: float,
+                           provincia: Optional[str], extras: List[str], idioma: str, scheduler: PlacesScheduler,
+                           on_progress: Optional[Callable[[int, int, int], None]] = None,
+                           ids_only: bool = False, planner: Optional[QueryPlanner] = None):
+    """Quadtree sweep of an area: coarse cells first, splitting only the saturated ones.
+
+    Cells outside `rings` (the area polygon) are skipped. A cell is split in four, per gremio,
+    when one of its responses came back near the API cap and its children would still be at
+    least `min_km` wide. Yields (gremio, places) chunks as they arrive, level by level; `planner`
+    is passed on to every level's iter_google_sweep_v1."""
+    active = [(g, c) for g in gremios for c in cells_over_bbox(*bbox, start_km) if cell_in_area(c, rings)]
+    level = 0; size_km = start_km
+    while active:
+        targets = []
+        for g, cell in active:
+            center, r_km = cell_center_radius(cell)
+            targets.append((g, center, r_km, provincia))
+        prog = (lambda d, n, _lv=level: on_progress(d, n, _lv)) if on_progress else None
+        metas: List[Dict[str, Any]] = []
+        for t, places in iter_google_sweep_v1(targets, extras, idioma, scheduler, prog, metas, ids_only, planner):
+            yield active[t][0], places
+        nxt = []
+        for (g, cell), meta in zip(active, metas):
+            if meta.get("max_hits", 0) >= SATURATION_HITS and size_km / 2 >= min_km:
+                nxt += [(g, c) for c in split_cell(cell) if cell_in_area(c, rings)]
+        active = nxt; level += 1; size_km /= 2
@@ -0,0 +1,182 @@
+# localizador/trace.py — trazas de una búsqueda: spans con duración, bytes, resultados y caché
+from __future__ import annotations
+
+import contextlib, contextvars, datetime, json, os, threading, time
+from typing import Any, Dict, List, Optional
+
+TRACE_DIR = os.path.join(os.getcwd(), "salidas")
+TRACE_MAX_SPANS = 200_000  # en memoria; el fichero JSONL los guarda todos
+
+class Span:
+    """One timed operation. `attrs` holds what was learned while it ran (bytes, results, cache...)."""
+    __slots__ = ("name", "path", "start", "end", "thread", "attrs", "_stack")
+
+    def __init__(self, name: str, path: str, start: float, attrs: Dict[str, Any], stack: List["Span"]):
+        self.name = name; self.path = path; self.start = start; self.end = start
+        self.thread = threading.current_thread().name
+        self.attrs = attrs; self._stack = stack
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "path": self.path, "start_s": round(self.start, 6),
+                "dur_ms": round(self.duration * 1000, 3), "thread": self.thread, **self.attrs}
+
+class _NullSpan:
+    def set(self, **attrs): pass
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_SPAN = _NullSpan()
+
+class _SpanContext:
+    __slots__ = ("tracer", "name", "attrs", "span")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer; self.name = name; self.attrs = attrs
+
+    def __enter__(self) -> Span:
+        stack = self.tracer._stack()
+        path = f"{stack[-1].path}/{self.name}" if stack else self.name
+        self.span = Span(self.name, path, time.perf_counter() - self.tracer.t0, self.attrs, stack)
+        stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        sp = self.span
+        sp.end = time.perf_counter() - self.tracer.t0
+        if exc_type is not None and exc_type is not GeneratorExit: sp.attrs.setdefault("error", exc_type.__name__)
+        if sp in sp._stack: sp._stack.remove(sp)  # un generador puede cerrarse desde otro hilo
+        self.tracer._record(sp)
+        return False
+
+class Tracer:
+    """Thread-safe collector of spans for one run.
+
+    `span(name, **attrs)` is a context manager yielding the Span, whose attrs can be completed
+    before it closes; spans opened inside another one on the same thread get a nested `path`
+    (worker threads start their own roots). With `path` every finished span is also appended
+    to a JSONL file. summary(), tree(), slowest() and timeline() are what the diagnostics show."""
+    def __init__(self, path: Optional[str] = None, max_spans: int = TRACE_MAX_SPANS):
+        self.t0 = time.perf_counter()
+        self.started = datetime.datetime.now()
+        self.path = path
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._fh = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._fh = open(path, "a", encoding="utf-8")
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None: stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, **attrs: Any) -> _SpanContext:
+        return _SpanContext(self, name, attrs)
+
+    def _record(self, sp: Span):
+        line = json.dumps(sp.as_dict(), ensure_ascii=False, default=str) if self._fh else None
+        with self._lock:
+            if len(self.spans) < self.max_spans: self.spans.append(sp)
+            else: self.dropped += 1
+            if line is not None: self._fh.write(line + "\n")
+
+    def _finished(self) -> List[Span]:
+        with self._lock: return list(self.spans)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per span name: count, total/mean/p95/max time, bytes, results and cache hit rate."""
+        groups: Dict[str, List[Span]] = {}
+        for sp in self._finished(): groups.setdefault(sp.name, []).append(sp)
+        out = []
+        for name, sps in groups.items():
+            durs = sorted(s.duration for s in sps)
+            cached = [s.attrs["cache"] for s in sps if "cache" in s.attrs]
+            out.append({"Etapa": name, "Spans": len(sps), "Total (s)": round(sum(durs), 3),
+                        "Media (ms)": round(1000 * sum(durs) / len(durs), 1),
+                        "p95 (ms)": round(1000 * durs[min(len(durs) - 1, int(0.95 * len(durs)))], 1),
+                        "Máx (ms)": round(1000 * durs[-1], 1),
+                        "KB": round(sum(s.attrs.get("bytes", 0) or 0 for s in sps) / 1024, 1),
+                        "Resultados": sum(s.attrs.get("results", 0) or 0 for s in sps),
+                        "% caché": round(100 * cached.count("HIT") / len(cached), 1) if cached else None,
+                        "Errores": sum(1 for s in sps if "error" in s.attrs)})
+        return sorted(out, key=lambda r: -r["Total (s)"])
+
+    def tree(self) -> List[Dict[str, Any]]:
+        """Flame-graph style totals per nesting path, indented, with the share of the traced wall time."""
+        spans = self._finished(); totals: Dict[str, List[float]] = {}
+        for sp in spans:
+            row = totals.setdefault(sp.path, [0, 0.0]); row[0] += 1; row[1] += sp.duration
+        wall = max((s.end for s in spans), default=0.0) or 1.0
+        return [{"Etapa": "  " * path.count("/") + path.rsplit("/", 1)[-1], "Ruta": path, "Spans": n,
+                 "Total (s)": round(t, 3), "% del tiempo": round(100 * t / wall, 1)}
+                for path, (n, t) in sorted(totals.items())]
+
+    def slowest(self, name: str, key: str, n: int = 10) -> List[Dict[str, Any]]:
+        """Spans called `name` grouped by attribute `key` (domain, cell...), slowest total first."""
+        groups: Dict[Any, List[float]] = {}
+        for sp in self._finished():
+            if sp.name == name and sp.attrs.get(key) is not None:
+                groups.setdefault(sp.attrs[key], []).append(sp.duration)
+        rows = [{key.capitalize(): k, "Spans": len(v), "Total (s)": round(sum(v), 3), "Máx (s)": round(max(v), 3)}
+                for k, v in groups.items()]
+        return sorted(rows, key=lambda r: -r["Total (s)"])[:n]
+
+    def timeline(self, bucket_s: float = 1.0, roots_only: bool = True) -> List[Dict[str, Any]]:
+        """Busy seconds per span name in consecutive `bucket_s` windows (for an area/bar chart);
+        with `roots_only` nested spans are left out so time is not counted twice."""
+        buckets: Dict[int, Dict[str, float]] = {}
+        for sp in self._finished():
+            if roots_only and "/" in sp.path: continue
+            t = sp.start
+            while t < sp.end:
+                b = int(t // bucket_s); edge = min(sp.end, (b + 1) * bucket_s)
+                row = buckets.setdefault(b, {}); row[sp.name] = row.get(sp.name, 0.0) + edge - t
+                t = edge
+        return [{"Segundo": round(b * bucket_s, 3), **row} for b, row in sorted(buckets.items())]
+
+    def close(self):
+        with self._lock:
+            if self._fh: self._fh.close(); self._fh = None
+
+def trace_path(job_id: str, out_dir: Optional[str] = None) -> str:
+    """salidas/traza_<job>_<fecha>.jsonl"""
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(out_dir or TRACE_DIR, f"traza_{job_id}_{stamp}.jsonl")
+
+_TRACER: Optional[Tracer] = None
+_RUN_TRACER: contextvars.ContextVar = contextvars.ContextVar("tracer")
+
+def get_tracer() -> Optional[Tracer]:
+    """The tracer of the current run (using_tracer), else the process-wide one."""
+    return _RUN_TRACER.get(_TRACER)
+
+def set_tracer(tracer: Optional[Tracer]):
+    """Install the process-wide tracer, used wherever no run installed its own (None disables tracing)."""
+    global _TRACER
+    _TRACER = tracer
+
+@contextlib.contextmanager
+def using_tracer(tracer: Optional[Tracer]):
+    """Report the spans of the code run inside the block (and of the worker threads it starts through
+    PlacesScheduler/SiteEnricher) to `tracer` only; other runs of the process are not traced in it."""
+    token = _RUN_TRACER.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _RUN_TRACER.reset(token)
+
+def span(name: str, **attrs: Any):
+    """Span on the current tracer, or a no-op when tracing is off."""
+    tracer = _RUN_TRACER.get(_TRACER)
+    return tracer.span(name, **attrs) if tracer is not None else _NULL_SPAN
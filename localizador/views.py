@@ -0,0 +1,130 @@
+# localizador/views.py — resumen, filtros, páginas y mapa de una tabla de resultados, calculados una vez
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .export import result_hash
+
+RATING_BINS = [0, 1, 2, 3, 4, 5]
+MAP_MAX_POINTS = 4000       # más puntos se agrupan en celdas (el navegador no pinta 50k marcadores con soltura)
+FILTER_MEMO_SIZE = 16       # combinaciones de filtros recordadas por tabla
+VIEW_MEMO_SIZE = 8          # tablas de resultados (ResultView) compartidas en memoria entre sesiones
+EMAIL_FILTERS = ("Todos", "Con email", "Sin email")
+
+class ResultView:
+    """Aggregations of one result table for the dashboard, each computed at most once.
+
+    Metrics, rating histogram and counts by gremio are plain vectorized pandas; map_points() caps
+    the markers sent to the browser by clustering on a lat/lon grid; filtered() remembers the
+    row selection of recent filter combinations, and page() slices it so only one page of a large
+    table is rendered."""
+    def __init__(self, df: pd.DataFrame, key: Optional[str] = None):
+        self.df = df
+        self.key = key or result_hash(df)
+        self._memo: Dict[str, Any] = {}
+        self._filters: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, build):
+        with self._lock:
+            if name not in self._memo: self._memo[name] = build()
+            return self._memo[name]
+
+    def _ratings(self) -> pd.Series:
+        import pandas as pd
+        return pd.to_numeric(self.df["Rating"], errors="coerce")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Businesses, mean rating (None without ratings) and businesses with email."""
+        def build():
+            mean = self._ratings().mean()
+            return {"negocios": len(self.df), "rating_medio": None if mean != mean else round(float(mean), 2),
+                    "con_email": int(self.df["Email"].notna().sum())}
+        return self._get("metrics", build)
+
+    def rating_hist(self) -> pd.Series:
+        def build():
+            import pandas as pd
+            return pd.cut(self._ratings(), bins=RATING_BINS, include_lowest=True).value_counts().sort_index()
+        return self._get("rating_hist", build)
+
+    def by_gremio(self) -> pd.Series:
+        return self._get("by_gremio", lambda: self.df["Gremio"].value_counts().rename(index=str))
+
+    def gremios(self) -> List[str]:
+        return self._get("gremios", lambda: sorted(self.df["Gremio"].dropna().unique().tolist()))
+
+    def map_points(self, max_points: int = MAP_MAX_POINTS) -> pd.DataFrame:
+        """lat/lon/n/size rows for st.map: every business up to `max_points`, otherwise one point per
+        occupied grid cell (at the cell's mean position, sized by how many businesses it holds), with
+        the cell doubled until the cells fit."""
+        def build():
+            import numpy as np, pandas as pd
+            pts = self.df[["Lat", "Lon"]].apply(pd.to_numeric, errors="coerce").dropna()
+            pts = pts.rename(columns={"Lat": "lat", "Lon": "lon"})
+            if len(pts) <= max_points:
+                return pts.assign(n=1, size=40.0).reset_index(drop=True)
+            lat, lon = pts["lat"].to_numpy(), pts["lon"].to_numpy()
+            span = max(float(np.ptp(lat)), float(np.ptp(lon)), 1e-6)
+            cell = span / np.sqrt(max_points)
+            while True:
+                keys = np.floor(lat / cell).astype(np.int64) * 4_000_003 + np.floor(lon / cell).astype(np.int64)
+                if len(np.unique(keys)) <= max_points: break
+                cell *= 2
+            out = pts.groupby(keys).agg(lat=("lat", "mean"), lon=("lon", "mean"), n=("lat", "size")).reset_index(drop=True)
+            km = cell * 111.0  # radio del círculo: hasta media celda, según el número de negocios
+            out["size"] = 40.0 + (km * 500.0 - 40.0) * np.sqrt(out["n"] / out["n"].max())
+            return out
+        return self._get(f"map:{max_points}", build)
+
+    def filtered(self, gremios: Sequence[str] = (), min_rating: float = 0.0, email: str = "Todos",
+                 text: str = "") -> pd.DataFrame:
+        """Rows matching the filters (gremio in `gremios`, rating >= `min_rating`, with/without email,
+        `text` in name or address); recent combinations are memoized."""
+        fkey = (tuple(sorted(gremios)), float(min_rating), email, text.strip().lower())
+        with self._lock:
+            if fkey in self._filters:
+                self._filters.move_to_end(fkey); return self._filters[fkey]
+        df = self.df; mask = None
+        def _and(m):
+            nonlocal mask
+            mask = m if mask is None else mask & m
+        if fkey[0]: _and(df["Gremio"].isin(fkey[0]))
+        if min_rating > 0: _and(self._ratings() >= min_rating)
+        if email == "Con email": _and(df["Email"].notna())
+        elif email == "Sin email": _and(df["Email"].isna())
+        if fkey[3]:
+            _and(df["Nombre"].fillna("").str.lower().str.contains(fkey[3], regex=False)
+                 | df["Dirección"].fillna("").str.lower().str.contains(fkey[3], regex=False))
+        out = df if mask is None else df[mask]
+        with self._lock:
+            self._filters[fkey] = out
+            while len(self._filters) > FILTER_MEMO_SIZE: self._filters.popitem(last=False)
+        return out
+
+    @staticmethod
+    def page(df: pd.DataFrame, page: int, page_size: int) -> Tuple[pd.DataFrame, int]:
+        """(rows of 1-based `page`, number of pages)."""
+        pages = max(1, -(-len(df) // max(1, page_size)))
+        page = min(max(1, int(page)), pages)
+        return df.iloc[(page - 1) * page_size: page * page_size], pages
+
+_VIEWS: "OrderedDict[str, ResultView]" = OrderedDict()
+_VIEWS_LOCK = threading.Lock()
+
+def result_view(df: pd.DataFrame, key: Optional[str] = None) -> ResultView:
+    """ResultView for `df`, shared by every caller (and session) with the same results. Pass the
+    `key` (result_hash) when it is already known to skip hashing the table again."""
+    key = key or result_hash(df)
+    with _VIEWS_LOCK:
+        view = _VIEWS.get(key)
+        if view is None:
+            view = _VIEWS[key] = ResultView(df, key)
+            while len(_VIEWS) > VIEW_MEMO_SIZE: _VIEWS.popitem(last=False)
+        _VIEWS.move_to_end(key)
+        return view
@@ -0,0 +1,45 @@
+# tests/test_checkpoint.py — reanudar una búsqueda desde su checkpoint
+import json
+
+from localizador.checkpoint import RunCheckpoint, job_id_for
+
+def test_job_id_is_stable_and_order_independent():
+    assert job_id_for({"a": 1, "b": [1, 2]}) == job_id_for({"b": [1, 2], "a": 1})
+    assert job_id_for({"a": 1}) != job_id_for({"a": 2})
+
+def test_resume_unfinished_run(tmp_path):
+    cp = RunCheckpoint("j1", {"modo": "Radio"}, base_dir=str(tmp_path))
+    assert not cp.resumed
+    cp.put_unit("u1", [{"id": "p1"}], {"status": "OK"}); cp.put_site("web.es", "info@web.es", None)
+    cp.close()  # el proceso muere sin finish()
+    again = RunCheckpoint("j1", base_dir=str(tmp_path))
+    assert again.resumed and (again.resumed_units, again.resumed_sites) == (1, 1)
+    assert again.get_unit("u1") == ([{"id": "p1"}], {"status": "OK"})
+    assert again.get_unit("u1") is None                  # se entrega una sola vez
+    assert again.get_site("web.es") == ("info@web.es", None)
+    assert again.get_unit("u2") is None and again.get_site("otra.es") is None
+    with open(tmp_path / "j1" / "state.json", encoding="utf-8") as fh:
+        state = json.load(fh)
+    assert state["params"] == {"modo": "Radio"} and state["status"] == "running"
+    again.close()
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    cp = RunCheckpoint("j2", base_dir=str(tmp_path))
+    cp.put_unit("u1", [], {}); cp.close()
+    with open(tmp_path / "j2" / "units.jsonl", "a", encoding="utf-8") as fh:
+        fh.write('{"k": "u2", "pla')
+    again = RunCheckpoint("j2", base_dir=str(tmp_path))
+    assert again.resumed_units == 1
+    again.close()
+
+def test_finished_or_not_resumed_starts_afresh(tmp_path):
+    cp = RunCheckpoint("j3", base_dir=str(tmp_path))
+    cp.put_unit("u1", [], {}); cp.finish()
+    again = RunCheckpoint("j3", base_dir=str(tmp_path))
+    assert not again.resumed
+    again.close()
+    cp = RunCheckpoint("j4", base_dir=str(tmp_path))
+    cp.put_unit("u1", [], {}); cp.close()
+    fresh = RunCheckpoint("j4", base_dir=str(tmp_path), resume=False)
+    assert not fresh.resumed and fresh.get_unit("u1") is None
+    fresh.close()
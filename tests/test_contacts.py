@@ -0,0 +1,37 @@
+# tests/test_contacts.py — formatos de email y teléfono que extract_contacts debe reconocer (o descartar)
+import pytest
+
+from localizador.contacts import extract_contacts
+
+# (fragmento, email esperado, teléfono esperado); None = no debe encontrar ninguno
+CASES = [
+    ("<p>Tel. 91 123 45 67</p>", None, "911 234 567"),
+    ("<p>Llámanos: 91-123-45-67</p>", None, "911 234 567"),
+    ("<p>93.412.34.56</p>", None, "934 123 456"),
+    ("<p>912 34 56 78</p>", None, "912 345 678"),
+    ("<p>+34 612 345 678</p>", None, "612 345 678"),
+    ("<p>0034 91 123 45 67</p>", None, "911 234 567"),
+    ("<p>Móvil 712 345 678</p>", None, "712 345 678"),
+    ("<p>Gratuito 812 345 678</p>", None, "812 345 678"),
+    ("<p>Ref. 12345678901</p>", None, None),
+    ("<p>Pedido 512 345 678</p>", None, None),              # los números españoles empiezan por 6, 7, 8 o 9
+    ("<p>Código 123456789</p>", None, None),
+    ('<a href="tel:+34612345678">Llamar</a>', None, "612 345 678"),
+    ('<a href="mailto:info@empresa.es?subject=Hola">Escríbenos</a>', "info@empresa.es", None),
+    ("<p>info(arroba)empresa.es</p>", "info@empresa.es", None),
+    ("<p>info [arroba] empresa [punto] es</p>", "info@empresa.es", None),
+    ("<p>presupuestos [at] fontaneria-ejemplo [dot] es</p>", "presupuestos@fontaneria-ejemplo.es", None),
+    ("<p>Escríbenos a info arroba empresa punto es</p>", "info@empresa.es", None),
+    ("<p>info arroba empresa.es</p>", "info@empresa.es", None),
+    ('<img srcset="/logo@2x.png 2x">', None, None),
+    ("<p>info@example.com</p>", None, None),                 # direcciones de relleno
+]
+
+@pytest.mark.parametrize("html, email, phone", CASES)
+def test_best_contacts(html, email, phone):
+    found = extract_contacts(html)
+    assert (found.best_email, found.best_phone) == (email, phone)
+
+def test_mailto_preferred_over_text():
+    found = extract_contacts('<p>otro@empresa.es</p><footer><a href="mailto:info@empresa.es">info</a></footer>')
+    assert found.best_email == "info@empresa.es"
@@ -0,0 +1,76 @@
+# tests/test_dedupe.py — reglas de fusión de DedupeIndex
+from localizador.dedupe import DedupeIndex, dedupe_businesses, normalize_name, normalize_phone
+from localizador.models import Business
+
+def biz(name, **kw):
+    return Business(gremio=kw.pop("gremio", "Fontaneros"), name=name, **kw)
+
+def test_normalizers():
+    assert normalize_name("Fontanería García, S.L.") == "fontaneriagarcia"
+    assert normalize_phone("+34 912 34 56 78") == normalize_phone("0034912345678") == "912345678"
+    assert normalize_phone("1234") is None
+
+def test_same_place_id_merges_and_fills_missing_fields():
+    idx = DedupeIndex()
+    kept = biz("Fontanería García", place_id="p1")
+    assert idx.add(kept) is None
+    assert idx.add(biz("Otro nombre", place_id="p1", phone="912345678", email="a@b.es")) is kept
+    assert (kept.phone, kept.email) == ("912345678", "a@b.es")
+    assert idx.merged["place_id"] == 1 and idx.unique == 1
+
+def test_same_phone_merges():
+    idx = DedupeIndex()
+    kept = biz("Fontanería García", phone="912 34 56 78")
+    idx.add(kept)
+    assert idx.add(biz("Garcia Fontaneros", phone="+34 912345678")) is kept
+    assert idx.merged["telefono"] == 1
+
+def test_same_domain_needs_similar_name():
+    idx = DedupeIndex()
+    kept = biz("Fontanería García", website="https://www.fontaneriagarcia.es/contacto")
+    idx.add(kept)
+    assert idx.add(biz("Fontaneria Garcia SL", website="http://fontaneriagarcia.es")) is kept
+    assert idx.add(biz("Electricidad Pérez", website="fontaneriagarcia.es")) is None
+    assert idx.merged["dominio"] == 1
+
+def test_shared_domains_never_merge():
+    idx = DedupeIndex()
+    idx.add(biz("Fontanería García", website="https://facebook.com/garcia"))
+    assert idx.add(biz("Fontanería García", website="https://facebook.com/otra")) is None
+
+def test_similar_name_within_radius():
+    idx = DedupeIndex()
+    kept = biz("Fontanería García", lat=40.4168, lon=-3.7038)
+    idx.add(kept)
+    assert idx.add(biz("Fontaneria Garcia", lat=40.4175, lon=-3.7040)) is kept      # ~80 m
+    assert idx.add(biz("Fontaneria Garcia", lat=40.4300, lon=-3.7038)) is None      # ~1.5 km
+    assert idx.add(biz("Cerrajería Luna", lat=40.4168, lon=-3.7038)) is None
+    assert idx.merged["nombre_geo"] == 1
+
+def test_duplicate_keys_lead_to_kept_record():
+    """A duplicate's own phone, domain, name and position keep matching later records."""
+    idx = DedupeIndex()
+    kept = biz("Fontanería García", place_id="p1", phone="912345678", website="fontaneriagarcia.es")
+    idx.add(kept)
+    dup = biz("Fontanería García Hermanos", place_id="p1", phone="611222333", website="garciahermanos.es",
+              lat=40.4168, lon=-3.7038)
+    assert idx.add(dup) is kept
+    assert idx.add(biz("Sin ficha", phone="611 22 23 33")) is kept
+    assert idx.add(biz("Fontaneria Garcia Hermanos", website="https://garciahermanos.es")) is kept
+    assert idx.add(biz("Fontanería García Hermanos", lat=40.4170, lon=-3.7037)) is kept
+    assert idx.unique == 1
+
+def test_repeated_merges_do_not_grow_buckets():
+    idx = DedupeIndex()
+    kept = biz("Fontanería García", place_id="p1", website="fontaneriagarcia.es", lat=40.0, lon=-3.0)
+    idx.add(kept)
+    for _ in range(100):
+        idx.add(biz("Fontanería García", place_id="p1", website="fontaneriagarcia.es", lat=40.0, lon=-3.0))
+    assert len(idx._by_domain["fontaneriagarcia.es"]) == 1
+    assert all(len(bucket) == 1 for bucket in idx._grid.values())
+
+def test_dedupe_businesses_across_batches():
+    idx = DedupeIndex()
+    first = dedupe_businesses([biz("A", place_id="a"), biz("A", place_id="a"), biz("B", place_id="b")], idx)
+    assert [b.name for b in first] == ["A", "B"]
+    assert dedupe_businesses([biz("B", place_id="b"), biz("C", place_id="c")], idx)[0].name == "C"
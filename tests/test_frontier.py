@@ -0,0 +1,51 @@
+# tests/test_frontier.py — orden de visita de las páginas de una web
+from localizador.frontier import (ContactPathMemory, CrawlFrontier, canonical_url, detect_cms, link_score,
+                                  path_key, sitemap_urls)
+
+def test_canonical_url_merges_variants_of_a_page():
+    same = ["https://www.empresa.es/", "http://empresa.es", "https://empresa.es/index.php",
+            "https://empresa.es/?utm_source=x&fbclid=y", "https://empresa.es:443/#top"]
+    assert {canonical_url(u) for u in same} == {"//empresa.es/"}
+    assert canonical_url("https://empresa.es/contacto/?b=2&a=1") == "//empresa.es/contacto?a=1&b=2"
+    assert canonical_url("http://empresa.es:8080/x") == "//empresa.es:8080/x"
+    assert path_key("https://www.empresa.es/Contacto/") == "/contacto"
+
+def test_link_score_prefers_contact_and_penalizes_blog_and_shop():
+    contact = link_score("https://empresa.es/contacto", "Contáctanos")
+    legal = link_score("https://empresa.es/aviso-legal")
+    assert contact > legal > link_score("https://empresa.es/servicios")
+    assert link_score("https://empresa.es/blog/2023/contacto") < link_score("https://empresa.es/contacto")
+    assert link_score("https://empresa.es/tienda/") < 0
+
+def test_frontier_pops_best_first_and_once():
+    f = CrawlFrontier("https://empresa.es")
+    f.add_links("https://empresa.es/", [("/servicios", "Servicios"), ("contacto", "Contacto"),
+                                        ("/contacto#form", ""), ("https://www.empresa.es/contacto/", ""),
+                                        ("mailto:info@empresa.es", ""), ("https://otra.es/contacto", ""),
+                                        ("/catalogo.pdf", ""), ("https://blog.empresa.es/aviso-legal", "")])
+    assert len(f) == 3
+    order = [f.pop()[0] for _ in range(len(f))]
+    assert order == ["https://empresa.es/contacto", "https://blog.empresa.es/aviso-legal",
+                     "https://empresa.es/servicios"]
+    assert f.best_score() is None
+
+def test_guesses_boosted_by_memory_of_same_cms():
+    memory = ContactPathMemory()
+    for site in ("a.es", "b.es", "c.es"):
+        memory.record("wordpress", f"https://{site}/contacta-con-nosotros", True)
+    memory.record("wordpress", "https://a.es/", True)                # la portada no se aprende
+    memory.record("wix", "https://d.es/contacto", False)             # nunca encontró nada
+    assert memory.suggestions("wordpress") == [("/contacta-con-nosotros", 1.0)]
+    assert memory.suggestions("wix") == []
+    f = CrawlFrontier("https://e.es")
+    f.add_guesses("wordpress", memory)
+    assert f.pop()[0] == "https://e.es/contacta-con-nosotros"
+    assert f.pop()[0] == "https://e.es/contacto"
+
+def test_detect_cms_and_sitemap():
+    assert detect_cms('<link href="/wp-content/themes/x.css">') == "wordpress"
+    assert detect_cms("<html></html>") == "otro"
+    pages, children = sitemap_urls("<urlset><loc>https://e.es/contacto</loc><loc> https://e.es/a?x=1&amp;y=2 </loc>"
+                                   "<loc>https://e.es/sitemap-pages.xml</loc></urlset>")
+    assert pages == ["https://e.es/contacto", "https://e.es/a?x=1&y=2"]
+    assert children == ["https://e.es/sitemap-pages.xml"]
@@ -0,0 +1,48 @@
+# tests/test_hydrator.py — detalles de la segunda fase en el pool del scheduler
+import threading
+
+from localizador.places import PlaceHydrator, PlacesScheduler
+
+class FakeScheduler(PlacesScheduler):
+    """Answers Place Details locally; place_ids in `fail` get an error."""
+    def __init__(self, fail=()):
+        super().__init__(qps=1000.0, workers=4)
+        self.fail = set(fail); self.asked = []; self.threads = set()
+
+    def _run_one(self, job):
+        self.asked.append(job.place_id); self.threads.add(threading.current_thread().name)
+        if job.place_id in self.fail: return [], {"status": "ERROR", "error": "boom"}
+        return [{"id": job.place_id, "displayName": {"text": job.place_id}}], {"status": "OK"}
+
+def _collect(hydrator):
+    out = list(hydrator.poll())
+    for chunk in hydrator.drain(): out.extend(chunk)
+    return out
+
+def test_details_once_per_place_across_chunks():
+    sch = FakeScheduler(); h = PlaceHydrator(sch)
+    h.submit("Fontaneros", [{"id": "a"}, {"id": "b"}, {"id": "a"}])
+    h.submit("Electricistas", [{"id": "b"}, {"id": "c"}, {}])
+    got = _collect(h)
+    assert sorted(p["id"] for _, p in got) == ["a", "b", "c"]
+    assert sorted(sch.asked) == ["a", "b", "c"]
+    assert dict((p["id"], g) for g, p in got)["c"] == "Electricistas"
+    h.submit("Fontaneros", [{"id": "a"}]); assert h.pending == 0    # ya completado
+    sch.close()
+
+def test_one_pool_for_the_whole_sweep():
+    sch = FakeScheduler(); h = PlaceHydrator(sch)
+    for i in range(10): h.submit("Fontaneros", [{"id": f"p{i}-{j}"} for j in range(5)])
+    assert len(_collect(h)) == 50
+    assert len(sch.threads) <= sch.workers
+    sch.close()
+
+def test_failed_details_are_asked_again():
+    errors = []
+    sch = FakeScheduler(fail={"x"}); sch.on_errors = errors.extend
+    h = PlaceHydrator(sch)
+    h.submit("Fontaneros", [{"id": "x"}]); assert _collect(h) == []
+    assert errors == ["boom"] and "x" not in h.done
+    sch.fail.clear(); h.submit("Fontaneros", [{"id": "x"}])
+    assert [p["id"] for _, p in _collect(h)] == ["x"] and sch.asked == ["x", "x"]
+    sch.close()
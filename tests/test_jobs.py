@@ -0,0 +1,39 @@
+# tests/test_jobs.py — cola de trabajos: reutilización de búsquedas idénticas y reparto entre usuarios
+import pytest
+
+from localizador.engine import SearchParams
+from localizador.jobs import QUEUED, RUNNING, JobOptions, JobQueue
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "trabajos.sqlite"))
+    yield q
+    q.close()
+
+def params(*gremios):
+    return SearchParams(gremios=list(gremios), modo="Radio", centro="Madrid", radio_km=5)
+
+def test_identical_search_and_options_share_a_job(queue):
+    first = queue.submit(params("Fontaneros"), "ana", JobOptions(nombre_base="x"))
+    assert queue.submit(params("Fontaneros"), "luis", JobOptions(nombre_base="x")) == first
+    assert queue.get(first).owner == "ana"                    # quien se suma ve que es compartido
+
+def test_different_options_or_search_get_their_own_job(queue):
+    first = queue.submit(params("Fontaneros"), "ana", JobOptions(nombre_base="x"))
+    assert queue.submit(params("Fontaneros"), "luis", JobOptions(nombre_base="x", parquet=True)) != first
+    assert queue.submit(params("Electricistas"), "luis", JobOptions(nombre_base="x")) != first
+    queue.cancel(first)
+    assert queue.submit(params("Fontaneros"), "luis", JobOptions(nombre_base="x")) != first
+
+def test_claim_prefers_owner_with_fewest_running(queue):
+    a1 = queue.submit(params("Fontaneros"), "ana"); a2 = queue.submit(params("Electricistas"), "ana")
+    b1 = queue.submit(params("Cerrajeros"), "luis")
+    assert queue.claim("w").id == a1
+    assert queue.claim("w").id == b1                          # ana ya tiene uno en marcha
+    job = queue.claim("w")
+    assert job.id == a2 and job.state == RUNNING and queue.claim("w") is None
+    assert queue.get(a2).options == JobOptions()
+
+def test_stale_running_job_goes_back_to_queue(queue):
+    jid = queue.submit(params("Fontaneros"), "ana"); queue.claim("w")
+    assert queue.requeue_stale(max_age_s=-1) == 1 and queue.get(jid).state == QUEUED
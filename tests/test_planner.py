@@ -0,0 +1,58 @@
+# tests/test_planner.py — reparto del nearby multigremio y palabras clave que se dejan de enviar
+from localizador.planner import KeywordStats, QueryPlanner, cell_of, region_of
+
+MADRID = (40.4168, -3.7038)
+
+def test_classify_by_primary_type_then_types():
+    planner = QueryPlanner()
+    places = [{"id": "1", "primaryType": "plumber", "types": ["plumber", "electrician"]},
+              {"id": "2", "primaryType": "point_of_interest", "types": ["electrician"]},
+              {"id": "3", "primaryType": "electronics_store"},
+              {"id": "4", "primaryType": "restaurant", "types": ["food"]}]
+    out = planner.classify(places, ["Fontaneros", "Electricistas", "Reparación de electrodomésticos"])
+    assert [p["id"] for p in out["Fontaneros"]] == ["1"]           # primaryType manda sobre types
+    assert [p["id"] for p in out["Electricistas"]] == ["2"]
+    assert [p["id"] for p in out["Reparación de electrodomésticos"]] == ["3"]
+
+def test_region_and_cell_keys():
+    assert region_of(MADRID, " Madrid ") == "prov:madrid"
+    assert region_of(MADRID, None) == "80,-8"
+    assert cell_of(MADRID, 2.5) == "40.41680,-3.70380/2.500"
+
+def _learn(stats, kw_new, cells=8):
+    planner = QueryPlanner(keywords=stats)
+    for i in range(cells):
+        center = (40.0 + i * 0.01, -3.7)
+        plain = [{"id": f"p{i}"}]
+        planner.observe("Fontaneros", center, 2.0, "Madrid",
+                        [(None, plain)] + [(kw, plain + [{"id": f"{kw}{i}-{j}"} for j in range(n)])
+                                           for kw, n in kw_new.items()])
+    planner.flush()
+
+def test_keywords_dropped_after_enough_useless_trials(tmp_path):
+    stats = KeywordStats(str(tmp_path / "kw.sqlite"))
+    _learn(stats, {"urgencias": 2, "24h": 0})
+    assert stats.stats("prov:madrid", "Fontaneros") == {"urgencias": (8, 16), "24h": (8, 0)}
+    planner = QueryPlanner(keywords=stats, explore=0.0)
+    assert planner.keywords_for("Fontaneros", MADRID, 2.0, "Madrid", ["urgencias", "24h"]) == ["urgencias"]
+    assert planner.skipped == {("Fontaneros", "24h"): 1}
+    assert "24h (Fontaneros) ×1" in planner.summary()[0]
+    # en otra provincia no hay datos: se envían todas
+    assert planner.keywords_for("Fontaneros", MADRID, 2.0, "Toledo", ["urgencias", "24h"]) == ["urgencias", "24h"]
+    stats.close()
+
+def test_keywords_kept_until_min_trials_and_explored(tmp_path):
+    stats = KeywordStats(str(tmp_path / "kw.sqlite"))
+    _learn(stats, {"24h": 0}, cells=3)
+    assert QueryPlanner(keywords=stats).keywords_for("Fontaneros", MADRID, 2.0, "Madrid", ["24h"]) == ["24h"]
+    _learn(stats, {"24h": 0}, cells=8)
+    planner = QueryPlanner(keywords=stats, explore=1.0)              # toda celda explora
+    assert planner.keywords_for("Fontaneros", MADRID, 2.0, "Madrid", ["24h"]) == ["24h"]
+    stats.close()
+
+def test_reobserving_a_cell_replaces_its_observation(tmp_path):
+    stats = KeywordStats(str(tmp_path / "kw.sqlite"))
+    _learn(stats, {"urgencias": 1}, cells=2); _learn(stats, {"urgencias": 3}, cells=2)
+    assert stats.stats("prov:madrid", "Fontaneros") == {"urgencias": (2, 6)}
+    assert QueryPlanner().keywords_for("Fontaneros", MADRID, 2.0, None, ["a"]) == ["a"]   # sin estadísticas
+    stats.close()
@@ -0,0 +1,57 @@
+# tests/test_quota.py — tramos de facturación de Places y presupuesto por búsqueda
+import pytest
+
+from localizador.quota import QuotaLedger, estimate_cost, sku_for_field_mask, sku_price
+
+@pytest.mark.parametrize("mask, sku", [
+    ("places.id", "IDs Only"),
+    ("id,name", "IDs Only"),
+    ("places.id,places.location", "Essentials"),
+    ("places.id,places.formattedAddress,places.types", "Essentials"),
+    ("places.id,places.primaryType", "Pro"),
+    ("places.id,places.displayName,places.googleMapsUri", "Pro"),
+    ("places.id,places.websiteUri", "Enterprise"),
+    ("places.id,places.nationalPhoneNumber,places.primaryType", "Enterprise"),
+    ("places.id,places.rating,places.reviews", "Enterprise + Atmosphere"),
+])
+def test_sku_for_field_mask(mask, sku):
+    assert sku_for_field_mask(mask) == sku
+
+def test_prices():
+    assert sku_price("searchText", "IDs Only") == 0.0
+    assert sku_price("searchNearby", "Essentials") == sku_price("searchNearby", "Pro") == 0.032
+    assert sku_price("searchNearby", "IDs Only") == 0.040          # sin ese tramo: el más caro
+    assert sku_price("placeDetails", "Enterprise") == 0.020
+    assert estimate_cost(10, 5, "IDs Only", "Essentials") == pytest.approx(5 * 0.032)
+
+def test_ledger_budget_refunds_cached_and_failed():
+    ledger = QuotaLedger(budget_usd=0.07)
+    assert ledger.reserve("searchText", "Enterprise")            # 0.035
+    ledger.settle("searchText", "Enterprise", "cached")           # devuelto
+    assert ledger.reserve("searchText", "Enterprise")
+    ledger.settle("searchText", "Enterprise", "errors")
+    assert ledger.reserve("searchText", "Enterprise") and ledger.reserve("searchText", "Enterprise")
+    assert not ledger.reserve("searchText", "Enterprise")
+    ledger.settle("searchText", "Enterprise", "billed", 0.2); ledger.settle("searchText", "Enterprise", "billed", 0.4)
+    assert ledger.exhausted and ledger.refused == 1 and ledger.billed == 2
+    (row,) = ledger.summary()
+    assert (row["Facturables"], row["Caché"], row["Errores"], row["Coste (USD)"]) == (2, 1, 1, 0.07)
+    assert row["Latencia media (s)"] == pytest.approx(0.2)
+    assert ledger.as_meta()["coste_usd"] == 0.07
+
+def test_ledger_without_budget_never_refuses():
+    ledger = QuotaLedger()
+    assert all(ledger.reserve("searchNearby", "Pro") for _ in range(1000))
+    assert not ledger.exhausted
+
+def test_cached_responses_do_not_count_against_max_requests(monkeypatch):
+    from localizador import places
+    from localizador.places import PlacesJob, PlacesScheduler
+    cached = {"a", "b", "c"}
+    monkeypatch.setattr(places, "v1_place_details", lambda pid, lang, **kw: (
+        [{"id": pid}], {"status": "OK", "cache": "HIT" if pid in cached else "MISS"}))
+    sch = PlacesScheduler(qps=1000.0, max_requests=2, api_key="k")
+    jobs = [PlacesJob("Fontaneros", (0.0, 0.0), 0.0, place_id=pid) for pid in ("a", "x", "b", "c", "y", "z")]
+    statuses = [meta["status"] for _, meta in (sch._run_one(j) for j in jobs)]
+    assert statuses == ["OK"] * 5 + ["QUOTA_EXCEEDED"]
+    assert sch.requests_sent == 2
@@ -0,0 +1,91 @@
+# tests/test_store.py — base local de negocios: upsert, búsquedas y caducidad del enriquecimiento
+import time
+
+import pytest
+
+from localizador.models import Business
+from localizador.store import BusinessStore, business_key
+
+@pytest.fixture
+def store(tmp_path):
+    s = BusinessStore(str(tmp_path / "negocios.sqlite"), max_age_days=1)
+    yield s
+    s.close()
+
+def biz(name, **kw):
+    return Business(gremio=kw.pop("gremio", "Fontaneros"), name=name, **kw)
+
+def test_business_key():
+    assert business_key(biz("A", place_id="p1", website="a.es")) == "p1"
+    assert business_key(biz("A", website="https://www.a.es/x")) == "dom:a.es"
+    assert business_key(biz("Fontanería A", website="https://facebook.com/a", lat=40.0, lon=-3.0)) == \
+        "nom:fontaneriaa@40.0000,-3.0000"
+
+def test_upsert_refreshes_search_fields_and_keeps_known_contacts(store):
+    run1 = store.begin_run("j", {})
+    store.upsert([biz("Fontanería A", place_id="p1", phone="912345678", email="a@a.es", rating=4.0)], run1)
+    run2 = store.begin_run("j", {})
+    store.upsert([biz("Fontanería A (nuevo)", place_id="p1", rating=4.5, open_now=False)], run2)
+    (b,) = store.query(run2)
+    assert (b.name, b.rating, b.open_now) == ("Fontanería A (nuevo)", 4.5, False)
+    assert (b.phone, b.email) == ("912345678", "a@a.es")             # COALESCE: se conserva lo conocido
+    assert store.stats() == {"negocios": 1, "webs": 0, "busquedas": 2}
+
+def test_run_keeps_order_found_and_each_business_once(store):
+    run = store.begin_run()
+    store.upsert([biz("B", place_id="b"), biz("A", place_id="a")], run)
+    store.upsert([biz("B", place_id="b"), biz("C", place_id="c", gremio="Electricistas")], run)
+    assert [b.name for b in store.query(run)] == ["B", "A", "C"]
+    assert [b.name for b in store.query(run, gremios=["Electricistas"])] == ["C"]
+    df = store.to_df(run)
+    assert list(df["Nombre"]) == ["B", "A", "C"] and list(df["Gremio"].astype(str))[-1] == "Electricistas"
+
+def test_sites_expire_after_max_age(store):
+    store.put_site("a.es", "info@a.es", None)
+    assert store.get_site("a.es") == ("info@a.es", None) and store.reused_sites == 1
+    assert store.get_site("b.es") is None
+    store._db.execute("UPDATE sites SET enriched_at=? WHERE site=?", (time.time() - 2 * 86400, "a.es"))
+    assert store.get_site("a.es") is None
+
+def test_same_business_from_osm_and_google_is_stored_once(store):
+    run1 = store.begin_run()
+    store.upsert([biz("Fontanería García", source="OSM", place_id="osm:node/1", phone="912 34 56 78",
+                      lat=40.4168, lon=-3.7038)], run1)
+    run2 = store.begin_run()
+    store.upsert([biz("Fontaneria Garcia SL", place_id="ChIJ1", phone="+34912345678", rating=4.2,
+                      website="https://garcia.es", lat=40.4169, lon=-3.7037)], run2)
+    (b,) = store.query(run2)
+    assert (b.place_id, b.source, b.name) == ("osm:node/1", "OSM", "Fontanería García")
+    assert (b.rating, b.website) == (4.2, "https://garcia.es")     # la otra fuente completa lo que falta
+    run3 = store.begin_run()                                          # por dominio o por nombre y posición
+    store.upsert([biz("Fontanería García", website="http://www.garcia.es/contacto"),
+                  biz("Fontanería Garcia", lat=40.4170, lon=-3.7038)], run3)
+    assert [b.place_id for b in store.query(run3)] == ["osm:node/1"]
+    assert store.stats()["negocios"] == 1
+
+def test_same_place_id_refreshes_and_different_names_stay_apart(store):
+    run = store.begin_run()
+    store.upsert([biz("Fontanería García", place_id="osm:node/1", lat=40.4168, lon=-3.7038)], run)
+    store.upsert([biz("Cerrajería Luna", place_id="ChIJ2", lat=40.4168, lon=-3.7038)], run)
+    assert store.stats()["negocios"] == 2
+    store.upsert([biz("Fontanería García e Hijos", place_id="osm:node/1")], store.begin_run())
+    assert {b.name for b in store.query()} == {"Fontanería García e Hijos", "Cerrajería Luna"}
+
+def test_gremio_kept_per_run(store):
+    run1 = store.begin_run()
+    store.upsert([biz("Multiservicios Ruiz", place_id="p1", gremio="Fontaneros")], run1)
+    run2 = store.begin_run()
+    store.upsert([biz("Multiservicios Ruiz", place_id="p1", gremio="Electricistas")], run2)
+    assert store.query(run1)[0].gremio == "Fontaneros" and store.query(run2)[0].gremio == "Electricistas"
+    assert list(store.to_df(run2)["Gremio"].astype(str)) == ["Electricistas"]
+    assert store.query(run2, gremios=["Fontaneros"]) == []
+    assert [b.name for b in store.query(gremios=["Electricistas"])] == ["Multiservicios Ruiz"]
+    assert [b.name for b in store.query(gremios=["Fontaneros"])] == ["Multiservicios Ruiz"]
+
+def test_aliases_backfilled_for_existing_store(tmp_path):
+    path = str(tmp_path / "negocios.sqlite")
+    s = BusinessStore(path); s.upsert([biz("Fontanería García", place_id="osm:node/1", phone="912345678")])
+    s._db.execute("DELETE FROM aliases"); s.close()
+    s = BusinessStore(path); s.upsert([biz("García", place_id="ChIJ1", phone="912 345 678")])
+    assert s.stats()["negocios"] == 1
+    s.close()
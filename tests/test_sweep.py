@@ -0,0 +1,48 @@
+# tests/test_sweep.py — celdas de la malla adaptativa y su pertenencia al polígono de la zona
+import math
+
+import pytest
+
+from localizador.sweep import cell_center_radius, cell_in_area, cells_over_bbox, point_in_area, split_cell
+
+# anillos (lon, lat): un cuadrado de 1°×1° con un agujero de 0,2° en el centro
+OUTER = [(-4.0, 40.0), (-3.0, 40.0), (-3.0, 41.0), (-4.0, 41.0), (-4.0, 40.0)]
+HOLE = [(-3.6, 40.4), (-3.4, 40.4), (-3.4, 40.6), (-3.6, 40.6), (-3.6, 40.4)]
+ISLAND = [(-2.0, 39.0), (-1.9, 39.0), (-1.9, 39.1), (-2.0, 39.1), (-2.0, 39.0)]
+
+def test_point_in_area_with_holes_and_islands():
+    rings = [OUTER, HOLE, ISLAND]
+    assert point_in_area(40.2, -3.8, rings)
+    assert not point_in_area(40.5, -3.5, rings)          # en el agujero
+    assert point_in_area(39.05, -1.95, rings)            # en la isla
+    assert not point_in_area(42.0, -3.5, rings)
+
+@pytest.mark.parametrize("cell, inside", [
+    ((40.1, 40.2, -3.9, -3.8), True),                   # dentro
+    ((40.45, 40.55, -3.55, -3.45), False),              # dentro del agujero
+    ((40.9, 41.2, -3.2, -2.9), True),                   # solo una esquina dentro
+    ((39.5, 41.5, -4.5, -2.5), True),                   # la envuelve: ninguna esquina dentro, vértices sí
+    ((42.0, 42.1, -3.5, -3.4), False),
+])
+def test_cell_in_area(cell, inside):
+    assert cell_in_area(cell, [OUTER, HOLE]) is inside
+
+def test_cell_in_area_without_polygon():
+    assert cell_in_area((0.0, 1.0, 0.0, 1.0), None) and cell_in_area((0.0, 1.0, 0.0, 1.0), [])
+
+def test_cells_cover_bbox_without_overflow():
+    cells = cells_over_bbox(40.0, 41.0, -4.0, -3.0, 25.0)
+    assert min(c[0] for c in cells) == 40.0 and max(c[1] for c in cells) == 41.0
+    assert min(c[2] for c in cells) == -4.0 and max(c[3] for c in cells) == -3.0
+    area = sum((n - s) * (e - w) for s, n, w, e in cells)
+    assert area == pytest.approx(1.0)
+
+def test_split_and_circumscribed_radius():
+    cell = (40.0, 40.2, -4.0, -3.8)
+    kids = split_cell(cell)
+    assert len(kids) == 4 and sum((n - s) * (e - w) for s, n, w, e in kids) == pytest.approx(0.04)
+    (lat, lon), r = cell_center_radius(cell)
+    assert (lat, lon) == pytest.approx((40.1, -3.9))
+    half_h = 0.1 * 111.0; half_w = 0.1 * 111.0 * math.cos(math.radians(40.1))
+    assert r == pytest.approx(math.hypot(half_h, half_w))
+    assert all(cell_center_radius(k)[1] == pytest.approx(r / 2, rel=0.01) for k in kids)